@@ -6,6 +6,7 @@
 import os
 import re
 from collections import defaultdict
+from corpus_manifest import CorpusManifest
 
 def analyze_crawled_data():
     """기존 크롤링 데이터 분석"""
@@ -18,44 +19,39 @@ def analyze_crawled_data():
     
     print("🔍 기존 크롤링 데이터 분석 중...")
     
-    for filename in os.listdir(output_dir):
-        if filename.endswith('.txt'):
-            total_files += 1
-            filepath = os.path.join(output_dir, filename)
-            
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    
-                    if len(content.strip()) < 50:
-                        empty_files += 1
-                        continue
-                    
-                    # URL과 도메인 추출
-                    url_match = re.search(r'\[URL\] (https?://[^\n]+)', content)
-                    if url_match:
-                        url = url_match.group(1)
-                        
-                        # 도메인 추출
-                        domain_match = re.search(r'https?://([^/]+)', url)
-                        if domain_match:
-                            domain = domain_match.group(1)
-                            domain_stats[domain] += 1
-                            
-                            # URL 패턴 분석
-                            if '/bbs/' in url and 'artclView.do' in url:
-                                url_patterns['게시판_게시글'] += 1
-                            elif '/bbs/' in url:
-                                url_patterns['게시판_목록'] += 1
-                            elif 'subview.do' in url:
-                                url_patterns['서브페이지'] += 1
-                            elif '/index.do' in url:
-                                url_patterns['메인페이지'] += 1
-                            else:
-                                url_patterns['기타'] += 1
-                                
-            except Exception as e:
-                print(f"❌ 파일 처리 오류: {filename} - {e}")
+    # 파일 내용 대신 매니페스트 조회 (새 파일만 보충)
+    manifest = CorpusManifest()
+    manifest.sync_directory(output_dir)
+    
+    for page in manifest.pages(output_dir):
+        total_files += 1
+        
+        if page['length'] < 50:
+            empty_files += 1
+            continue
+        
+        # URL과 도메인 추출
+        url = page['url']
+        if url:
+            # 도메인 추출
+            domain_match = re.search(r'https?://([^/]+)', url)
+            if domain_match:
+                domain = domain_match.group(1)
+                domain_stats[domain] += 1
+                
+                # URL 패턴 분석
+                if '/bbs/' in url and 'artclView.do' in url:
+                    url_patterns['게시판_게시글'] += 1
+                elif '/bbs/' in url:
+                    url_patterns['게시판_목록'] += 1
+                elif 'subview.do' in url:
+                    url_patterns['서브페이지'] += 1
+                elif '/index.do' in url:
+                    url_patterns['메인페이지'] += 1
+                else:
+                    url_patterns['기타'] += 1
+    
+    manifest.close()
     
     print(f"\n📊 데이터 분석 결과:")
     print(f"총 파일 수: {total_files:,}개")
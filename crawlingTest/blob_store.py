@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+내용 주소 기반(content-addressed) 페이지 색인
+- 정규화 본문의 SHA-256 키 → 본문을 실제로 가진 저장 위치(페이지 파일) 하나
+- URL 레코드는 본문 키를 참조 → 같은 본문을 여러 크롤러/URL이 수집해도 본문은 페이지 파일 한 곳에만 저장
+- "이미 저장됨" 판단은 저장 위치가 실제로 있는지(이번 실행에서 기록 요청했거나 디스크/매니페스트에 존재)로 결정
+  → 출력 디렉토리를 옮기거나 기록 전에 중단된 경우 다시 크롤링하면 새로 저장
+- 구버전 이스케이프 줄바꿈 포맷과 새 포맷이 같은 키로 모이도록 줄 단위 정규화
+- 중복 제거율(dedup ratio) 통계 제공
+"""
+
+import os
+import sys
+import json
+import hashlib
+import threading
+import unicodedata
+from datetime import datetime
+import logging
+from corpus_manifest import parse_page
+
+logger = logging.getLogger(__name__)
+
+BLOB_STORE_DIR = "content_store"
+
+
+def normalize_content(text):
+    """blob 키용 정규화 (NFC, 이스케이프 줄바꿈 복원, 줄 공백/빈 줄 제거)"""
+    text = unicodedata.normalize('NFC', text).replace('\\n', '\n')
+    return '\n'.join(line.strip() for line in text.split('\n') if line.strip())
+
+
+def content_key(text):
+    """정규화 본문의 SHA-256"""
+    return hashlib.sha256(normalize_content(text).encode('utf-8')).hexdigest()
+
+
+class BlobStore:
+    def __init__(self, store_dir=BLOB_STORE_DIR, manifest=None):
+        self.store_dir = store_dir
+        self.refs_file = os.path.join(store_dir, "refs.jsonl")
+        self.manifest = manifest   # 다른 프로세스가 저장한 페이지 조회용 (선택)
+
+        os.makedirs(store_dir, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.url_to_blob = {}
+        self.holders = {}          # blob 키 → 본문을 가진 저장 위치
+        self.pending = set()       # 이번 실행에서 기록 요청한 위치 (비동기 기록이라 아직 파일이 없을 수 있음)
+        self.blob_refs = {}        # blob 키 → 참조 URL 수
+        self.blob_sizes = {}       # blob 키 → 본문 바이트 수
+        self.logical_bytes = 0     # 참조 기준 전체 바이트 (중복 포함)
+
+        self.load()
+
+    def load(self):
+        """참조 레코드 재생"""
+        if not os.path.exists(self.refs_file):
+            return
+        with open(self.refs_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 충돌로 잘린 마지막 줄
+                self._apply(record['url'], record['blob'], record['size'])
+                if record.get('path'):
+                    self.holders[record['blob']] = record['path']
+
+        if self.url_to_blob:
+            logger.info(f"🧬 blob 색인 로드: URL {len(self.url_to_blob):,}개 → 고유 본문 {len(self.blob_sizes):,}개")
+
+    def _apply(self, url, key, size):
+        previous = self.url_to_blob.get(url)
+        if previous == key:
+            return
+        if previous is not None:
+            self.blob_refs[previous] -= 1
+            self.logical_bytes -= self.blob_sizes[previous]
+        self.url_to_blob[url] = key
+        self.blob_refs[key] = self.blob_refs.get(key, 0) + 1
+        self.blob_sizes[key] = size
+        self.logical_bytes += size
+
+    def _is_stored(self, path, exists):
+        return path is not None and (path in self.pending or exists(path))
+
+    def holder(self, key, exists=os.path.exists):
+        """본문을 실제로 가진 저장 위치 (없으면 None)"""
+        path = self.holders.get(key)
+        return path if self._is_stored(path, exists) else None
+
+    def _find_stored(self, key, text, exists):
+        """이번 실행/이전 참조 기록 → 매니페스트(다른 크롤러 포함) 순으로 살아 있는 저장 위치 조회"""
+        path = self.holder(key, exists)
+        if path is None and self.manifest is not None:
+            content_hash = hashlib.md5(text.encode()).hexdigest()
+            path = next((p for p in self.manifest.paths_with_hash(content_hash) if exists(p)), None)
+        return path
+
+    def put(self, url, text, path, exists=os.path.exists, **meta):
+        """URL 참조 기록 → (blob 키, 새 본문 여부)
+
+        새 본문이면 path를 본문 위치로 등록하고 호출자가 path에 기록해야 한다.
+        이미 저장된 본문이면 기존 위치를 참조만 하고 기록하지 않는다.
+        exists: 저장 위치 존재 확인 함수 (파일이 아닌 저장소를 쓰는 경우 지정)
+        """
+        key = content_key(text)
+        size = len(text.encode('utf-8'))
+
+        with self.lock:
+            stored = self._find_stored(key, text, exists)
+            is_new = stored is None
+            if is_new:
+                stored = path
+                self.pending.add(path)
+            self.holders[key] = stored
+
+            record = dict(meta, url=url, blob=key, path=stored, size=size, t=datetime.now().isoformat())
+            with open(self.refs_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._apply(url, key, size)
+
+        return key, is_new
+
+    def get(self, key):
+        """blob 본문 조회 (본문을 가진 페이지 파일에서 읽음, 없으면 None)"""
+        path = self.holder(key)
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return parse_page(f.read())[1]
+
+    def blob_for(self, url):
+        """URL이 가리키는 blob 키"""
+        return self.url_to_blob.get(url)
+
+    def urls_for(self, key):
+        """blob을 참조하는 URL 목록"""
+        return sorted(url for url, blob in self.url_to_blob.items() if blob == key)
+
+    def get_stats(self):
+        """저장량/중복 제거 통계"""
+        live = [key for key, count in self.blob_refs.items() if count > 0]
+        unique_bytes = sum(self.blob_sizes[key] for key in live)
+        return {
+            'urls': len(self.url_to_blob),
+            'unique_blobs': len(live),
+            'logical_bytes': self.logical_bytes,
+            'unique_bytes': unique_bytes,
+            'dedup_ratio': (1 - unique_bytes / self.logical_bytes) if self.logical_bytes else 0.0,
+        }
+
+
+def ingest_directories(directories, store_dir=BLOB_STORE_DIR):
+    """기존 출력 디렉토리를 blob 색인에 적재 후 중복 제거율 출력 (같은 본문의 첫 파일이 본문 위치)"""
+    store = BlobStore(store_dir)
+    for directory in directories:
+        if not os.path.exists(directory):
+            continue
+        files = sorted(f for f in os.listdir(directory) if f.endswith('.txt'))
+        for filename in files:
+            path = os.path.join(directory, filename)
+            with open(path, 'r', encoding='utf-8') as f:
+                header, body, _ = parse_page(f.read())
+            url = header.get('URL') or f"file://{path}"
+            store.put(url, body, path, source=directory)
+        print(f"🧬 {directory}: {len(files):,}개 파일 적재")
+
+    stats = store.get_stats()
+    print(f"   URL {stats['urls']:,}개 → 고유 본문 {stats['unique_blobs']:,}개")
+    print(f"   용량 {stats['logical_bytes']:,} → {stats['unique_bytes']:,} bytes (절감 {stats['dedup_ratio']:.1%})")
+    return store
+
+
+if __name__ == "__main__":
+    ingest_directories(sys.argv[1:] or ["enhanced_output", "strategic_output", "enhanced_strategic_output",
+                                        "unlimited_crawling_output"])
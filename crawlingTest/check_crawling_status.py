@@ -5,9 +5,8 @@
 
 import os
 import time
-import json
 from datetime import datetime
-from collections import defaultdict
+from corpus_manifest import CorpusManifest
 
 def check_crawling_status():
     print("🔍 크롤링 상태 체크")
@@ -21,11 +20,14 @@ def check_crawling_status():
     ]
     
     total_files = 0
+    manifest = CorpusManifest()
     
     for dir_name, description in directories:
         if os.path.exists(dir_name):
-            files = [f for f in os.listdir(dir_name) if f.endswith('.txt')]
-            file_count = len(files)
+            # 매니페스트가 비어 있을 때만 디렉토리에서 보충 (이후에는 인덱스 조회)
+            if manifest.count(dir_name) == 0:
+                manifest.sync_directory(dir_name)
+            file_count = manifest.count(dir_name)
             total_files += file_count
             
             print(f"📁 {description}")
@@ -34,29 +36,14 @@ def check_crawling_status():
             
             if file_count > 0:
                 # 최신 파일 확인
-                latest_file = max(files, key=lambda f: os.path.getmtime(os.path.join(dir_name, f)))
-                latest_time = os.path.getmtime(os.path.join(dir_name, latest_file))
+                latest_path, latest_time = manifest.latest(dir_name)
                 latest_datetime = datetime.fromtimestamp(latest_time)
                 
-                print(f"   최신 파일: {latest_file}")
+                print(f"   최신 파일: {os.path.basename(latest_path)}")
                 print(f"   마지막 갱신: {latest_datetime.strftime('%Y-%m-%d %H:%M:%S')}")
                 
                 # 도메인별 통계 (최근 100개 파일)
-                recent_files = sorted(files, key=lambda f: os.path.getmtime(os.path.join(dir_name, f)))[-100:]
-                domain_stats = defaultdict(int)
-                
-                for file in recent_files:
-                    filepath = os.path.join(dir_name, file)
-                    try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            first_lines = [f.readline() for _ in range(5)]
-                            for line in first_lines:
-                                if line.startswith('[DOMAIN]'):
-                                    domain = line.split()[1]
-                                    domain_stats[domain] += 1
-                                    break
-                    except:
-                        pass
+                domain_stats = manifest.domain_counts(dir_name, recent=100)
                 
                 if domain_stats:
                     print("   최근 도메인 분포:")
@@ -65,6 +52,7 @@ def check_crawling_status():
             
             print()
     
+    manifest.close()
     print(f"📊 전체 합계: {total_files:,}개 파일")
     
     # 로그 파일 확인
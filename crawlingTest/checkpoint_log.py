@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+추가 전용(append-only) 체크포인트 로그
+- visited / enqueued / saved / failed 이벤트를 한 줄씩 기록
+- 작은 배치 단위로 fsync → 충돌 시 최대 마지막 배치만 유실
+- 백그라운드 압축(compaction)으로 스냅샷 생성 후 이전 로그 삭제
+- 체크포인트 비용이 전체 상태 크기가 아닌 변경분(delta)에 비례
+- 스냅샷은 임시 파일 + fsync + rename으로 원자적 교체 (직전 스냅샷은 .bak 보존)
+- 스냅샷 포맷은 경로 확장자로 결정 (.msgpack 바이너리 / JSON)
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from state_codec import write_state_file, load_state_file
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWriter:
+    """상태 스냅샷을 백그라운드 스레드에서 원자적으로 기록 (최신 요청만 유지)"""
+
+    def __init__(self, path, indent=None):
+        self.path = path
+        self.indent = indent
+        self.condition = threading.Condition()
+        self.pending = None
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, snapshot):
+        """스냅샷 기록 요청 (이전 대기 요청은 덮어씀)"""
+        with self.condition:
+            self.pending = snapshot
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                snapshot, self.pending = self.pending, None
+            try:
+                write_state_file(self.path, snapshot, self.indent)
+            except Exception as e:
+                logger.error(f"상태 기록 실패 {self.path}: {e}")
+
+    def close(self):
+        """대기 중인 기록을 마치고 스레드 종료"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+
+
+class CheckpointLog:
+    def __init__(self, log_path, snapshot_path, batch_size=50, compact_every=5000):
+        self.log_path = log_path
+        self.old_log_path = f"{log_path}.old"
+        self.snapshot_path = snapshot_path
+        self.batch_size = batch_size
+        self.compact_every = compact_every
+
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.seq = 0
+        self.events_since_compact = 0
+        self.compact_thread = None
+        self.log_file = None
+
+    def _open(self):
+        """로그 파일 열기 (충돌로 잘린 마지막 줄은 줄바꿈으로 분리)"""
+        if self.log_file is None:
+            needs_newline = False
+            if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > 0:
+                with open(self.log_path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    needs_newline = f.read(1) != b'\n'
+            self.log_file = open(self.log_path, 'a', encoding='utf-8')
+            if needs_newline:
+                self.log_file.write('\n')
+
+    def append(self, event_type, **fields):
+        """이벤트 추가 (배치가 차면 자동 flush)"""
+        with self.lock:
+            self.seq += 1
+            fields['t'] = event_type
+            fields['seq'] = self.seq
+            self.buffer.append(json.dumps(fields, ensure_ascii=False))
+            self.events_since_compact += 1
+            should_flush = len(self.buffer) >= self.batch_size
+
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """버퍼를 로그 파일에 기록하고 fsync"""
+        with self.lock:
+            if not self.buffer:
+                return
+            self._open()
+            self.log_file.write('\n'.join(self.buffer) + '\n')
+            self.log_file.flush()
+            os.fsync(self.log_file.fileno())
+            self.buffer = []
+
+    def load_snapshot(self):
+        """마지막 정상 스냅샷 로드 (없으면 빈 dict)"""
+        snapshot = load_state_file(self.snapshot_path) or {}
+        self.seq = snapshot.get('log_seq', 0)
+        return snapshot
+
+    def replay(self, apply_event, after_seq=0):
+        """스냅샷 이후 이벤트 재생 (잘린 마지막 줄은 무시)"""
+        replayed = 0
+        for path in (self.old_log_path, self.log_path):
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"손상된 로그 줄 무시: {path}")
+                        continue
+                    if event['seq'] <= after_seq:
+                        continue
+                    apply_event(event)
+                    self.seq = max(self.seq, event['seq'])
+                    replayed += 1
+
+        if replayed:
+            logger.info(f"📜 체크포인트 로그 재생: {replayed:,}개 이벤트")
+        return replayed
+
+    def should_compact(self):
+        """압축 시점 여부"""
+        return self.events_since_compact >= self.compact_every
+
+    def _rotate(self):
+        """현재 로그를 .old로 돌리고 새 로그 시작 → 스냅샷 기준 seq 반환"""
+        self.flush()
+        with self.lock:
+            if self.log_file is not None:
+                self.log_file.close()
+                self.log_file = None
+            if os.path.exists(self.log_path):
+                if os.path.exists(self.old_log_path):
+                    # 이전 압축이 끝나지 않은 경우 이어 붙여 보존
+                    with open(self.old_log_path, 'a', encoding='utf-8') as old, \
+                            open(self.log_path, 'r', encoding='utf-8') as current:
+                        old.write(current.read())
+                    os.remove(self.log_path)
+                else:
+                    os.replace(self.log_path, self.old_log_path)
+            self.events_since_compact = 0
+            return self.seq
+
+    def _write_snapshot(self, snapshot):
+        """스냅샷 기록 후 이전 로그 삭제"""
+        started = time.time()
+        try:
+            write_state_file(self.snapshot_path, snapshot)
+            if os.path.exists(self.old_log_path):
+                os.remove(self.old_log_path)
+            logger.info(f"🗜️ 체크포인트 압축 완료 ({time.time() - started:.1f}초)")
+        except Exception as e:
+            logger.error(f"체크포인트 압축 실패: {e}")
+
+    def compact(self, build_snapshot, background=True):
+        """현재 상태를 스냅샷으로 압축 (기본: 백그라운드 스레드)
+
+        build_snapshot은 상태를 변경하는 스레드에서 호출되어야 한다.
+        """
+        if self.compact_thread is not None and self.compact_thread.is_alive():
+            if not background:
+                self.compact_thread.join()
+            else:
+                return False
+
+        seq = self._rotate()
+        snapshot = build_snapshot()
+        snapshot['log_seq'] = seq
+
+        if background:
+            self.compact_thread = threading.Thread(
+                target=self._write_snapshot, args=(snapshot,), daemon=True
+            )
+            self.compact_thread.start()
+        else:
+            self._write_snapshot(snapshot)
+        return True
+
+    def close(self):
+        """대기 중인 압축 완료 및 로그 닫기"""
+        self.flush()
+        if self.compact_thread is not None:
+            self.compact_thread.join()
+        with self.lock:
+            if self.log_file is not None:
+                self.log_file.close()
+                self.log_file = None
@@ -1,17 +1,20 @@
 #!/usr/bin/env python3
 """
 완전한 웹사이트 데이터 통합 프로세스
-1. 전략적 크롤링 실행
-2. 데이터 통합 및 정제  
-3. RAG 임베딩 준비
+1. 전략적 크롤링 + 데이터 통합/정제/청킹 (한 프로세스 안의 스트리밍 단계 그래프, stage_pipeline.py)
+2. RAG 임베딩 (임베딩에 아직 반영되지 않은 통합 델타만, 성공 시 임베딩 스크립트가 확인 처리)
+3. 배포 확인
 """
 
 import os
 import sys
+import json
 import subprocess
 import time
 from datetime import datetime
 import logging
+from stage_pipeline import run_integration, CHUNK_DIR
+from merge_crawling_data import load_pending_delta
 
 # 로깅 설정
 logging.basicConfig(
@@ -25,10 +28,12 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class WebsiteIntegrationManager:
-    def __init__(self):
+    def __init__(self, crawl=True):
         self.start_time = time.time()
         self.steps_completed = 0
-        self.total_steps = 4
+        self.total_steps = 3
+        self.crawl = crawl
+        self.delta = {'add': [], 'update': [], 'delete': []}
         
     def print_header(self):
         """헤더 출력"""
@@ -36,10 +41,9 @@ class WebsiteIntegrationManager:
         print("🎯 대진대학교 웹사이트 데이터 완전 통합 시스템")
         print("=" * 70)
         print("📋 실행 단계:")
-        print("   1️⃣ 전략적 보완 크롤링 (2-3시간)")
-        print("   2️⃣ 데이터 통합 및 품질 필터링")
-        print("   3️⃣ RAG 시스템 임베딩")
-        print("   4️⃣ 배포 및 테스트")
+        print("   1️⃣ 전략적 보완 크롤링 + 데이터 통합/품질 필터링/청킹 (2-3시간, 동시 진행)")
+        print("   2️⃣ RAG 시스템 임베딩 (변경분만)")
+        print("   3️⃣ 배포 및 테스트")
         print("=" * 70)
         
     def update_progress(self, step_name):
@@ -52,98 +56,54 @@ class WebsiteIntegrationManager:
         logger.info(f"📈 전체 진행률: {progress:.1f}% ({self.steps_completed}/{self.total_steps})")
         logger.info(f"⏱️ 경과 시간: {elapsed/3600:.1f}시간")
         
-    def step1_strategic_crawling(self):
-        """1단계: 전략적 크롤링"""
-        logger.info("🚀 1단계: 전략적 보완 크롤링 시작")
+    def step1_pipeline(self):
+        """1단계: 크롤링 → 정제 → 중복 제거 → 통합 → 청킹 (단계 그래프, 크롤링 중에도 통합 진행)"""
+        logger.info("🚀 1단계: 전략적 보완 크롤링 + 데이터 통합 (스트리밍 단계 그래프)")
         
         try:
-            # 크롤링 실행
-            result = subprocess.run([
-                sys.executable, 'run_strategic_crawling.py'
-            ], capture_output=True, text=True, timeout=14400)  # 4시간 제한
-            
-            if result.returncode == 0:
-                logger.info("✅ 전략적 크롤링 성공")
-                
-                # 결과 확인
-                if os.path.exists('strategic_output'):
-                    files = len([f for f in os.listdir('strategic_output') if f.endswith('.txt')])
-                    logger.info(f"📊 새로 수집된 페이지: {files:,}개")
-                    
-                    if files < 500:
-                        logger.warning("⚠️ 예상보다 적은 데이터 수집됨")
-                        
-                else:
-                    raise Exception("strategic_output 디렉토리가 생성되지 않음")
-                    
-            else:
-                raise Exception(f"크롤링 실패: {result.stderr}")
+            self.delta = run_integration(crawl=self.crawl, max_pages=3000)
+            logger.info("✅ 크롤링/데이터 통합 성공")
+            logger.info(f"🔀 통합 델타: 추가 {len(self.delta['add']):,}개, 갱신 {len(self.delta['update']):,}개, "
+                        f"삭제 {len(self.delta['delete']):,}개")
+            
+            # 메타데이터 확인
+            if os.path.exists('merged_output/merge_metadata.json'):
+                with open('merged_output/merge_metadata.json', 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+                logger.info(f"📋 통합 메타데이터: {metadata['statistics']}")
                 
-        except subprocess.TimeoutExpired:
-            logger.error("❌ 크롤링 시간 초과 (4시간)")
-            raise
         except Exception as e:
-            logger.error(f"❌ 크롤링 실행 오류: {e}")
+            logger.error(f"❌ 크롤링/데이터 통합 오류: {e}")
             raise
             
-        self.update_progress("전략적 크롤링")
+        self.update_progress("크롤링 및 데이터 통합")
         
-    def step2_data_integration(self):
-        """2단계: 데이터 통합"""
-        logger.info("🔄 2단계: 데이터 통합 및 품질 필터링")
+    def step2_embedding(self):
+        """2단계: RAG 임베딩 (미반영 델타만, 이전 실행에서 실패/생략된 변경 포함)"""
+        logger.info("🧠 2단계: RAG 시스템 임베딩")
         
-        try:
-            # 데이터 통합 실행
-            result = subprocess.run([
-                sys.executable, 'merge_crawling_data.py'
-            ], capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                logger.info("✅ 데이터 통합 성공")
-                
-                # 결과 확인
-                if os.path.exists('merged_output'):
-                    files = len([f for f in os.listdir('merged_output') if f.endswith('.txt')])
-                    logger.info(f"📊 통합된 파일 수: {files:,}개")
-                    
-                    # 메타데이터 확인
-                    if os.path.exists('merged_output/merge_metadata.json'):
-                        import json
-                        with open('merged_output/merge_metadata.json', 'r') as f:
-                            metadata = json.load(f)
-                        logger.info(f"📋 통합 메타데이터: {metadata['statistics']}")
-                    
-                else:
-                    raise Exception("merged_output 디렉토리가 생성되지 않음")
-                    
-            else:
-                raise Exception(f"데이터 통합 실패: {result.stderr}")
-                
-        except Exception as e:
-            logger.error(f"❌ 데이터 통합 오류: {e}")
-            raise
-            
-        self.update_progress("데이터 통합")
-        
-    def step3_embedding(self):
-        """3단계: RAG 임베딩"""
-        logger.info("🧠 3단계: RAG 시스템 임베딩")
+        pending = load_pending_delta(os.path.join('merged_output', 'merge_delta.json'))
+        if not pending or not any(pending[kind] for kind in ('add', 'update', 'delete')):
+            logger.info("♻️ 임베딩에 반영할 변경 없음 → 임베딩 생략")
+            self.update_progress("RAG 임베딩")
+            return
+        logger.info(f"📌 미반영 델타 ({pending.get('pending_since')}부터): 추가 {len(pending['add']):,}개, "
+                    f"갱신 {len(pending['update']):,}개, 삭제 {len(pending['delete']):,}개")
         
         try:
-            # Node.js 스크립트 실행
+            # Node.js 스크립트 실행 (출력은 메모리에 모으지 않고 그대로 표시, 1단계 청크 파일 그대로 임베딩)
             script_path = '../scripts/embed-website-data.js'
             data_path = 'merged_output'
             
             result = subprocess.run([
-                'node', script_path, data_path
-            ], cwd='.', capture_output=True, text=True, timeout=7200)  # 2시간 제한
+                'node', script_path, data_path, '--delta', f'--chunks={CHUNK_DIR}'
+            ], cwd='.', timeout=7200)  # 2시간 제한
             
             if result.returncode == 0:
                 logger.info("✅ RAG 임베딩 성공")
-                logger.info(f"📝 임베딩 로그:\n{result.stdout}")
                 
             else:
-                raise Exception(f"임베딩 실패: {result.stderr}")
+                raise Exception(f"임베딩 실패 (종료 코드 {result.returncode})")
                 
         except subprocess.TimeoutExpired:
             logger.error("❌ 임베딩 시간 초과 (2시간)")
@@ -154,9 +114,9 @@ class WebsiteIntegrationManager:
             
         self.update_progress("RAG 임베딩")
         
-    def step4_deployment(self):
-        """4단계: 배포 및 테스트"""
-        logger.info("🚀 4단계: 배포 및 테스트")
+    def step3_deployment(self):
+        """3단계: 배포 및 테스트"""
+        logger.info("🚀 3단계: 배포 및 테스트")
         
         try:
             # 기존 배포 확인 (이미 배포된 상태)
@@ -187,17 +147,14 @@ class WebsiteIntegrationManager:
             return False
         
         try:
-            # 1단계: 전략적 크롤링
-            self.step1_strategic_crawling()
-            
-            # 2단계: 데이터 통합
-            self.step2_data_integration()
+            # 1단계: 크롤링 + 데이터 통합 (단계 그래프)
+            self.step1_pipeline()
             
-            # 3단계: RAG 임베딩
-            self.step3_embedding()
+            # 2단계: RAG 임베딩
+            self.step2_embedding()
             
-            # 4단계: 배포 및 테스트
-            self.step4_deployment()
+            # 3단계: 배포 및 테스트
+            self.step3_deployment()
             
             # 최종 완료
             total_time = time.time() - self.start_time
@@ -223,7 +180,7 @@ class WebsiteIntegrationManager:
 
 def main():
     """메인 실행 함수"""
-    manager = WebsiteIntegrationManager()
+    manager = WebsiteIntegrationManager(crawl='--no-crawl' not in sys.argv)
     success = manager.run_complete_integration()
     
     if success:
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+코퍼스 매니페스트 (SQLite)
+- 저장 시점에 페이지 메타데이터 기록: URL, 정규 URL, 도메인, 깊이, 길이, 본문 해시, 파일 경로/본문 오프셋, 시각
+- 크롤러 시작/상태 확인/통합 단계가 출력 디렉토리를 매번 전부 읽지 않고 인덱스 조회
+- 매니페스트가 없던 기존 디렉토리는 새 파일만 헤더를 읽어 보충(backfill)
+- 동기화 시 기존 파일도 stat으로 mtime/크기를 비교해 제자리 수정된 파일은 다시 기록
+"""
+
+import os
+import re
+import sys
+import sqlite3
+import hashlib
+import threading
+import logging
+from url_alias import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_PATH = "corpus_manifest.sqlite"
+
+# 헤더와 본문 구분 (구버전 파일의 이스케이프된 '\\n'도 허용)
+BODY_SEPARATOR = re.compile(r'(?:\n|\\n){2}')
+HEADER_LINE_PATTERN = re.compile(r'^\[([A-Z_]+)\] (.*)$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    path TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    url TEXT,
+    canonical_url TEXT,
+    doc_id TEXT,
+    domain TEXT,
+    depth INTEGER,
+    length INTEGER,
+    content_hash TEXT,
+    body_offset INTEGER,
+    timestamp TEXT,
+    mtime REAL,
+    size INTEGER
+);
+CREATE INDEX IF NOT EXISTS pages_source ON pages(source, mtime);
+CREATE INDEX IF NOT EXISTS pages_url ON pages(url);
+CREATE INDEX IF NOT EXISTS pages_canonical ON pages(canonical_url);
+CREATE INDEX IF NOT EXISTS pages_hash ON pages(content_hash);
+"""
+
+
+def parse_page(content):
+    """저장 파일 내용 → (헤더 dict, 본문, 본문 바이트 오프셋)"""
+    match = BODY_SEPARATOR.search(content)
+    if not match:
+        return {}, content, 0
+
+    header_text = content[:match.start()].replace('\\n', '\n')
+    header = {}
+    for line in header_text.split('\n'):
+        line_match = HEADER_LINE_PATTERN.match(line.strip())
+        if line_match:
+            header[line_match.group(1)] = line_match.group(2).strip()
+
+    body_offset = len(content[:match.end()].encode('utf-8'))
+    return header, content[match.end():], body_offset
+
+
+def file_fingerprint(path, content_hash):
+    """증분 처리용 파일 지문 [mtime, 크기, 본문 해시] (mtime/크기는 현재 파일 stat 기준)"""
+    stat = os.stat(path)
+    return [stat.st_mtime, stat.st_size, content_hash]
+
+
+class CorpusManifest:
+    def __init__(self, db_path=MANIFEST_PATH, commit_every=50):
+        self.db_path = db_path
+        self.commit_every = commit_every
+        self.lock = threading.Lock()
+        self.pending = 0
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(pages)")}
+        if 'size' not in columns:
+            # 이전 버전 매니페스트: 크기 열 추가 (다음 동기화에서 기존 파일 크기 보충)
+            self.conn.execute("ALTER TABLE pages ADD COLUMN size INTEGER")
+
+    @staticmethod
+    def source_of(path):
+        """파일이 속한 출력 디렉토리"""
+        return os.path.normpath(os.path.dirname(path))
+
+    def record(self, path, content, doc_id=None, mtime=None):
+        """저장한 페이지 파일 기록 (파일에 쓴 내용 그대로 전달)"""
+        header, body, body_offset = parse_page(content)
+        stat = os.stat(path)
+        url = header.get('URL', '')
+        depth = header.get('DEPTH')
+        row = (
+            os.path.normpath(path),
+            self.source_of(path),
+            url,
+            canonicalize_url(url) if url else None,
+            doc_id or header.get('DOC_ID'),
+            header.get('DOMAIN'),
+            int(depth) if depth and depth.isdigit() else None,
+            len(body),
+            hashlib.md5(body.encode()).hexdigest(),
+            body_offset,
+            header.get('TIMESTAMP'),
+            mtime if mtime is not None else stat.st_mtime,
+            stat.st_size,
+        )
+
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO pages VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)", row)
+            self.pending += 1
+            if self.pending >= self.commit_every:
+                self.conn.commit()
+                self.pending = 0
+
+    def commit(self):
+        """대기 중인 기록 반영"""
+        with self.lock:
+            self.conn.commit()
+            self.pending = 0
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+    def remove_source(self, source_dir):
+        """디렉토리 전체 기록 삭제 (디렉토리 백업/초기화 시)"""
+        with self.lock:
+            self.conn.execute("DELETE FROM pages WHERE source = ?", (os.path.normpath(source_dir),))
+            self.conn.commit()
+
+    def sync_directory(self, source_dir):
+        """디렉토리와 매니페스트 동기화 (새 파일과 mtime/크기가 바뀐 파일만 읽고, 사라진 파일은 삭제)"""
+        source = os.path.normpath(source_dir)
+        if not os.path.exists(source_dir):
+            self.remove_source(source_dir)
+            return 0
+
+        on_disk = {os.path.join(source, f) for f in os.listdir(source_dir) if f.endswith('.txt')}
+        known = {row[0]: (row[1], row[2]) for row in
+                 self.conn.execute("SELECT path, mtime, size FROM pages WHERE source = ?", (source,))}
+
+        missing = known.keys() - on_disk
+        if missing:
+            with self.lock:
+                self.conn.executemany("DELETE FROM pages WHERE path = ?", ((path,) for path in missing))
+
+        # 제자리 수정(같은 경로에 다시 기록) 감지
+        changed = set()
+        for path in on_disk & known.keys():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if known[path] != (stat.st_mtime, stat.st_size):
+                changed.add(path)
+
+        added = 0
+        for path in sorted((on_disk - known.keys()) | changed):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.record(path, f.read())
+                added += 1
+            except Exception as e:
+                logger.warning(f"매니페스트 기록 실패 {path}: {e}")
+        self.commit()
+
+        if added or missing:
+            logger.info(f"🗂️ 매니페스트 동기화 {source}: 추가 {added - len(changed):,}개, "
+                        f"변경 {len(changed):,}개, 삭제 {len(missing):,}개")
+        return added
+
+    def count(self, source_dir=None):
+        """페이지 수"""
+        if source_dir is None:
+            return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM pages WHERE source = ?",
+                                 (os.path.normpath(source_dir),)).fetchone()[0]
+
+    def urls(self, source_dir):
+        """디렉토리에 저장된 URL 집합"""
+        rows = self.conn.execute("SELECT url FROM pages WHERE source = ? AND url != ''",
+                                 (os.path.normpath(source_dir),))
+        return {row[0] for row in rows}
+
+    def pages(self, source_dir):
+        """디렉토리의 페이지 레코드 (dict) 목록"""
+        cursor = self.conn.execute("SELECT * FROM pages WHERE source = ? ORDER BY path",
+                                   (os.path.normpath(source_dir),))
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def paths_with_hash(self, content_hash):
+        """같은 본문 해시(md5)로 기록된 파일 경로 목록 (다른 크롤러 프로세스가 저장한 페이지 포함)"""
+        with self.lock:
+            rows = self.conn.execute("SELECT path FROM pages WHERE content_hash = ?", (content_hash,)).fetchall()
+        return [row[0] for row in rows]
+
+    def domain_counts(self, source_dir, recent=None):
+        """도메인별 페이지 수 (recent 지정 시 최근 N개 파일 기준)"""
+        source = os.path.normpath(source_dir)
+        if recent:
+            query = ("SELECT domain, COUNT(*) FROM (SELECT domain FROM pages WHERE source = ? "
+                     "ORDER BY mtime DESC LIMIT ?) GROUP BY domain")
+            rows = self.conn.execute(query, (source, recent))
+        else:
+            rows = self.conn.execute("SELECT domain, COUNT(*) FROM pages WHERE source = ? GROUP BY domain",
+                                     (source,))
+        return {domain: count for domain, count in rows if domain}
+
+    def latest(self, source_dir):
+        """가장 최근 저장된 페이지 (경로, mtime)"""
+        return self.conn.execute("SELECT path, mtime FROM pages WHERE source = ? ORDER BY mtime DESC LIMIT 1",
+                                 (os.path.normpath(source_dir),)).fetchone()
+
+
+if __name__ == "__main__":
+    manifest = CorpusManifest()
+    directories = sys.argv[1:] or ["enhanced_output", "strategic_output", "enhanced_strategic_output",
+                                   "unlimited_crawling_output"]
+    for directory in directories:
+        manifest.sync_directory(directory)
+        print(f"🗂️ {directory}: {manifest.count(directory):,}개 페이지")
+    manifest.close()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+도메인별 zstd 사전 (코퍼스 압축용)
+- 같은 학과 사이트 페이지는 어휘/템플릿 줄을 공유하므로 기존 페이지 표본으로 도메인별 사전 학습
+- 표본이 적은 도메인은 공용 사전(_default) 하나로 묶음
+- 레코드마다 사전 압축 → 짧은 페이지도 압축률 확보, 문서 하나만 풀어도 됨
+- 사전 ID는 zstd 프레임 헤더에 기록되므로 재학습 후에도 기존 레코드 해제 가능 (이전 사전 파일 유지)
+- 경로 해시로 학습/평가 표본 분리 (평가 비율 TEST_FRACTION) → 벤치마크는 학습에 쓰지 않은 페이지로만 측정
+- 벤치마크: 무압축 / gzip / zstd / zstd 블록 / zstd+사전 압축률과 MB/s 비교
+- 세그먼트 저장소 기본은 블록 압축, 사전은 SegmentStore(use_dictionaries=True)로 선택 사용
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import random
+import hashlib
+from collections import defaultdict
+import zstandard
+import logging
+from corpus_manifest import CorpusManifest, parse_page
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CLUSTER = "_default"
+INDEX_FILE = "index.json"
+TEST_FRACTION = 0.2      # 벤치마크용 보류 표본 비율
+
+
+class DomainDictionaries:
+    def __init__(self, dict_dir, level=3):
+        self.dict_dir = dict_dir
+        self.level = level
+        self.by_id = {}          # 사전 ID → 사전
+        self.by_domain = {}      # 도메인 → 사전 ID
+        self.compressors = {}
+        self.decompressors = {}
+        self.load()
+
+    def __bool__(self):
+        return bool(self.by_domain)
+
+    def load(self):
+        """사전 파일과 도메인 인덱스 로드"""
+        if not os.path.exists(self.dict_dir):
+            return
+        for filename in os.listdir(self.dict_dir):
+            if filename.endswith('.zdict'):
+                with open(os.path.join(self.dict_dir, filename), 'rb') as f:
+                    dictionary = zstandard.ZstdCompressionDict(f.read())
+                self.by_id[dictionary.dict_id()] = dictionary
+
+        index_path = os.path.join(self.dict_dir, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                self.by_domain = json.load(f)
+
+    def dictionary_id(self, domain):
+        """도메인 사전 ID (없으면 공용 사전, 그것도 없으면 0 = 사전 없음)"""
+        return self.by_domain.get(domain or DEFAULT_CLUSTER, self.by_domain.get(DEFAULT_CLUSTER, 0))
+
+    def compress(self, domain, data):
+        """도메인 사전으로 레코드 압축"""
+        dict_id = self.dictionary_id(domain)
+        compressor = self.compressors.get(dict_id)
+        if compressor is None:
+            compressor = zstandard.ZstdCompressor(level=self.level, dict_data=self.by_id.get(dict_id))
+            self.compressors[dict_id] = compressor
+        return compressor.compress(data)
+
+    def decompress(self, data):
+        """프레임 헤더의 사전 ID로 레코드 해제"""
+        dict_id = zstandard.get_frame_parameters(data).dict_id
+        decompressor = self.decompressors.get(dict_id)
+        if decompressor is None:
+            if dict_id and dict_id not in self.by_id:
+                raise ValueError(f"zstd 사전 없음: {dict_id} ({self.dict_dir})")
+            decompressor = zstandard.ZstdDecompressor(dict_data=self.by_id.get(dict_id))
+            self.decompressors[dict_id] = decompressor
+        return decompressor.decompress(data)
+
+
+def is_held_out(path):
+    """경로 해시 기준 평가 표본 여부 (실행마다 같은 분할)"""
+    bucket = int(hashlib.md5(os.path.basename(path).encode('utf-8')).hexdigest()[:8], 16)
+    return bucket % 1000 < TEST_FRACTION * 1000
+
+
+def load_samples(source_dir, per_domain=None, seed=42, split=None):
+    """매니페스트 기준 도메인별 본문(bytes) 목록 (per_domain 지정 시 무작위 표본, split: 'train' / 'test')"""
+    manifest = CorpusManifest()
+    manifest.sync_directory(source_dir)
+    by_domain = defaultdict(list)
+    for page in manifest.pages(source_dir):
+        if split is not None and is_held_out(page['path']) != (split == 'test'):
+            continue
+        by_domain[page['domain'] or DEFAULT_CLUSTER].append(page['path'])
+    manifest.close()
+
+    rng = random.Random(seed)
+    samples = {}
+    for domain, paths in by_domain.items():
+        if per_domain and len(paths) > per_domain:
+            paths = rng.sample(paths, per_domain)
+        bodies = []
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                bodies.append(parse_page(f.read())[1].encode('utf-8'))
+        samples[domain] = bodies
+    return samples
+
+
+def train_dictionaries(source_dir, dict_dir, dict_size=32 * 1024, per_domain=300, min_samples=40):
+    """도메인별 사전 학습 (표본이 적은 도메인은 공용 사전으로 묶음, 평가 표본은 제외)"""
+    samples = load_samples(source_dir, per_domain, split='train')
+    os.makedirs(dict_dir, exist_ok=True)
+
+    clusters = {domain: bodies for domain, bodies in samples.items() if len(bodies) >= min_samples}
+    clusters[DEFAULT_CLUSTER] = [body for bodies in samples.values() for body in bodies[:min_samples]]
+
+    index = {}
+    for domain, bodies in clusters.items():
+        try:
+            dictionary = zstandard.train_dictionary(dict_size, bodies)
+        except zstandard.ZstdError as e:
+            logger.warning(f"사전 학습 실패 {domain} ({len(bodies)}개 표본): {e}")
+            continue
+        with open(os.path.join(dict_dir, f"{dictionary.dict_id()}.zdict"), 'wb') as f:
+            f.write(dictionary.as_bytes())
+        index[domain] = dictionary.dict_id()
+
+    index_path = os.path.join(dict_dir, INDEX_FILE)
+    with open(f"{index_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(f"{index_path}.tmp", index_path)
+
+    logger.info(f"📚 zstd 사전 학습: 도메인 {len(samples)}개 → 사전 {len(index)}개 ({dict_dir})")
+    return DomainDictionaries(dict_dir)
+
+
+def _measure(label, records, compress, decompress, rounds=3):
+    """레코드 단위 압축률과 압축/해제 MB/s 측정"""
+    raw_bytes = sum(len(data) for _, data in records)
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        packed = [compress(domain, data) for domain, data in records]
+    compress_seconds = (time.perf_counter() - started) / rounds
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for data in packed:
+            decompress(data)
+    decompress_seconds = (time.perf_counter() - started) / rounds
+
+    packed_bytes = sum(len(data) for data in packed)
+    mb = raw_bytes / 1024 / 1024
+    print(f"   {label:<10} 압축률 {raw_bytes / packed_bytes:5.2f}x  "
+          f"압축 {mb / max(compress_seconds, 1e-9):9.1f} MB/s  해제 {mb / max(decompress_seconds, 1e-9):9.1f} MB/s")
+
+
+def group_blocks(records, block_size=256 * 1024):
+    """레코드를 세그먼트 저장소 기본 블록 크기로 묶기 (기존 블록 압축 비교용, 임의 접근 시 블록 전체 해제)"""
+    blocks, current = [], []
+    for _, data in records:
+        current.append(data)
+        if sum(map(len, current)) >= block_size:
+            blocks.append(('', b''.join(current)))
+            current = []
+    if current:
+        blocks.append(('', b''.join(current)))
+    return blocks
+
+
+def benchmark(source_dir, dict_dir, per_domain=None):
+    """레코드 단위 압축 비교: 무압축 / gzip / zstd / zstd 블록 / zstd+도메인 사전 (학습에서 제외한 평가 표본)"""
+    samples = load_samples(source_dir, per_domain, seed=7, split='test')
+    records = [(domain, body) for domain, bodies in samples.items() for body in bodies]
+
+    dictionaries = DomainDictionaries(dict_dir)
+    plain = zstandard.ZstdCompressor(level=3)
+    plain_decompressor = zstandard.ZstdDecompressor()
+
+    print(f"📊 평가 레코드 {len(records):,}개 ({sum(len(data) for _, data in records) / 1024 / 1024:.1f} MB, {source_dir})")
+    _measure("무압축", records, lambda domain, data: data, bytes)
+    _measure("gzip", records, lambda domain, data: gzip.compress(data, 6), gzip.decompress)
+    _measure("zstd", records, lambda domain, data: plain.compress(data), plain_decompressor.decompress)
+    _measure("zstd 블록", group_blocks(records), lambda domain, data: plain.compress(data),
+             plain_decompressor.decompress)
+    if dictionaries:
+        _measure("zstd+사전", records, dictionaries.compress, dictionaries.decompress)
+    else:
+        print(f"   (사전 없음: python3 domain_dictionary.py train {source_dir} {dict_dir})")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4 or sys.argv[1] not in ('train', 'bench'):
+        print("사용법:")
+        print("  python3 domain_dictionary.py train <txt 디렉토리> <사전 디렉토리>")
+        print("  python3 domain_dictionary.py bench <txt 디렉토리> <사전 디렉토리>")
+        print("  (세그먼트 저장소에 적용하려면 사전 디렉토리를 <저장소>/dictionaries 로 지정하고 pack --dict 사용)")
+        sys.exit(1)
+
+    logging.basicConfig(level=logging.INFO)
+    if sys.argv[1] == 'train':
+        train_dictionaries(sys.argv[2], sys.argv[3])
+    else:
+        benchmark(sys.argv[2], sys.argv[3])
@@ -24,13 +24,23 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import multiprocessing as mp
 from collections import defaultdict
 import hashlib
 from datetime import datetime
 import logging
+from table_extractor import extract_table_blocks, TABLE_PLACEHOLDER_PATTERN
+from link_harvester import LinkHarvester, DEFAULT_LINKS_ONLY_TEMPLATES
+from extraction_cache import ExtractionCache
+from near_duplicate_index import NearDuplicateIndex
+from url_alias import AliasMap
+from checkpoint_log import CheckpointLog
+from state_codec import migrate_legacy_state
+from corpus_manifest import CorpusManifest
+from blob_store import BlobStore
+from page_writer import PageWriter
+from segment_store import SegmentStore
+from raw_archive import RawArchive
 
 # 로깅 설정
 logging.basicConfig(
@@ -43,8 +53,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 정제 로직 변경 시 올려서 추출 캐시 무효화
+CLEANER_VERSION = "enhanced-3"
+
+# 상태에 유지하는 저장 페이지 레코드 필드 (본문 제외)
+PAGE_RECORD_FIELDS = ('url', 'doc_id', 'hash', 'blob', 'fingerprint', 'file', 'offset', 'length')
+
 class EnhancedCrawler:
-    def __init__(self):
+    def __init__(self, capture_raw=False):
         # M4 Pro 성능 최적화 설정 (대량 크롤링 최적화)
         self.max_workers = min(12, mp.cpu_count())  # 워커 수 증가 (8→12)
         self.max_concurrent_requests = 30  # 동시 HTTP 요청 수 증가 (20→30)
@@ -52,16 +68,46 @@ class EnhancedCrawler:
         
         # 디렉토리 설정
         self.output_dir = "enhanced_output"
-        self.state_file = "enhanced_crawler_state.json"
+        self.state_file = "enhanced_crawler_state.msgpack"
+        self.legacy_state_file = "enhanced_crawler_state.json"
+        self.state_log_file = "enhanced_crawler_state.log"
         self.error_log = os.path.join(self.output_dir, "enhanced_error_log.txt")
         
         os.makedirs(self.output_dir, exist_ok=True)
         
+        # 추출 결과 캐시 (리다이렉트/별칭 URL/재시도/재실행 시 재파싱 방지)
+        self.extraction_cache = ExtractionCache(
+            CLEANER_VERSION, max_entries=5000, disk_dir="extraction_cache"
+        )
+        
+        # 유사 중복 인덱스 (전체 저장 코퍼스 대상 MinHash/LSH)
+        self.duplicate_index_file = "enhanced_duplicate_index.npz"
+        self.duplicate_index = NearDuplicateIndex(threshold=0.90, path=self.duplicate_index_file)
+        
+        # URL 별칭 테이블 (같은 본문을 가리키는 URL → 하나의 문서 ID)
+        self.alias_map = AliasMap("enhanced_url_aliases.json")
+        
+        # 코퍼스 매니페스트 (저장 시점에 페이지 메타데이터 기록)
+        self.manifest = CorpusManifest()
+        self.blob_store = BlobStore(manifest=self.manifest)  # 크롤러 간 공유 본문 색인 (본문은 페이지 파일에만 저장)
+        # 페이지 파일은 전용 스레드가 배치 기록 (크롤링 루프는 저장소 지연에 막히지 않음)
+        self.page_writer = PageWriter(self.output_dir, on_written=self.manifest.record)
+        
+        # 세그먼트 코퍼스 저장소 (write_text_files=False일 때 본문 저장소, 기본은 Node 스크립트 호환 .txt 파일)
+        self.corpus_store = SegmentStore("enhanced_corpus")
+        self.write_text_files = True
+        
+        # 원본 응답 보관 (선택, 정제 로직 변경 시 재크롤링 없이 재추출)
+        self.raw_archive = RawArchive("enhanced_raw_archive") if capture_raw else None
+        
+        # 추가 전용 상태 로그 (스냅샷 = state_file, 변경분만 기록)
+        self.checkpoint_log = CheckpointLog(self.state_log_file, self.state_file,
+                                            batch_size=50, compact_every=5000)
+        
         # 크롤링 상태
         self.visited = set()
         self.to_visit = set()
-        self.saved_texts = []
-        self.saved_urls = []
+        self.saved_pages = []  # 저장 페이지 요약 레코드 (본문은 파일에서 지연 로드)
         self.url_depths = {}  # URL별 깊이 추적
         self.domain_stats = defaultdict(int)  # 도메인별 통계
         
@@ -83,6 +129,10 @@ class EnhancedCrawler:
             r'/research/',                 # 연구 관련
         ]
         
+        # 링크만 수집하는 페이지 템플릿 (DOM 생성/본문 정제 생략)
+        self.links_only_templates = list(DEFAULT_LINKS_ONLY_TEMPLATES)
+        self.link_harvester = LinkHarvester(self.links_only_templates)
+        
         # 도메인별 깊이 제한 (대폭 확대)
         self.domain_depth_limits = {
             'library.daejin.ac.kr': 0,    # 도서관 완전 제외
@@ -178,20 +228,32 @@ class EnhancedCrawler:
         self.load_state()
 
     def load_state(self):
-        """이전 크롤링 상태 로드"""
-        if os.path.exists(self.state_file):
-            try:
-                with open(self.state_file, "r", encoding="utf-8") as f:
-                    state = json.load(f)
-                    self.visited.update(state.get("visited", []))
-                    self.to_visit.update(state.get("to_visit", []))
-                    self.saved_texts.extend(state.get("saved_texts", []))
-                    self.saved_urls.extend(state.get("saved_urls", []))
-                    self.url_depths.update(state.get("url_depths", {}))
-                    
+        """이전 크롤링 상태 로드 (스냅샷 + 로그 재생)"""
+        try:
+            migrate_legacy_state(self.legacy_state_file, self.state_file)
+            state = self.checkpoint_log.load_snapshot()
+            self.visited.update(state.get("visited", []))
+            self.to_visit.update(state.get("to_visit", []))
+            self.saved_pages.extend(state.get("saved_pages", []))
+            
+            # 구버전 상태: URL 목록만 레코드로 변환 (본문 목록은 인덱스 재구성에만 사용 후 폐기)
+            legacy_texts = state.get("saved_texts", [])
+            if not self.saved_pages:
+                self.saved_pages.extend({'url': url} for url in state.get("saved_urls", []))
+            self.url_depths.update(state.get("url_depths", {}))
+            self.domain_stats.update(state.get("stats", {}))
+            
+            # 스냅샷 이후 기록된 이벤트 반영
+            self.checkpoint_log.replay(self.apply_log_event, state.get("log_seq", 0))
+            
+            if self.visited or self.to_visit:
                 logger.info(f"🔄 상태 복원: 방문 {len(self.visited)}개, 대기 {len(self.to_visit)}개")
-            except Exception as e:
-                logger.error(f"상태 로드 실패: {e}")
+            
+            # 인덱스 파일이 없으면 저장된 본문으로 재구성
+            if not len(self.duplicate_index) and (legacy_texts or self.saved_pages):
+                self.rebuild_duplicate_index(legacy_texts)
+        except Exception as e:
+            logger.error(f"상태 로드 실패: {e}")
         
         # 시작 URL 추가 (아직 방문하지 않은 것만)
         new_start_urls = set(self.start_urls) - self.visited
@@ -202,21 +264,83 @@ class EnhancedCrawler:
             if url not in self.url_depths:
                 self.url_depths[url] = 0
 
-    def save_state(self):
-        """현재 크롤링 상태 저장"""
-        state = {
+    def apply_log_event(self, event):
+        """체크포인트 로그 이벤트를 상태에 반영"""
+        event_type = event['t']
+        url = event['url']
+        
+        if event_type == 'enqueued':
+            if url not in self.visited:
+                self.to_visit.add(url)
+            self.url_depths.setdefault(url, event.get('depth', 0))
+        elif event_type in ('visited', 'failed'):
+            self.visited.add(url)
+            self.to_visit.discard(url)
+            self.domain_stats[urlparse(url).netloc] += 1
+        elif event_type == 'saved':
+            self.saved_pages.append({key: event[key] for key in PAGE_RECORD_FIELDS if key in event})
+
+    def segment_location(self, doc_id):
+        """세그먼트 저장소 레코드의 blob 색인 위치"""
+        return f"{self.corpus_store.store_dir}#{doc_id}"
+
+    def segment_exists(self, location):
+        """blob 색인 위치가 가리키는 세그먼트 레코드 존재 여부"""
+        store_dir, _, doc_id = location.rpartition('#')
+        return store_dir == self.corpus_store.store_dir and doc_id in self.corpus_store
+
+    def load_page_text(self, record):
+        """세그먼트 저장소 또는 저장 파일에서 페이지 본문 지연 로드"""
+        stored = self.corpus_store.get(record.get('doc_id'))
+        if stored is not None:
+            return stored['text']
+        if 'file' not in record:
+            return None
+        with open(record['file'], 'rb') as f:
+            f.seek(record['offset'])
+            return f.read().decode('utf-8')
+
+    def rebuild_duplicate_index(self, legacy_texts=(), batch_size=500):
+        """중복 인덱스 재구성 (본문은 배치 단위로 파일에서 읽음)"""
+        if legacy_texts:
+            urls = [record['url'] for record in self.saved_pages[:len(legacy_texts)]]
+            self.duplicate_index.add_batch(urls, legacy_texts)
+        else:
+            records = [record for record in self.saved_pages
+                       if 'file' in record or record.get('doc_id') in self.corpus_store]
+            for start in range(0, len(records), batch_size):
+                batch = records[start:start + batch_size]
+                texts = [self.load_page_text(record) for record in batch]
+                self.duplicate_index.add_batch([record['url'] for record in batch], texts)
+        logger.info(f"🔁 중복 인덱스 재구성: {len(self.duplicate_index)}개 문서")
+
+    def build_state(self):
+        """전체 상태 스냅샷 생성 (압축 스레드가 직렬화하는 동안 변경되지 않도록 크롤링 스레드에서 복사)"""
+        return {
             "visited": list(self.visited),
             "to_visit": list(self.to_visit),
-            "saved_texts": self.saved_texts,
-            "saved_urls": self.saved_urls,
-            "url_depths": self.url_depths,
+            "saved_pages": list(self.saved_pages),
+            "url_depths": dict(self.url_depths),
             "last_saved": datetime.now().isoformat(),
             "stats": dict(self.domain_stats)
         }
-        
+
+    def checkpoint(self):
+        """주기적 체크포인트 (로그 fsync, 필요 시 백그라운드 압축)"""
+        self.corpus_store.flush()
+        self.page_writer.flush()
+        self.checkpoint_log.flush()
+        if self.checkpoint_log.should_compact():
+            if self.checkpoint_log.compact(self.build_state):
+                self.duplicate_index.save()
+                self.alias_map.save()
+
+    def save_state(self):
+        """현재 크롤링 상태 저장 (동기 압축)"""
         try:
-            with open(self.state_file, "w", encoding="utf-8") as f:
-                json.dump(state, f, ensure_ascii=False, indent=2)
+            self.checkpoint_log.compact(self.build_state, background=False)
+            self.duplicate_index.save()
+            self.alias_map.save()
             logger.info(f"💾 상태 저장: 방문 {len(self.visited)}개, 대기 {len(self.to_visit)}개")
         except Exception as e:
             logger.error(f"상태 저장 실패: {e}")
@@ -259,6 +383,8 @@ class EnhancedCrawler:
                 return False
             if url in self.visited:
                 return False
+            if self.alias_map.is_known(url):  # 이미 수집된 문서의 별칭
+                return False
                 
             # 깊이 제한 확인
             domain = parsed.netloc
@@ -317,8 +443,14 @@ class EnhancedCrawler:
 
     def clean_text_advanced(self, html, url):
         """향상된 텍스트 정제"""
+        blocks = self.extract_content_blocks(html, url)
+        return '\n'.join(block['text'] for block in blocks)
+
+    def extract_content_blocks(self, html, url):
+        """본문 텍스트 블록과 표 블록을 문서 순서대로 추출"""
         if url.lower().endswith('.pdf'):
-            return self.extract_pdf_text(html)
+            text = self.extract_pdf_text(html)
+            return [{'type': 'text', 'text': text}] if text else []
         
         try:
             soup = BeautifulSoup(html, "html.parser")
@@ -358,11 +490,14 @@ class EnhancedCrawler:
                             tag.extract()
                             break
             
+            # 표는 행 구조를 유지한 별도 블록으로 분리
+            table_blocks = extract_table_blocks(soup)
+            
             # 텍스트 추출
-            text = soup.get_text(separator="\\n", strip=True)
+            text = soup.get_text(separator="\n", strip=True)
             
             # 텍스트 정제
-            lines = text.split('\\n')
+            lines = text.split('\n')
             cleaned_lines = []
             
             for line in lines:
@@ -370,6 +505,11 @@ class EnhancedCrawler:
                 if not line:
                     continue
                 
+                # 표 자리표시자는 필터 없이 유지
+                if TABLE_PLACEHOLDER_PATTERN.match(line):
+                    cleaned_lines.append(line)
+                    continue
+                
                 # 불필요한 라인 패턴 제거
                 skip_patterns = [
                     r'^\\d+$',  # 숫자만 있는 라인
@@ -390,25 +530,32 @@ class EnhancedCrawler:
                 if not skip_line and len(line) > 2:  # 너무 짧은 라인 제외
                     cleaned_lines.append(line)
             
-            # 중복 라인 제거
-            unique_lines = []
+            # 중복 라인 제거 및 표 블록 분리
+            blocks = []
+            text_lines = []
             seen = set()
             for line in cleaned_lines:
-                if line not in seen:
-                    unique_lines.append(line)
+                placeholder = TABLE_PLACEHOLDER_PATTERN.match(line)
+                if placeholder:
+                    if text_lines:
+                        blocks.append({'type': 'text', 'text': '\n'.join(text_lines)})
+                        text_lines = []
+                    blocks.append(table_blocks[int(placeholder.group(1))])
+                elif line not in seen:
+                    text_lines.append(line)
                     seen.add(line)
-            
-            final_text = '\\n'.join(unique_lines)
+            if text_lines:
+                blocks.append({'type': 'text', 'text': '\n'.join(text_lines)})
             
             # 최소 텍스트 길이 확인 (기준 완화)
-            if len(final_text.strip()) < 30:
-                return ""
+            if sum(len(block['text']) for block in blocks) < 30:
+                return []
                 
-            return final_text.strip()
+            return blocks
             
         except Exception as e:
             logger.error(f"텍스트 정제 실패 {url}: {e}")
-            return ""
+            return []
 
     def extract_pdf_text(self, content):
         """PDF 텍스트 추출"""
@@ -424,7 +571,7 @@ class EnhancedCrawler:
                 for page in pdf.pages:
                     page_text = page.extract_text()
                     if page_text:
-                        text += page_text + "\\n"
+                        text += page_text + "\n"
             
             os.unlink(tmp_path)  # 임시 파일 삭제
             return text.strip()
@@ -434,42 +581,47 @@ class EnhancedCrawler:
             return ""
 
     def is_duplicate_content(self, text):
-        """고급 중복 콘텐츠 감지"""
-        if not self.saved_texts or len(text) < 100:
+        """고급 중복 콘텐츠 감지 (MinHash/LSH, 전체 코퍼스 대상)"""
+        if len(text) < 100:
             return False
         
         try:
-            # 텍스트 해시 기반 빠른 검사
-            text_hash = hashlib.md5(text.encode()).hexdigest()
-            text_hashes = [hashlib.md5(t.encode()).hexdigest() for t in self.saved_texts[-100:]]  # 최근 100개만 비교
-            
-            if text_hash in text_hashes:
-                return True
-            
-            # TF-IDF 기반 유사도 검사 (샘플링)
-            sample_texts = self.saved_texts[-50:] if len(self.saved_texts) > 50 else self.saved_texts
-            if sample_texts:
-                try:
-                    vectorizer = TfidfVectorizer(max_features=1000).fit_transform([text] + sample_texts)
-                    similarities = cosine_similarity(vectorizer[0:1], vectorizer[1:])[0]
-                    return any(similarity > 0.90 for similarity in similarities)
-                except:
-                    return False
-            
-            return False
+            match = self.duplicate_index.query(text)
+            if match:
+                logger.debug(f"유사 문서: {match[0]} (Jaccard≈{match[1]:.2f})")
+            return match is not None
             
         except Exception as e:
             logger.error(f"중복 검사 실패: {e}")
             return False
 
+    def extract_page(self, content, url):
+        """본문 블록/링크 추출 (동일 원본은 캐시 재사용)"""
+        key = self.extraction_cache.key_for(content)
+        entry = self.extraction_cache.get(key)
+        if entry is not None:
+            return entry
+        
+        blocks = self.extract_content_blocks(content, url)
+        text = '\n'.join(block['text'] for block in blocks)
+        
+        # href는 원문 그대로 저장하고 URL별로 절대경로 변환
+        soup = BeautifulSoup(content, "html.parser")
+        hrefs = [tag["href"] for tag in soup.find_all("a", href=True)]
+        fingerprint = hashlib.md5(text.encode()).hexdigest() if text else None
+        
+        return self.extraction_cache.put(key, text, hrefs, fingerprint, blocks=blocks)
+
     def extract_links(self, soup, base_url, current_depth):
         """링크 추출 및 우선순위 정렬"""
+        candidates = (urljoin(base_url, tag["href"]) for tag in soup.find_all("a", href=True))
+        return self.select_links(candidates, current_depth)
+
+    def select_links(self, candidates, current_depth):
+        """후보 절대 URL 중 유효한 링크를 우선순위로 선별"""
         links = set()
         
-        for tag in soup.find_all("a", href=True):
-            href = tag["href"]
-            absolute_url = urljoin(base_url, href)
-            
+        for absolute_url in candidates:
             if self.is_valid_url(absolute_url, current_depth + 1):
                 links.add(absolute_url)
                 self.url_depths[absolute_url] = current_depth + 1
@@ -510,9 +662,51 @@ class EnhancedCrawler:
             logger.error(f"Selenium 크롤링 실패 {url}: {e}")
             return None
 
+    def choose_fetch_mode(self, url):
+        """URL 템플릿별 수집 방식 결정 ('links', 'selenium', 'http')"""
+        if self.link_harvester.is_links_only(url):
+            return 'links'
+        # 특정 패턴은 Selenium 사용
+        if any(pattern in url for pattern in ['artclView.do', 'subview.do', 'board', 'bbs']):
+            return 'selenium'
+        return 'http'
+
+    def harvest_links_only(self, url):
+        """링크 전용 페이지 처리 (원본 바이트 정규식 스캔, DOM 생성 없음)"""
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+        }
+        response = requests.get(url, headers=headers, timeout=30)
+        if response.status_code != 200:
+            return None
+        
+        current_depth = self.url_depths.get(url, 0)
+        candidates = self.link_harvester.harvest(response.content, response.url or url)
+        
+        return {
+            'url': url,
+            'text': None,
+            'blocks': [],
+            'links': self.select_links(candidates, current_depth),
+            'depth': current_depth
+        }
+
+    def capture_response(self, url, content, final_url, response):
+        """원본 응답 보관 (HTTP 응답은 헤더와 원본 바이트 포함)"""
+        try:
+            if response is not None:
+                self.raw_archive.capture(url, response.content, final_url=final_url,
+                                         status=response.status_code, headers=response.headers,
+                                         encoding=response.encoding, fetch_mode='http')
+            else:
+                self.raw_archive.capture(url, content, final_url=final_url, fetch_mode='selenium')
+        except Exception as e:
+            logger.error(f"원본 보관 실패 {url}: {e}")
+
     def process_url(self, url_data):
         """단일 URL 처리"""
-        url, use_selenium = url_data
+        url, fetch_mode = url_data
+        use_selenium = fetch_mode == 'selenium'
         
         if url in self.visited:
             return None
@@ -524,13 +718,20 @@ class EnhancedCrawler:
             domain = urlparse(url).netloc
             self.domain_stats[domain] += 1
             
+            if fetch_mode == 'links':
+                return self.harvest_links_only(url)
+            
             content = None
+            final_url = url
+            response = None
             
             if use_selenium:
                 # JavaScript가 필요한 페이지 (재시도 로직 추가)
                 driver = self.create_selenium_driver()
                 try:
                     content = self.crawl_page_selenium(driver, url)
+                    if content:
+                        final_url = driver.current_url
                     if not content:
                         # 첫 번째 시도 실패 시 HTTP로 재시도
                         logger.warning(f"Selenium 실패, HTTP로 재시도: {url}")
@@ -540,6 +741,7 @@ class EnhancedCrawler:
                         response = requests.get(url, headers=headers, timeout=30)
                         if response.status_code == 200:
                             content = response.text
+                            final_url = response.url
                 finally:
                     driver.quit()
             else:
@@ -550,32 +752,52 @@ class EnhancedCrawler:
                 response = requests.get(url, headers=headers, timeout=30)
                 if response.status_code == 200:
                     content = response.text
+                    final_url = response.url
             
             if not content:
                 return None
             
-            # 텍스트 정제
-            cleaned_text = self.clean_text_advanced(content, url)
+            if self.raw_archive is not None:
+                self.capture_response(url, content, final_url, response)
+            
+            # 텍스트 정제 (본문/표 블록, 캐시 사용)
+            extracted = self.extract_page(content, url)
+            cleaned_text = extracted['text']
             
             if not cleaned_text or len(cleaned_text) < 50:
                 logger.warning(f"⚠️  텍스트 부족: {url}")
                 return None
             
+            # 별칭 검사 (리다이렉트 대상 또는 동일 본문이 이미 수집된 문서)
+            content_hash = extracted['fingerprint']
+            existing_doc = self.alias_map.lookup(url, final_url, content_hash)
+            if existing_doc:
+                self.alias_map.register(url, final_url, content_hash)
+                logger.info(f"🔗 별칭 URL: {url} → {self.alias_map.canonical_url(existing_doc)}")
+                return None
+            
             # 중복 검사
             if self.is_duplicate_content(cleaned_text):
                 logger.info(f"📋 중복 콘텐츠: {url}")
                 return None
             
+            doc_id, is_new = self.alias_map.register(url, final_url, content_hash)
+            if not is_new:
+                return None
+            
             # 링크 추출
-            soup = BeautifulSoup(content, "html.parser")
             current_depth = self.url_depths.get(url, 0)
-            new_links = self.extract_links(soup, url, current_depth)
+            candidates = (urljoin(url, href) for href in extracted['links'])
+            new_links = self.select_links(candidates, current_depth)
             
             return {
                 'url': url,
+                'doc_id': doc_id,
                 'text': cleaned_text,
+                'blocks': extracted['blocks'],
                 'links': new_links,
-                'depth': current_depth
+                'depth': current_depth,
+                'content_hash': content_hash
             }
             
         except Exception as e:
@@ -583,22 +805,50 @@ class EnhancedCrawler:
             return None
 
     def save_page(self, data, index):
-        """페이지 데이터 저장"""
+        """페이지 데이터 저장 (메모리에는 요약 레코드만 유지)"""
         filename = os.path.join(self.output_dir, f"page_{index:05d}.txt")
+        domain = urlparse(data['url']).netloc
+        timestamp = datetime.now().isoformat()
+        
+        header = f"[URL] {data['url']}\n"
+        header += f"[DOC_ID] {data['doc_id']}\n"
+        header += f"[DEPTH] {data['depth']}\n"
+        header += f"[DOMAIN] {domain}\n"
+        header += f"[TIMESTAMP] {timestamp}\n"
+        header += f"[LENGTH] {len(data['text'])}\n\n"
         
         try:
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(f"[URL] {data['url']}\\n")
-                f.write(f"[DEPTH] {data['depth']}\\n")
-                f.write(f"[DOMAIN] {urlparse(data['url']).netloc}\\n")
-                f.write(f"[TIMESTAMP] {datetime.now().isoformat()}\\n")
-                f.write(f"[LENGTH] {len(data['text'])}\\n\\n")
-                f.write(data['text'])
-            
-            self.saved_texts.append(data['text'])
-            self.saved_urls.append(data['url'])
+            # 본문은 한 곳에만 저장: .txt 파일 모드면 페이지 파일, 아니면 세그먼트 저장소
+            # 다른 URL/크롤러가 이미 저장한 본문이면 URL 참조만 기록
+            if self.write_text_files:
+                blob_key, is_new = self.blob_store.put(data['url'], data['text'], filename, source=self.output_dir)
+            else:
+                blob_key, is_new = self.blob_store.put(data['url'], data['text'], self.segment_location(data['doc_id']),
+                                                       exists=self.segment_exists, source=self.output_dir)
+            write_file = self.write_text_files and is_new
+            
+            if write_file:
+                self.page_writer.submit(filename, header + data['text'])
+            elif is_new:
+                self.corpus_store.put(data['doc_id'], data['text'], url=data['url'], domain=domain,
+                                      depth=data['depth'], timestamp=timestamp)
+            
+            self.duplicate_index.add(data['url'], data['text'], exact_hash=data['content_hash'])
+            
+            record = {
+                'url': data['url'],
+                'doc_id': data['doc_id'],
+                'hash': data['content_hash'],
+                'blob': blob_key,
+                'fingerprint': format(self.duplicate_index.fingerprinter.simhash(data['text']), '016x'),
+                'length': len(data['text']),
+            }
+            if write_file:
+                record.update(file=filename, offset=len(header.encode('utf-8')))
+            self.saved_pages.append(record)
+            self.checkpoint_log.append('saved', **record)
             
-            logger.info(f"✅ 저장: {data['url']} ({len(data['text'])}자)")
+            logger.debug(f"✅ 저장: {data['url']} ({len(data['text'])}자)")
             
         except Exception as e:
             logger.error(f"저장 실패 {data['url']}: {e}")
@@ -607,7 +857,7 @@ class EnhancedCrawler:
         """메인 크롤링 실행"""
         logger.info(f"🚀 고성능 크롤링 시작 - {self.max_workers}개 워커 사용")
         
-        page_index = len(self.saved_urls)
+        page_index = len(self.saved_pages)
         
         try:
             while self.to_visit:
@@ -622,17 +872,10 @@ class EnhancedCrawler:
                 for url in current_batch:
                     self.to_visit.remove(url)
                 
-                # JavaScript 필요 여부 판단
-                url_tasks = []
-                for url in current_batch:
-                    # 특정 패턴은 Selenium 사용
-                    use_selenium = any(pattern in url for pattern in [
-                        'artclView.do', 'subview.do', 'board', 'bbs'
-                    ])
-                    url_tasks.append((url, use_selenium))
+                # 템플릿별 수집 방식 결정 (링크 전용 / Selenium / HTTP)
+                url_tasks = [(url, self.choose_fetch_mode(url)) for url in current_batch]
                 
                 # 병렬 처리
-                results = []
                 with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
                     future_to_url = {executor.submit(self.process_url, task): task[0] 
                                    for task in url_tasks}
@@ -642,28 +885,33 @@ class EnhancedCrawler:
                         try:
                             result = future.result()
                             if result:
-                                results.append(result)
-                                
                                 # 방문 처리
                                 self.visited.add(result['url'])
+                                self.checkpoint_log.append('visited', url=result['url'])
                                 
                                 # 새 링크 추가
                                 new_links = result['links'] - self.visited
                                 self.to_visit.update(new_links)
+                                for link in new_links:
+                                    self.checkpoint_log.append('enqueued', url=link,
+                                                               depth=self.url_depths.get(link, 0))
                                 
-                                # 페이지 저장
-                                self.save_page(result, page_index)
-                                page_index += 1
+                                # 페이지 저장 (링크 전용 페이지는 본문 없음)
+                                if result['text']:
+                                    self.save_page(result, page_index)
+                                    page_index += 1
                                 
                         except Exception as e:
                             logger.error(f"결과 처리 실패 {url}: {e}")
                         
                         # 방문 처리 (실패한 경우에도)
+                        if url not in self.visited:
+                            self.checkpoint_log.append('failed', url=url)
                         self.visited.add(url)
                 
-                # 주기적 상태 저장
+                # 주기적 상태 저장 (변경분만 기록)
                 if page_index % 20 == 0:
-                    self.save_state()
+                    self.checkpoint()
                     logger.info(f"📊 진행 상황: 저장 {page_index}개, 대기 {len(self.to_visit)}개")
                 
                 # 서버 부하 방지 및 안정성 확보
@@ -671,16 +919,24 @@ class EnhancedCrawler:
                 
         except KeyboardInterrupt:
             logger.info("⏸️  사용자 중단 - 상태 저장 중...")
-            self.save_state()
         except Exception as e:
             logger.error(f"크롤링 오류: {e}")
-            self.save_state()
         
         finally:
+            self.page_writer.close()
             self.save_state()
+            self.checkpoint_log.close()
+            self.corpus_store.close()
+            if self.raw_archive is not None:
+                self.raw_archive.close()
+            self.manifest.commit()
             logger.info(f"🏁 크롤링 완료! 총 {page_index}개 페이지 저장")
+            blob_stats = self.blob_store.get_stats()
+            logger.info(f"🧬 내용 주소 저장소: URL {blob_stats['urls']:,}개 → 고유 본문 {blob_stats['unique_blobs']:,}개 (절감 {blob_stats['dedup_ratio']:.1%})")
+            logger.info(f"🗃️ 추출 캐시: {self.extraction_cache.stats} (적중률 {self.extraction_cache.hit_ratio():.1%})")
             logger.info(f"📈 도메인별 통계: {dict(self.domain_stats)}")
 
 if __name__ == "__main__":
-    crawler = EnhancedCrawler()
+    import sys
+    crawler = EnhancedCrawler(capture_raw='--capture-raw' in sys.argv)
     crawler.run()
\ No newline at end of file
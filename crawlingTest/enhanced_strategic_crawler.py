@@ -25,6 +25,10 @@ from collections import defaultdict, deque
 import hashlib
 from datetime import datetime
 import logging
+from table_extractor import inline_table_blocks
+from corpus_manifest import CorpusManifest
+from blob_store import BlobStore
+from page_writer import PageWriter
 
 # 로깅 설정
 logging.basicConfig(
@@ -50,6 +54,12 @@ class EnhancedStrategicCrawler:
         
         os.makedirs(self.output_dir, exist_ok=True)
         
+        # 코퍼스 매니페스트 (저장 시점에 페이지 메타데이터 기록)
+        self.manifest = CorpusManifest()
+        self.blob_store = BlobStore(manifest=self.manifest)  # 크롤러 간 공유 본문 색인 (본문은 페이지 파일에만 저장)
+        # 페이지 파일은 전용 스레드가 배치 기록 (크롤링 루프는 저장소 지연에 막히지 않음)
+        self.page_writer = PageWriter(self.output_dir, on_written=self.manifest.record)
+        
         # 크롤링 상태 (기존 데이터 무시)
         self.visited = set()
         self.to_visit = deque()
@@ -294,10 +304,13 @@ class EnhancedStrategicCrawler:
         for tag in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
             tag.decompose()
         
+        # 표는 행 단위로 직렬화하여 구조 유지
+        inline_table_blocks(soup)
+        
         # 텍스트 추출 및 정제
         text = soup.get_text()
         lines = [line.strip() for line in text.splitlines()]
-        text = '\\n'.join(line for line in lines if line and len(line) > 2)
+        text = '\n'.join(line for line in lines if line and len(line) > 2)
         
         return text
 
@@ -309,22 +322,27 @@ class EnhancedStrategicCrawler:
         filename = f"enhanced_strategic_page_{len(self.saved_texts):05d}.txt"
         filepath = os.path.join(self.output_dir, filename)
         
-        content = f"[URL] {page_data['url']}\\n"
-        content += f"[DEPTH] {page_data['depth']}\\n"
-        content += f"[DOMAIN] {page_data['domain']}\\n"
-        content += f"[TIMESTAMP] {page_data['timestamp']}\\n"
-        content += f"[LENGTH] {page_data['length']}\\n\\n"
+        content = f"[URL] {page_data['url']}\n"
+        content += f"[DEPTH] {page_data['depth']}\n"
+        content += f"[DOMAIN] {page_data['domain']}\n"
+        content += f"[TIMESTAMP] {page_data['timestamp']}\n"
+        content += f"[LENGTH] {page_data['length']}\n\n"
         content += page_data['content']
         
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # 다른 URL/크롤러가 이미 저장한 본문이면 URL 참조만 기록하고 파일은 만들지 않음
+            blob_key, is_new = self.blob_store.put(page_data['url'], page_data['content'], filepath,
+                                                   source=self.output_dir)
+            if not is_new:
+                logger.info(f"🧬 동일 본문 이미 저장됨: {page_data['url']} → {self.blob_store.holder(blob_key)}")
+                return False
             
+            self.page_writer.submit(filepath, content)
             self.saved_texts.append(filepath)
             self.saved_urls.append(page_data['url'])
             self.domain_stats[page_data['domain']] += 1
             
-            logger.info(f"💾 저장: {filename} ({page_data['domain']}) - {page_data['length']}자")
+            logger.debug(f"💾 저장: {filename} ({page_data['domain']}) - {page_data['length']}자")
             return True
             
         except Exception as e:
@@ -401,6 +419,11 @@ class EnhancedStrategicCrawler:
                 # 속도 조절
                 await asyncio.sleep(0.5)
         
+        self.page_writer.close()
+        self.manifest.commit()
+        blob_stats = self.blob_store.get_stats()
+        logger.info(f"🧬 내용 주소 저장소: URL {blob_stats['urls']:,}개 → 고유 본문 {blob_stats['unique_blobs']:,}개 (절감 {blob_stats['dedup_ratio']:.1%})")
+        
         logger.info("✅ 향상된 전략적 크롤링 완료")
         logger.info(f"📊 총 수집: {processed}개 페이지")
         logger.info(f"🌐 도메인별 통계: {dict(self.domain_stats)}")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+콘텐츠 해시 기반 추출 결과 캐시
+- 원본 바이트 해시 + 정제기 버전을 키로 사용
+- 정제 텍스트, 링크(href), 지문 저장 → 동일 본문 재파싱 방지
+- 메모리 LRU + 크롤러 실행 간 공유되는 디스크 계층(선택)
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(raw, cleaner_version):
+    """원본 바이트와 정제기 버전으로 캐시 키 생성"""
+    if isinstance(raw, str):
+        raw = raw.encode('utf-8')
+    digest = hashlib.sha256(raw).hexdigest()
+    return f"{cleaner_version}-{digest}"
+
+
+class ExtractionCache:
+    def __init__(self, cleaner_version, max_entries=5000, disk_dir=None):
+        self.cleaner_version = cleaner_version
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def key_for(self, raw):
+        """원본 바이트의 캐시 키"""
+        return content_key(raw, self.cleaner_version)
+
+    def _disk_path(self, key):
+        """디스크 계층 파일 경로 (해시 앞 2자리로 분산)"""
+        digest = key.rsplit('-', 1)[-1]
+        return os.path.join(self.disk_dir, digest[:2], f"{key}.json")
+
+    def _remember(self, key, entry):
+        """메모리 LRU에 저장 (초과 시 가장 오래된 항목 제거)"""
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, key):
+        """캐시 조회 (메모리 → 디스크 순)"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            if os.path.exists(path):
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        entry = json.load(f)
+                    with self.lock:
+                        self._remember(key, entry)
+                        self.stats['disk_hits'] += 1
+                    return entry
+                except Exception as e:
+                    logger.warning(f"캐시 파일 읽기 실패 {path}: {e}")
+
+        with self.lock:
+            self.stats['misses'] += 1
+        return None
+
+    def put(self, key, text, links, fingerprint=None, **extra):
+        """추출 결과 저장"""
+        entry = {
+            'text': text,
+            'links': list(links),
+            'fingerprint': fingerprint,
+        }
+        entry.update(extra)
+
+        with self.lock:
+            self._remember(key, entry)
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                logger.warning(f"캐시 파일 저장 실패 {path}: {e}")
+
+        return entry
+
+    def hit_ratio(self):
+        """캐시 적중률"""
+        hits = self.stats['hits'] + self.stats['disk_hits']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
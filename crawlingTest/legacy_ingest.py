@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+구버전 코퍼스 일괄 적재 (헤더 포맷 복구)
+- enhanced/unlimited/enhanced_strategic 크롤러가 줄바꿈 대신 이스케이프 '\\n'으로 기록한 파일 감지 및 복구
+- 모든 출력 디렉토리를 병렬 워커로 스트리밍 파싱 → 세그먼트 코퍼스 저장소에 한 번에 적재 (문서 ID 기준 중복 제외)
+- --rewrite 지정 시 복구한 내용으로 원본 파일도 교체하고 매니페스트 갱신
+- 디렉토리별 보고: 파일 수, 복구 수, URL 없음, 중복, 적재 수, 용량
+"""
+
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import logging
+from corpus_manifest import CorpusManifest, parse_page
+from segment_store import SegmentStore
+from url_alias import canonicalize_url, document_id
+
+logger = logging.getLogger(__name__)
+
+LEGACY_DIRECTORIES = ["enhanced_output", "strategic_output", "enhanced_strategic_output", "unlimited_crawling_output"]
+ESCAPED_NEWLINE = '\\n'
+
+
+def is_escaped_format(content):
+    """첫 줄 안에 이스케이프된 헤더 구분이 있으면 구버전 포맷"""
+    first_line = content.split('\n', 1)[0]
+    return first_line.startswith('[') and (ESCAPED_NEWLINE + '[') in first_line
+
+
+def repair_content(content):
+    """BOM/CRLF 정리 후 구버전 포맷이면 이스케이프 줄바꿈 복원 → (내용, 복구 여부)"""
+    content = content.lstrip('\ufeff').replace('\r\n', '\n')
+    if is_escaped_format(content):
+        return content.replace(ESCAPED_NEWLINE, '\n'), True
+    return content, False
+
+
+def parse_legacy_file(path):
+    """워커: 파일 하나 읽기 → 복구/파싱 결과 dict"""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            content, repaired = repair_content(f.read())
+    except OSError as e:
+        return {'path': path, 'error': str(e)}
+
+    header, body, _ = parse_page(content)
+    url = header.get('URL', '')
+    depth = header.get('DEPTH')
+    return {
+        'path': path,
+        'url': url,
+        'doc_id': header.get('DOC_ID') or (document_id(canonicalize_url(url)) if url else None),
+        'domain': header.get('DOMAIN'),
+        'depth': int(depth) if depth and depth.isdigit() else 0,
+        'timestamp': header.get('TIMESTAMP'),
+        'body': body.strip(),
+        'content': content if repaired else None,
+        'repaired': repaired,
+    }
+
+
+def iter_tasks(directories):
+    """(디렉토리, 파일 경로) 스트림"""
+    for directory in directories:
+        if not os.path.isdir(directory):
+            logger.warning(f"⚠️ 디렉토리 없음: {directory}")
+            continue
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.txt') and entry.is_file():
+                    yield directory, entry.path
+
+
+def ingest(directories=LEGACY_DIRECTORIES, store_dir="corpus_store", workers=None,
+           batch_size=512, rewrite=False):
+    """구버전 디렉토리 병렬 적재 → 디렉토리별 보고"""
+    store = SegmentStore(store_dir)
+    manifest = CorpusManifest() if rewrite else None
+    report = defaultdict(lambda: defaultdict(int))
+    started = time.time()
+
+    def handle(directory, result):
+        stats = report[directory]
+        stats['files'] += 1
+        if 'error' in result:
+            stats['errors'] += 1
+            logger.warning(f"읽기 실패 {result['path']}: {result['error']}")
+            return
+        if result['repaired']:
+            stats['repaired'] += 1
+            if rewrite:
+                tmp_path = f"{result['path']}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(result['content'])
+                os.replace(tmp_path, result['path'])
+                manifest.record(result['path'], result['content'])
+        if not result['url']:
+            stats['missing_url'] += 1
+        doc_id = result['doc_id'] or document_id(os.path.normpath(result['path']))
+        if doc_id in store or not result['body']:
+            stats['skipped'] += 1
+            return
+        store.put(doc_id, result['body'], url=result['url'], domain=result['domain'],
+                  depth=result['depth'], timestamp=result['timestamp'],
+                  source_file=os.path.normpath(result['path']))
+        stats['stored'] += 1
+        stats['bytes'] += len(result['body'].encode('utf-8'))
+
+    def run_batch(executor, batch):
+        results = executor.map(parse_legacy_file, [path for _, path in batch], chunksize=32)
+        for (directory, _), result in zip(batch, results):
+            handle(directory, result)
+
+    # 배치 단위로 워커에 넘겨 메모리에는 배치 하나 분량만 유지
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        batch = []
+        for task in iter_tasks(directories):
+            batch.append(task)
+            if len(batch) >= batch_size:
+                run_batch(executor, batch)
+                batch = []
+        if batch:
+            run_batch(executor, batch)
+
+    store.close()
+    if manifest:
+        manifest.close()
+
+    elapsed = time.time() - started
+    print(f"📥 구버전 코퍼스 적재 완료 → {store_dir} ({elapsed:.1f}초, 저장소 문서 {len(store):,}개)")
+    print(f"   {'디렉토리':<28}{'파일':>8}{'복구':>8}{'URL없음':>8}{'중복/빈본문':>10}{'적재':>8}{'MB':>8}")
+    for directory, stats in report.items():
+        print(f"   {directory:<28}{stats['files']:>8,}{stats['repaired']:>8,}{stats['missing_url']:>8,}"
+              f"{stats['skipped']:>10,}{stats['stored']:>8,}{stats['bytes'] / 1024 / 1024:>8.1f}")
+    return {directory: dict(stats) for directory, stats in report.items()}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args = [arg for arg in sys.argv[1:] if arg != '--rewrite']
+    ingest(args or LEGACY_DIRECTORIES, rewrite='--rewrite' in sys.argv)
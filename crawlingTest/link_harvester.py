@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+링크 전용 고속 수집 모듈
+- 게시판 목록/인덱스 페이지처럼 링크만 필요한 페이지용
+- DOM 생성 없이 원본 바이트에서 정규식으로 href 추출
+- 베이스 URL 파싱 결과 캐시
+- 페이지 템플릿별 수집 모드 결정
+"""
+
+import re
+import html
+from functools import lru_cache
+from urllib.parse import urljoin, urlsplit
+
+# <a ... href="..."> (따옴표 유무 모두 허용)
+HREF_PATTERN = re.compile(
+    rb'<a\b[^>]*?\shref\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))',
+    re.IGNORECASE
+)
+BASE_HREF_PATTERN = re.compile(
+    rb'<base\b[^>]*?\shref\s*=\s*["\']?([^"\'\s>]+)',
+    re.IGNORECASE
+)
+CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w-]+)', re.IGNORECASE)
+
+# 링크만 수집하면 되는 페이지 템플릿 (게시판 목록, 목록 페이지네이션 등)
+DEFAULT_LINKS_ONLY_TEMPLATES = [
+    r'/bbs/[^/]+/\d+/artclList\.do',           # K2Web 게시판 목록
+    r'/board\.php\?bo_table=[^&]+(&page=\d+)?$',  # 그누보드 게시판 목록
+    r'/list(\.\w+)?/?\?([^#]*&)?page=\d+',      # 목록 엔드포인트 페이지네이션 (예: FxLibrary bbs/list)
+    r'/sitemap',                              # 사이트맵
+]
+
+# 링크 전용 템플릿과 겹쳐도 본문을 저장해야 하는 게시글 보기 페이지 (page 파라미터가 붙은 글 보기 등)
+CONTENT_TEMPLATES = [
+    r'artclView\.do',                         # K2Web 게시글
+    r'/view(\.\w+)?/?(\?|$)',                   # 게시글 보기 (예: FxLibrary bbs/view)
+    r'[?&]wr_id=\d+',                         # 그누보드 게시글
+]
+
+SKIP_HREF_PREFIXES = ('#', 'javascript:', 'mailto:', 'tel:')
+
+
+@lru_cache(maxsize=4096)
+def _split_base(base_url):
+    """베이스 URL 분해 결과 캐시 (scheme, 'scheme://netloc')"""
+    parts = urlsplit(base_url)
+    return parts.scheme, f"{parts.scheme}://{parts.netloc}"
+
+
+def resolve_href(base_url, href):
+    """href를 절대 URL로 변환 (흔한 형태는 urljoin 없이 처리)"""
+    if href.startswith(('http://', 'https://')):
+        return href
+    scheme, origin = _split_base(base_url)
+    if href.startswith('//'):
+        return f"{scheme}:{href}"
+    if href.startswith('/'):
+        return origin + href
+    return urljoin(base_url, href)
+
+
+class LinkHarvester:
+    def __init__(self, links_only_templates=None):
+        templates = links_only_templates or DEFAULT_LINKS_ONLY_TEMPLATES
+        self.links_only_patterns = [re.compile(p, re.IGNORECASE) for p in templates]
+        self.content_patterns = [re.compile(p, re.IGNORECASE) for p in CONTENT_TEMPLATES]
+
+    def is_links_only(self, url):
+        """링크 전용 템플릿 여부 (게시글 보기 페이지는 항상 본문 수집)"""
+        if any(pattern.search(url) for pattern in self.content_patterns):
+            return False
+        return any(pattern.search(url) for pattern in self.links_only_patterns)
+
+    def detect_encoding(self, raw, default='utf-8'):
+        """문서 앞부분의 meta charset 확인"""
+        match = CHARSET_PATTERN.search(raw[:2048])
+        if match:
+            return match.group(1).decode('ascii', 'ignore') or default
+        return default
+
+    def harvest(self, raw, base_url):
+        """원본 HTML 바이트에서 절대 URL 목록 추출 (문서 순서, 중복 제거)"""
+        if isinstance(raw, str):
+            raw = raw.encode('utf-8')
+
+        base_match = BASE_HREF_PATTERN.search(raw)
+        if base_match:
+            base_url = resolve_href(base_url, base_match.group(1).decode('utf-8', 'ignore'))
+
+        encoding = self.detect_encoding(raw)
+        links = []
+        seen = set()
+
+        for match in HREF_PATTERN.finditer(raw):
+            value = match.group(1) or match.group(2) or match.group(3)
+            if not value:
+                continue
+            try:
+                href = value.decode(encoding, 'replace')
+            except LookupError:
+                href = value.decode('utf-8', 'replace')
+            href = html.unescape(href).strip()
+            if not href or href.lower().startswith(SKIP_HREF_PREFIXES):
+                continue
+
+            absolute_url = resolve_href(base_url, href)
+            if absolute_url not in seen:
+                seen.add(absolute_url)
+                links.append(absolute_url)
+
+        return links
@@ -2,242 +2,517 @@
 """
 기존 + 신규 크롤링 데이터 통합 스크립트
 RAG 시스템 임베딩용 데이터 준비
+- 프로세스 풀이 파일을 청크 단위로 읽어 본문 키/MinHash 서명/페이지별 품질 특징만 반환 (본문은 메모리에 유지하지 않음)
+- 품질 점수는 저장된 페이지별 특징으로 코퍼스 전체 특징(상용구 줄, 클러스터 크기)만 부모에서 계산해 일괄 산출
+  (임계값 + 도메인별 상위 k개 → 통과 후보), 가중치는 quality_weights.json (없으면 기본 가중치)
+- 요약 메타데이터로 품질 순위 → 중복 제거 → 통합 결과를 세그먼트 저장소 하나로 순차 기록
+- Node 임베딩 스크립트 호환용 .txt 뷰는 같은 순회에서 함께 기록
+- 증분 통합: 이전 실행의 (경로, mtime, 크기, 본문 해시) 상태와 비교해 추가/변경 파일만 분석,
+  저장된 요약 메타데이터로 통과 집합을 다시 계산하고 추가/갱신/삭제 델타(merge_delta.json) 기록
+- merge_delta.json 은 임베딩이 확인(merge_delta.acked.json 으로 이동)할 때까지 미반영 델타로 유지,
+  다음 통합의 델타는 여기에 합쳐짐 → 임베딩이 실패/생략되어도 변경분이 사라지지 않음
+- 통합 뷰 구성 방식(--view): link(기본, 원본 파일 reflink/하드 링크), virtual(merged_view.jsonl 목록만),
+  copy(세그먼트 저장소 + .txt 기록) → link/virtual은 본문 바이트를 복사하지 않아 재구성 시간이 파일 수에 비례
 """
 
 import os
+import sys
+import errno
 import shutil
 import json
-import re
+import hashlib
 from datetime import datetime
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import logging
+from near_duplicate_index import NearDuplicateIndex
+from url_alias import AliasMap, canonicalize_url, document_id
+from corpus_manifest import CorpusManifest, file_fingerprint, parse_page
+from quality_engine import QualityEngine, page_features, threshold_mask, top_k_per_domain
+from blob_store import content_key
+from legacy_ingest import repair_content, is_escaped_format
+from segment_store import SegmentStore
+from state_codec import write_state_file, load_state_file
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 통합 대상 출력 디렉토리 → 파일 접두어 (앞 디렉토리가 중복 시 우선)
+MERGE_SOURCES = [
+    ("enhanced_output", "existing"),
+    ("strategic_output", "strategic"),
+    ("enhanced_strategic_output", "enhanced_strategic"),
+    ("unlimited_crawling_output", "unlimited"),
+]
+MIN_QUALITY_SCORE = 0.0       # quality_engine 선형 점수 임계값
+MAX_PAGES_PER_DOMAIN = 1000   # 도메인별 최대 통과 후보 수 (한 도메인이 코퍼스를 채우지 않도록)
+NEAR_DUPLICATE_THRESHOLD = 0.90
+VIEW_MODES = ("link", "virtual", "copy")
+DELTA_KINDS = ("add", "update", "delete")
+SCAN_FORMAT = 2  # scan_page 결과 형식 (바뀌면 이전 상태의 요약 메타데이터를 재사용하지 않음)
+FICLONE = 0x40049409  # Linux ioctl: 파일 내용 블록 공유 (btrfs/XFS reflink)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+_signer = None
+
+
+def load_pending_delta(delta_file):
+    """임베딩이 아직 확인하지 않은 델타 (없으면 None)"""
+    if not os.path.exists(delta_file):
+        return None
+    with open(delta_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def fold_delta(pending, changes):
+    """미반영 델타에 새 델타 합치기 (문서 이름별 마지막 변경 기준)"""
+    latest = {}
+    for kind in DELTA_KINDS:
+        for item in pending.get(kind, []):
+            latest[item['name']] = (kind, item)
+    for kind in DELTA_KINDS:
+        for item in changes[kind]:
+            folded = kind
+            previous = latest.get(item['name'])
+            if kind != "delete" and previous is not None:
+                # 아직 임베딩되지 않은 추가는 추가로 유지, 그 외(삭제 후 재등장 등)는 기존 청크 교체
+                folded = "add" if previous[0] == "add" else "update"
+            latest[item['name']] = (folded, item)
+
+    result = {kind: [] for kind in DELTA_KINDS}
+    for name, (kind, item) in sorted(latest.items()):
+        result[kind].append(item)
+    return result
+
+
+def _init_worker():
+    """워커 프로세스별 MinHash 서명기 (통합 단계 중복 인덱스와 같은 파라미터)"""
+    global _signer
+    _signer = NearDuplicateIndex(threshold=NEAR_DUPLICATE_THRESHOLD)
+
+
+def scan_page(task):
+    """워커: 파일 하나 분석 → 요약 메타데이터 + 페이지별 품질 특징 (본문 제외, 점수는 score_entries에서 일괄 계산)"""
+    path, url, domain, length, fingerprint = task
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except OSError as e:
+        logger.warning(f"❌ 파일 분석 오류 {path}: {e}")
+        return None
+
+    body = parse_page(content)[1]
+    return {
+        'path': path,
+        'url': url,
+        'domain': domain,
+        'length': length,
+        'blob': content_key(body),
+        'exact_hash': hashlib.md5(body.encode()).hexdigest(),
+        'signature': _signer.signature(body),
+        'escaped': is_escaped_format(content),
+        'quality_features': page_features(body.replace('\\n', '\n')),
+        'fingerprint': fingerprint,
+        'scan_format': SCAN_FORMAT,
+    }
+
+
 class CrawlingDataMerger:
-    def __init__(self):
-        self.existing_dir = "enhanced_output"
-        self.strategic_dir = "strategic_output"
+    def __init__(self, workers=None, chunk_size=64, view_mode="link"):
+        if view_mode not in VIEW_MODES:
+            raise ValueError(f"알 수 없는 통합 뷰 방식: {view_mode} ({', '.join(VIEW_MODES)})")
+        self.source_dirs = MERGE_SOURCES
         self.merged_dir = "merged_output"
+        self.store_dir = os.path.join(self.merged_dir, "corpus")
+        self.state_file = os.path.join(self.merged_dir, "merge_state.msgpack")
+        self.delta_file = os.path.join(self.merged_dir, "merge_delta.json")
+        self.view_file = os.path.join(self.merged_dir, "merged_view.jsonl")
+        self.alias_file = "enhanced_url_aliases.json"
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.view_mode = view_mode
+        self.reflink_supported = fcntl is not None
+        self.quality_engine = QualityEngine.from_file()
         self.stats = defaultdict(int)
-        
+        self.domain_stats = defaultdict(int)
+
     def create_merged_directory(self):
-        """통합 디렉토리 생성"""
+        """통합 디렉토리 생성 (임베딩이 확인하지 않은 델타는 새 디렉토리로 이어받음)"""
         if os.path.exists(self.merged_dir):
             backup_dir = f"{self.merged_dir}_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             shutil.move(self.merged_dir, backup_dir)
             logger.info(f"📁 기존 디렉토리 백업: {backup_dir}")
-        
+            os.makedirs(self.merged_dir, exist_ok=True)
+            pending_file = os.path.join(backup_dir, os.path.basename(self.delta_file))
+            if os.path.exists(pending_file):
+                shutil.copy2(pending_file, self.delta_file)
+
         os.makedirs(self.merged_dir, exist_ok=True)
         logger.info(f"📁 통합 디렉토리 생성: {self.merged_dir}")
 
-    def analyze_file_content(self, filepath):
-        """파일 내용 분석"""
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # URL과 도메인 추출
-            url_match = re.search(r'\[URL\] (https?://[^\n]+)', content)
-            domain_match = re.search(r'\[DOMAIN\] ([^\n]+)', content)
-            length_match = re.search(r'\[LENGTH\] (\d+)', content)
-            
-            url = url_match.group(1) if url_match else ""
-            domain = domain_match.group(1) if domain_match else ""
-            length = int(length_match.group(1)) if length_match else len(content)
-            
-            # 품질 분석
-            quality_score = self.calculate_quality_score(content, url)
-            
-            return {
-                'url': url,
-                'domain': domain,
-                'length': length,
-                'quality_score': quality_score,
-                'content': content
-            }
-            
-        except Exception as e:
-            logger.warning(f"❌ 파일 분석 오류 {filepath}: {e}")
-            return None
+    def score_entries(self, entries):
+        """저장된 페이지별 특징으로 품질 점수 일괄 계산 (본문 재읽기 없음) → 임계값 + 도메인별 상위 k개 통과 여부 기록"""
+        if not entries:
+            return
+        matrix = self.quality_engine.page_matrix([entry['quality_features'] for entry in entries],
+                                                 [entry['url'] for entry in entries],
+                                                 cluster_keys=np.array([entry['exact_hash'] for entry in entries]))
+        scores = self.quality_engine.score(matrix)
+        _, domain_codes = np.unique([entry['domain'] for entry in entries], return_inverse=True)
+        passed = threshold_mask(scores, MIN_QUALITY_SCORE) & \
+            top_k_per_domain(scores, domain_codes, MAX_PAGES_PER_DOMAIN)
+
+        for entry, score, ok in zip(entries, scores.tolist(), passed.tolist()):
+            entry['quality_score'] = round(score, 4)
+            entry['quality_pass'] = ok
+        logger.info(f"🧮 품질 점수: {len(entries):,}개 중 {int(passed.sum()):,}개 통과 후보 "
+                    f"(점수 {MIN_QUALITY_SCORE} 이상, 도메인별 상위 {MAX_PAGES_PER_DOMAIN}개)")
 
-    def calculate_quality_score(self, content, url):
-        """컨텐츠 품질 점수 계산"""
-        score = 0
-        
-        # 길이 점수 (100-2000자: 최고점)
-        content_length = len(content)
-        if 100 <= content_length <= 2000:
-            score += 10
-        elif 50 <= content_length < 100:
-            score += 5
-        elif content_length > 2000:
-            score += 7
-        
-        # URL 패턴 점수
-        if '/bbs/' in url and 'artclView.do' in url:
-            score += 15  # 게시판 게시글
-        elif '/bbs/' in url:
-            score += 10  # 게시판 목록
-        elif 'subview.do' in url:
-            score += 8   # 서브페이지
-        elif '/index.do' in url:
-            score += 5   # 메인페이지
-        
-        # 도메인 점수
-        if 'ce.daejin.ac.kr' in url:
-            score += 5   # 컴공과 우대
-        elif 'www.daejin.ac.kr' in url:
-            score += 3   # 메인 사이트
-        elif any(dept in url for dept in ['law', 'eng', 'food', 'nurse']):
-            score += 4   # 주요 학과
-        
-        # 전자책 페이지 감점
-        if 'ebook.daejin.ac.kr' in url:
-            if any(pattern in url for pattern in ['search', 'keyword', 'category']):
-                score -= 10  # 검색/목록 페이지
+    def scan_directory(self, executor, source_dir, prefix, previous):
+        """디렉토리 요약 메타데이터 (이전 실행과 같은 파일은 재사용, 추가/변경 파일만 병렬 분석)"""
+        # 디렉토리 재탐색 대신 매니페스트 조회 (새 파일만 보충)
+        self.manifest.sync_directory(source_dir)
+        entries, tasks, doc_ids = [], [], {}
+        for page in self.manifest.pages(source_dir):
+            doc_ids[page['path']] = self.stable_doc_id(page)
+            fingerprint = file_fingerprint(page['path'], page['content_hash'])
+            known = previous.get(page['path'])
+            if known is not None and known['fingerprint'] == fingerprint and known.get('scan_format') == SCAN_FORMAT:
+                entries.append(known)
             else:
-                score -= 5   # 일반 전자책 페이지
-        
-        # 컨텐츠 품질 확인
-        if '공지사항' in content or '안내' in content:
-            score += 3
-        if '교육과정' in content or '교수' in content:
-            score += 3
-        if '입학' in content or '모집' in content:
-            score += 2
-        
-        return max(0, score)  # 음수 방지
-
-    def filter_and_copy_files(self, source_dir, prefix):
-        """파일 필터링 및 복사"""
-        if not os.path.exists(source_dir):
-            logger.warning(f"⚠️ 소스 디렉토리 없음: {source_dir}")
-            return 0
-        
-        files = [f for f in os.listdir(source_dir) if f.endswith('.txt')]
-        copied_count = 0
-        
-        logger.info(f"📊 {source_dir} 분석 중... ({len(files):,}개 파일)")
-        
-        # 품질 기준으로 정렬
-        file_scores = []
-        for filename in files:
-            filepath = os.path.join(source_dir, filename)
-            analysis = self.analyze_file_content(filepath)
-            
-            if analysis and analysis['quality_score'] > 0:
-                file_scores.append((filename, analysis))
-        
-        # 품질 점수 순으로 정렬
-        file_scores.sort(key=lambda x: x[1]['quality_score'], reverse=True)
-        
-        # 고품질 파일만 복사
-        for filename, analysis in file_scores:
-            # 품질 필터링
-            if analysis['quality_score'] < 5:  # 최소 품질 기준
-                continue
-                
-            # 중복 URL 제거 (이미 처리된 URL인지 확인)
-            url_hash = hash(analysis['url'])
-            if url_hash in self.processed_urls:
-                self.stats['duplicates'] += 1
+                tasks.append((page['path'], page['url'] or "", page['domain'] or "", page['length'], fingerprint))
+
+        logger.info(f"📊 {source_dir} 분석 중... ({len(tasks):,}개 파일, 변경 없음 {len(entries):,}개)")
+        entries.extend(executor.map(scan_page, tasks, chunksize=self.chunk_size))
+        self.stats['scanned'] += len(tasks)
+
+        scanned = [entry for entry in entries if entry]
+        for entry in scanned:
+            entry['prefix'] = prefix
+            entry['doc_id'] = doc_ids[entry['path']]
+        return scanned
+
+    def stable_doc_id(self, page):
+        """실행/프로세스와 무관한 문서 ID (별칭 맵 → 크롤러 기록 DOC_ID → 정규 URL 해시)"""
+        url = page['url'] or ""
+        return (self.alias_map.resolve(url) if url else None) or page['doc_id'] or \
+            document_id(canonicalize_url(url) if url else os.path.normpath(page['path']))
+
+    def is_duplicate(self, entry):
+        """문서 ID(별칭 포함) / 동일 본문 / 유사 본문 중복 확인 (통과하면 등록)"""
+        if entry['doc_id'] in self.processed_docs:
+            self.stats['duplicates'] += 1
+            return True
+        self.processed_docs.add(entry['doc_id'])
+
+        # 동일 본문 제거 (정규화 본문 해시, 디렉토리/줄바꿈 포맷 무관)
+        if entry['blob'] in self.seen_blobs:
+            self.stats['identical_content'] += 1
+            return True
+        self.seen_blobs.add(entry['blob'])
+
+        # 유사 중복 제거 (다른 URL의 유사 본문)
+        if self.duplicate_index.query(signature=entry['signature'], exact_hash=entry['exact_hash']):
+            self.stats['near_duplicates'] += 1
+            return True
+        self.duplicate_index.add(entry['url'], signature=entry['signature'], exact_hash=entry['exact_hash'])
+        return False
+
+    def output_name(self, entry):
+        """통합 결과 이름 (문서 ID 기준이라 실행/정렬 순서와 무관)"""
+        return f"doc_{entry['doc_id']}"
+
+    def write_page(self, entry, name):
+        """통과한 페이지를 통합 뷰에 반영 (구버전 포맷은 복구한 내용을 기록, 그 외는 방식별 링크/목록만)"""
+        text_path = os.path.join(self.merged_dir, f"{name}.txt")
+        if self.view_mode != "copy" and not entry.get('escaped', True):
+            if self.view_mode == "link":
+                self.stats[f"view_{self.link_file(entry['path'], text_path)}"] += 1
+            elif os.path.exists(text_path):
+                os.remove(text_path)  # 이전 실행이 기록한 파일 대신 원본 경로 참조
+            return
+
+        with open(entry['path'], 'r', encoding='utf-8') as f:
+            content, _ = repair_content(f.read())
+        if self.view_mode == "copy":
+            self.store.put(entry['doc_id'], parse_page(content)[1], url=entry['url'], domain=entry['domain'],
+                           quality=entry['quality_score'], source_file=entry['path'], name=name)
+        with open(text_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        self.stats['view_written'] += 1
+
+    def link_file(self, source, target):
+        """원본 파일을 통합 뷰 경로로 연결: reflink → 하드 링크 → 복사 순 (사용한 방식 반환)
+
+        하드 링크는 원본과 inode를 공유하므로 원본을 제자리 수정하면 뷰도 바로 바뀜 (다음 통합에서 갱신으로 기록)
+        """
+        tmp_path = f"{target}.tmp"
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+
+        if self.reflink_supported:
+            try:
+                with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                os.replace(tmp_path, target)
+                return "reflink"
+            except OSError as e:
+                os.remove(tmp_path)
+                if e.errno not in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL):
+                    raise
+                self.reflink_supported = False  # 파일시스템 미지원 → 이후 시도 생략
+                logger.info(f"🔗 reflink 미지원 → 하드 링크 사용 ({e.strerror})")
+
+        try:
+            os.link(source, tmp_path)
+            method = "hardlink"
+        except OSError:
+            shutil.copy2(source, tmp_path)  # 다른 파일시스템 등
+            method = "copy"
+        os.replace(tmp_path, target)
+        return method
+
+    def remove_page(self, name, entry):
+        """더 이상 통과하지 않는 페이지를 통합 결과에서 삭제"""
+        if self.view_mode == "copy":
+            self.store.delete(entry.get('doc_id', name))
+        text_path = os.path.join(self.merged_dir, f"{name}.txt")
+        if os.path.exists(text_path):
+            os.remove(text_path)
+
+    def write_view(self, accepted):
+        """통합 뷰 목록 (이름 → 실제 읽을 파일 경로), 파일 수에 비례하는 비용으로 매 실행 재작성"""
+        tmp_path = f"{self.view_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for name, entry in sorted(accepted.items()):
+                text_path = os.path.join(self.merged_dir, f"{name}.txt")
+                source = text_path if os.path.exists(text_path) else entry['path']
+                f.write(json.dumps({'name': name, 'doc_id': entry['doc_id'], 'file': f"{name}.txt",
+                                    'source': os.path.abspath(source), 'url': entry['url'],
+                                    'domain': entry['domain'], 'quality': entry['quality_score']},
+                                   ensure_ascii=False) + '\n')
+        os.replace(tmp_path, self.view_file)
+
+    def select_pages(self, entries, source_dir, prefix):
+        """품질 순위 + 중복 제거로 디렉토리의 통과 페이지 선정 → {이름: 요약 메타데이터}"""
+        # 품질 점수 순으로 정렬 (score_entries 통과 후보만, 같은 점수는 경로 순)
+        candidates = [entry for entry in entries if entry['quality_pass']]
+        candidates.sort(key=lambda entry: (-entry['quality_score'], entry['path']))
+
+        accepted = {}
+        for entry in candidates:
+            if self.is_duplicate(entry):
                 continue
-            
-            self.processed_urls.add(url_hash)
-            
-            # 파일 복사
-            source_path = os.path.join(source_dir, filename)
-            target_filename = f"{prefix}_{copied_count:05d}.txt"
-            target_path = os.path.join(self.merged_dir, target_filename)
-            
+            accepted[self.output_name(entry)] = entry
+
+            # 통계 업데이트
+            self.stats['total_files'] += 1
+            self.stats[f'{prefix}_files'] += 1
+            self.domain_stats[entry['domain']] += 1
+
+        logger.info(f"✅ {source_dir}: {len(accepted):,}개 파일 통과")
+        return accepted
+
+    @staticmethod
+    def diff_accepted(previous_accepted, accepted):
+        """이전 통과 집합과 비교 → 추가/갱신/삭제 이름 (델타)"""
+        delta = {'add': [], 'update': [], 'delete': []}
+        for name, entry in accepted.items():
+            known = previous_accepted.get(name)
+            if known is None:
+                delta['add'].append(name)
+            elif known['fingerprint'] != entry['fingerprint'] or known['path'] != entry['path']:
+                delta['update'].append(name)
+        delta['delete'] = sorted(set(previous_accepted) - set(accepted))
+        return delta
+
+    def apply_delta(self, previous_accepted, accepted):
+        """이전 통과 집합과 비교해 추가/갱신/삭제만 기록 → 델타"""
+        delta = self.diff_accepted(previous_accepted, accepted)
+        for count, name in enumerate(delta['add'] + delta['update'], 1):
             try:
-                shutil.copy2(source_path, target_path)
-                copied_count += 1
-                
-                # 통계 업데이트
-                self.stats['total_files'] += 1
-                self.stats[f'{prefix}_files'] += 1
-                self.stats[analysis['domain']] += 1
-                
-                if copied_count % 500 == 0:
-                    logger.info(f"   복사 진행: {copied_count:,}개 완료")
-                    
+                self.write_page(accepted[name], name)
             except Exception as e:
-                logger.error(f"❌ 파일 복사 오류 {filename}: {e}")
-        
-        logger.info(f"✅ {source_dir}: {copied_count:,}개 파일 복사 완료")
-        return copied_count
+                logger.error(f"❌ 파일 기록 오류 {accepted[name]['path']}: {e}")
+            if count % 500 == 0:
+                logger.info(f"   기록 진행: {count:,}개 완료")
+        for name in delta['delete']:
+            self.remove_page(name, previous_accepted[name])
+
+        return delta
+
+    def save_state(self, entries, accepted):
+        """다음 증분 실행용 상태 (요약 메타데이터 + 서명) 저장"""
+        accepted_paths = {entry['path']: name for name, entry in accepted.items()}
+        state = {
+            'entries': [dict(entry, signature=entry['signature'].tobytes(), name=accepted_paths.get(entry['path']))
+                        for entry in entries],
+            'view_mode': self.view_mode,
+            'saved_at': datetime.now().isoformat(),
+        }
+        write_state_file(self.state_file, state)
+
+    def load_previous_state(self):
+        """이전 실행 상태 → ({경로: 요약 메타데이터}, {이름: 요약 메타데이터}), 없으면 None"""
+        state = load_state_file(self.state_file)
+        if state is None or state.get('view_mode', 'copy') != self.view_mode:
+            return None  # 뷰 방식이 바뀌면 전체 재구성
+        if self.view_mode == "copy" and not os.path.exists(self.store_dir):
+            return None
+        previous, previous_accepted = {}, {}
+        for entry in state['entries']:
+            entry['signature'] = np.frombuffer(entry['signature'], dtype=np.uint32)
+            name = entry.pop('name')
+            previous[entry['path']] = entry
+            if name:
+                previous_accepted[name] = entry
+        return previous, previous_accepted
+
+    def write_delta(self, delta, accepted, previous_accepted):
+        """다운스트림 임베딩용 델타 기록 (.txt 뷰 파일명 + URL, 미반영 델타가 있으면 합침) → 미반영 델타 전체"""
+        def describe(name, entry):
+            return {'name': name, 'doc_id': entry.get('doc_id'), 'file': f"{name}.txt",
+                    'url': entry['url'], 'domain': entry['domain']}
+
+        now = datetime.now().isoformat()
+        changes = {
+            'add': [describe(name, accepted[name]) for name in delta['add']],
+            'update': [describe(name, accepted[name]) for name in delta['update']],
+            'delete': [describe(name, previous_accepted[name]) for name in delta['delete']],
+        }
+        pending = load_pending_delta(self.delta_file)
+        if pending is not None and not any(pending.get(kind) for kind in DELTA_KINDS):
+            pending = None  # 빈 델타는 임베딩 없이도 반영된 것으로 취급
+        if pending is not None:
+            changes = fold_delta(pending, changes)
+        payload = dict(changes, generated_at=now, pending_since=pending.get('pending_since', pending['generated_at'])
+                       if pending is not None else now)
+
+        tmp_path = f"{self.delta_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.delta_file)
+        logger.info(f"🔀 델타 기록: 추가 {len(delta['add']):,}개, 갱신 {len(delta['update']):,}개, "
+                    f"삭제 {len(delta['delete']):,}개 → {self.delta_file}")
+        if pending is not None:
+            logger.info(f"📌 임베딩 미반영 델타와 합침 ({payload['pending_since']}부터): 추가 {len(payload['add']):,}개, "
+                        f"갱신 {len(payload['update']):,}개, 삭제 {len(payload['delete']):,}개")
+        return payload
 
     def create_metadata(self):
         """메타데이터 파일 생성"""
         metadata = {
             'merge_timestamp': datetime.now().isoformat(),
-            'source_directories': {
-                'existing': self.existing_dir,
-                'strategic': self.strategic_dir
-            },
-            'statistics': dict(self.stats),
+            'source_directories': {prefix: source_dir for source_dir, prefix in self.source_dirs},
+            'statistics': dict(self.stats, **self.domain_stats),
             'quality_criteria': {
-                'min_quality_score': 5,
+                'min_quality_score': MIN_QUALITY_SCORE,
+                'max_pages_per_domain': MAX_PAGES_PER_DOMAIN,
+                'quality_weights': self.quality_engine.weights,
                 'duplicate_removal': True,
+                'near_duplicate_threshold': self.duplicate_index.threshold,
                 'ebook_filtering': True
             },
+            'view_mode': self.view_mode,
+            'view_file': self.view_file,
+            'corpus_store': self.store_dir if self.view_mode == "copy" else None,
+            'delta': {kind: len(names) for kind, names in self.delta.items()},
             'total_files': self.stats['total_files']
         }
-        
+
         metadata_path = os.path.join(self.merged_dir, 'merge_metadata.json')
         with open(metadata_path, 'w', encoding='utf-8') as f:
             json.dump(metadata, f, ensure_ascii=False, indent=2)
-        
+
         logger.info(f"📋 메타데이터 저장: {metadata_path}")
 
-    def merge_crawling_data(self):
-        """크롤링 데이터 통합 실행"""
+    def merge_crawling_data(self, full=False):
+        """크롤링 데이터 통합 실행 (이전 상태가 있으면 증분, full=True면 전체 재구성)"""
         logger.info("🔄 크롤링 데이터 통합 시작")
-        
+
         # 초기화
-        self.processed_urls = set()
-        self.create_merged_directory()
-        
-        # 기존 데이터 복사 (높은 품질만)
-        existing_count = self.filter_and_copy_files(self.existing_dir, "existing")
-        
-        # 신규 데이터 복사
-        strategic_count = self.filter_and_copy_files(self.strategic_dir, "strategic")
-        
+        self.processed_docs = set()
+        self.seen_blobs = set()
+        self.alias_map = AliasMap(self.alias_file)
+        self.duplicate_index = NearDuplicateIndex(threshold=NEAR_DUPLICATE_THRESHOLD)
+        self.manifest = CorpusManifest()
+
+        loaded = None if full else self.load_previous_state()
+        if loaded is None:
+            logger.info("🆕 이전 통합 상태 없음 → 전체 통합")
+            self.create_merged_directory()
+            previous, previous_accepted = {}, {}
+        else:
+            previous, previous_accepted = loaded
+            logger.info(f"♻️ 증분 통합: 이전 상태 {len(previous):,}개 파일, 통과 {len(previous_accepted):,}개")
+        self.store = SegmentStore(self.store_dir) if self.view_mode == "copy" else None
+
+        # 디렉토리별 병렬 분석 → 전체 품질 점수 → 순서대로 통과 집합 재계산 (높은 품질만, 앞 디렉토리 우선)
+        entries, scanned_dirs, accepted, counts = [], [], {}, {}
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as executor:
+            for source_dir, prefix in self.source_dirs:
+                if not os.path.exists(source_dir):
+                    logger.warning(f"⚠️ 소스 디렉토리 없음: {source_dir}")
+                    continue
+                scanned = self.scan_directory(executor, source_dir, prefix, previous)
+                scanned_dirs.append((source_dir, prefix, scanned))
+                entries.extend(scanned)
+
+        self.score_entries(entries)
+        for source_dir, prefix, scanned in scanned_dirs:
+            selected = self.select_pages(scanned, source_dir, prefix)
+            accepted.update(selected)
+            counts[source_dir] = len(selected)
+
+        # 바뀐 페이지만 기록/삭제
+        self.delta = self.apply_delta(previous_accepted, accepted)
+        if self.store:
+            self.store.close()
+        self.write_view(accepted)
+        self.write_delta(self.delta, accepted, previous_accepted)
+        self.save_state(entries, accepted)
+
         # 메타데이터 생성
         self.create_metadata()
-        
+        self.manifest.close()
+
         # 결과 보고
-        total_count = existing_count + strategic_count
+        total_count = sum(counts.values())
         logger.info("✅ 데이터 통합 완료")
-        logger.info(f"📊 통합 결과:")
-        logger.info(f"   기존 데이터: {existing_count:,}개")
-        logger.info(f"   신규 데이터: {strategic_count:,}개")
+        logger.info(f"📊 통합 결과 (분석 {self.stats['scanned']:,}개 파일):")
+        for source_dir, count in counts.items():
+            logger.info(f"   {source_dir}: {count:,}개")
         logger.info(f"   중복 제거: {self.stats['duplicates']:,}개")
+        logger.info(f"   동일 본문 제거: {self.stats['identical_content']:,}개")
+        logger.info(f"   유사 중복 제거: {self.stats['near_duplicates']:,}개")
         logger.info(f"   총 파일: {total_count:,}개")
-        logger.info(f"📁 결과 위치: {self.merged_dir}/")
-        
+        logger.info(f"   통합 뷰({self.view_mode}): reflink {self.stats['view_reflink']:,}개, "
+                    f"하드 링크 {self.stats['view_hardlink']:,}개, 복사 {self.stats['view_copy']:,}개, "
+                    f"기록 {self.stats['view_written']:,}개")
+        logger.info(f"📁 결과 위치: {self.merged_dir}/ (뷰 목록: {self.view_file})")
+
         # 도메인별 통계 (상위 10개)
-        domain_stats = {k: v for k, v in self.stats.items() 
-                       if k not in ['total_files', 'existing_files', 'strategic_files', 'duplicates']}
-        top_domains = sorted(domain_stats.items(), key=lambda x: x[1], reverse=True)[:10]
-        
+        top_domains = sorted(self.domain_stats.items(), key=lambda x: x[1], reverse=True)[:10]
+
         logger.info(f"🌐 주요 도메인 (상위 10개):")
         for domain, count in top_domains:
             logger.info(f"   {domain}: {count:,}개")
-        
+
         return total_count
 
 if __name__ == "__main__":
-    merger = CrawlingDataMerger()
-    total_files = merger.merge_crawling_data()
-    
+    view_mode = next((arg.split('=', 1)[1] for arg in sys.argv[1:] if arg.startswith('--view=')), "link")
+    merger = CrawlingDataMerger(view_mode=view_mode)
+    total_files = merger.merge_crawling_data(full='--full' in sys.argv)
+
     print("\n" + "=" * 60)
     print("✅ 크롤링 데이터 통합 완료!")
     print(f"📊 총 파일 수: {total_files:,}개")
     print("📁 통합 데이터 위치: merged_output/")
     print("🎯 다음 단계: RAG 시스템 임베딩 실행")
-    print("=" * 60)
\ No newline at end of file
+    print("=" * 60)
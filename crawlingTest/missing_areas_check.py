@@ -5,7 +5,6 @@
 
 import requests
 import re
-from urllib.parse import urlparse
 import time
 
 def check_url_status(url):
@@ -86,15 +85,17 @@ def analyze_missing_patterns():
     # 기존 데이터 로드
     existing_urls = set()
     try:
-        with open("enhanced_crawler_state.json", 'r', encoding='utf-8') as f:
-            import json
-            state = json.load(f)
-            visited = state.get('visited', [])
-            
-            for url in visited:
-                existing_urls.add(url)
-            
-            print(f"📊 기존 URL 수: {len(existing_urls):,}개")
+        from state_codec import load_state_file
+        state = (load_state_file("enhanced_crawler_state.msgpack")
+                 or load_state_file("enhanced_crawler_state.json"))
+        if state is None:
+            raise FileNotFoundError("enhanced_crawler_state.msgpack")
+        visited = state.get('visited', [])
+        
+        for url in visited:
+            existing_urls.add(url)
+        
+        print(f"📊 기존 URL 수: {len(existing_urls):,}개")
             
     except Exception as e:
         print(f"❌ 기존 상태 파일 로드 실패: {e}")
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+MinHash + LSH 기반 유사 중복 인덱스
+- 한국어 정규화 문자 n-gram의 MinHash 서명으로 Jaccard 유사도 추정 (text_fingerprint)
+- LSH 밴드 버킷으로 전체 코퍼스 대상 조회 (최근 N개 창 제한 없음)
+- 파일로 저장/복원하여 크롤링 중과 통합(merge) 단계에서 공용 사용
+"""
+
+import os
+import hashlib
+import threading
+import numpy as np
+import logging
+from text_fingerprint import Fingerprinter, FINGERPRINT_VERSION, estimate_jaccard
+
+logger = logging.getLogger(__name__)
+
+
+def choose_bands(num_perm, threshold):
+    """임계값 근처에서 후보가 잡히도록 (밴드 수, 밴드당 행 수) 선택"""
+    best = (num_perm, 1)
+    best_gap = None
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands:
+            continue
+        rows = num_perm // bands
+        # S-curve 변곡점이 임계값보다 약간 낮도록 선택 (누락 최소화)
+        inflection = (1.0 / bands) ** (1.0 / rows)
+        gap = threshold - inflection
+        if gap >= 0 and (best_gap is None or gap < best_gap):
+            best, best_gap = (bands, rows), gap
+    return best
+
+
+class NearDuplicateIndex:
+    def __init__(self, threshold=0.9, num_perm=128, shingle_size=3, seed=1, path=None):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.path = path
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+        self.fingerprinter = Fingerprinter(num_perm=num_perm, shingle_size=shingle_size, seed=seed)
+
+        self.lock = threading.Lock()
+        self.doc_ids = []
+        self.signatures = []
+        self.exact_hashes = {}
+        self.buckets = [dict() for _ in range(self.bands)]
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def signature(self, text):
+        """MinHash 서명 계산 (num_perm 길이 uint32 배열)"""
+        return self.fingerprinter.minhash(text)
+
+    def _band_keys(self, signature):
+        """밴드별 버킷 키"""
+        rows = signature.reshape(self.bands, self.rows)
+        return [row.tobytes() for row in rows]
+
+    def _insert(self, position, signature):
+        for band, key in enumerate(self._band_keys(signature)):
+            self.buckets[band].setdefault(key, []).append(position)
+
+    def query(self, text=None, signature=None, exact_hash=None):
+        """가장 유사한 기존 문서 (doc_id, 추정 Jaccard) 반환, 없으면 None"""
+        if exact_hash is None and text is not None:
+            exact_hash = hashlib.md5(text.encode()).hexdigest()
+        if signature is None:
+            signature = self.signature(text)
+
+        with self.lock:
+            if exact_hash in self.exact_hashes:
+                return self.exact_hashes[exact_hash], 1.0
+
+            candidates = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates.update(self.buckets[band].get(key, ()))
+
+            best = None
+            for position in candidates:
+                similarity = estimate_jaccard(self.signatures[position], signature)
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (self.doc_ids[position], similarity)
+            return best
+
+    def is_duplicate(self, text):
+        """임계값 이상 유사한 문서가 이미 있는지 확인"""
+        return self.query(text) is not None
+
+    def add(self, doc_id, text=None, signature=None, exact_hash=None):
+        """문서 등록"""
+        if exact_hash is None and text is not None:
+            exact_hash = hashlib.md5(text.encode()).hexdigest()
+        if signature is None:
+            signature = self.signature(text)
+
+        with self.lock:
+            position = len(self.doc_ids)
+            self.doc_ids.append(doc_id)
+            self.signatures.append(signature)
+            if exact_hash:
+                self.exact_hashes.setdefault(exact_hash, doc_id)
+            self._insert(position, signature)
+        return signature
+
+    def add_batch(self, doc_ids, texts):
+        """여러 문서를 벡터화된 서명 계산으로 일괄 등록"""
+        signatures = self.fingerprinter.minhash_batch(texts)
+        for doc_id, text, signature in zip(doc_ids, texts, signatures):
+            self.add(doc_id, signature=signature, exact_hash=hashlib.md5(text.encode()).hexdigest())
+        return signatures
+
+    def save(self, path=None):
+        """인덱스 저장 (서명 행렬 + 문서 ID + 정확 해시)"""
+        path = path or self.path
+        with self.lock:
+            signatures = (np.vstack(self.signatures) if self.signatures
+                          else np.empty((0, self.num_perm), dtype=np.uint32))
+            hashes = list(self.exact_hashes.items())
+            doc_ids = list(self.doc_ids)
+
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            signatures=signatures,
+            doc_ids=np.array(doc_ids, dtype=object),
+            exact_hashes=np.array(hashes, dtype=object).reshape(-1, 2),
+            params=np.array([self.num_perm, self.shingle_size, FINGERPRINT_VERSION], dtype=np.int64),
+        )
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """저장된 인덱스 복원 (LSH 버킷은 서명으로 재구성)"""
+        try:
+            data = np.load(path, allow_pickle=True)
+            params = [int(v) for v in data['params']]
+            if params != [self.num_perm, self.shingle_size, FINGERPRINT_VERSION]:
+                logger.warning(f"중복 인덱스 파라미터 불일치, 새로 생성: {path}")
+                return
+
+            self.doc_ids = list(data['doc_ids'])
+            self.signatures = list(data['signatures'])
+            self.exact_hashes = {h: doc_id for h, doc_id in data['exact_hashes']}
+            self.buckets = [dict() for _ in range(self.bands)]
+            for position, signature in enumerate(self.signatures):
+                self._insert(position, signature)
+
+            logger.info(f"🔁 중복 인덱스 로드: {len(self.doc_ids):,}개 문서")
+        except Exception as e:
+            logger.error(f"중복 인덱스 로드 실패 {path}: {e}")
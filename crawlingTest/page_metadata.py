@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+컬럼형 페이지 메타데이터 테이블 (NumPy 배열)
+- 헤더 필드(URL/깊이/도메인/시각/길이) + 품질 점수 + 본문 해시 + SimHash를 컬럼별 배열로 저장
+- 코퍼스 매니페스트 기준 증분 갱신 (새로 추가/변경된 파일만 본문 읽기)
+- 도메인 분포, 깊이 분포, 품질 필터를 전체 코퍼스 대상 벡터 연산으로 처리
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+import numpy as np
+import logging
+from corpus_manifest import CorpusManifest, parse_page
+from quality_score import calculate_quality_score
+from text_fingerprint import Fingerprinter
+
+logger = logging.getLogger(__name__)
+
+METADATA_PATH = "page_metadata.npz"
+
+# 숫자 컬럼 → dtype (깊이 -1, 시각 NaN = 알 수 없음)
+NUMERIC_COLUMNS = {
+    'depth': np.int16,
+    'length': np.int32,
+    'timestamp': np.float64,
+    'mtime': np.float64,
+    'quality': np.int16,
+    'simhash': np.uint64,
+}
+
+
+def pack_strings(values):
+    """문자열 목록 → (UTF-8 바이트 배열, 오프셋 배열)"""
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(value) for value in encoded])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def unpack_strings(data, offsets):
+    """(UTF-8 바이트 배열, 오프셋 배열) → 문자열 목록"""
+    raw = data.tobytes()
+    return [raw[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+
+
+def parse_timestamp(value):
+    """ISO 시각 → epoch 초 (없거나 잘못되면 NaN)"""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class PageMetadataTable:
+    def __init__(self, path=METADATA_PATH):
+        self.path = path
+        self.paths = []
+        self.urls = []
+        self.domains = []                       # 도메인 사전 (코드 → 이름)
+        self.sources = []                       # 출력 디렉토리 사전
+        self.domain_codes = np.empty(0, dtype=np.int32)
+        self.source_codes = np.empty(0, dtype=np.int32)
+        self.content_hash = np.empty(0, dtype='S16')
+        self.columns = {name: np.empty(0, dtype=dtype) for name, dtype in NUMERIC_COLUMNS.items()}
+
+        if os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self.paths)
+
+    def load(self):
+        """저장된 테이블 복원"""
+        data = np.load(self.path)
+        self.paths = unpack_strings(data['paths'], data['paths_offsets'])
+        self.urls = unpack_strings(data['urls'], data['urls_offsets'])
+        self.domains = unpack_strings(data['domains'], data['domains_offsets'])
+        self.sources = unpack_strings(data['sources'], data['sources_offsets'])
+        self.domain_codes = data['domain_codes']
+        self.source_codes = data['source_codes']
+        self.content_hash = data['content_hash']
+        self.columns = {name: data[name] for name in NUMERIC_COLUMNS}
+
+    def save(self):
+        """테이블 저장 (임시 파일 → 교체)"""
+        arrays = {}
+        for name in ('paths', 'urls', 'domains', 'sources'):
+            arrays[name], arrays[f"{name}_offsets"] = pack_strings(getattr(self, name))
+        arrays.update(self.columns)
+        arrays.update(domain_codes=self.domain_codes, source_codes=self.source_codes,
+                      content_hash=self.content_hash)
+
+        tmp_path = f"{self.path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _code(vocabulary, value):
+        """사전 코드 (없으면 추가)"""
+        if value not in vocabulary:
+            vocabulary.append(value)
+        return vocabulary.index(value)
+
+    def _keep(self, mask):
+        """mask에 해당하는 행만 유지"""
+        self.paths = [path for path, keep in zip(self.paths, mask) if keep]
+        self.urls = [url for url, keep in zip(self.urls, mask) if keep]
+        self.domain_codes = self.domain_codes[mask]
+        self.source_codes = self.source_codes[mask]
+        self.content_hash = self.content_hash[mask]
+        self.columns = {name: values[mask] for name, values in self.columns.items()}
+
+    def update_from_manifest(self, source_dirs, manifest=None):
+        """매니페스트와 비교하여 삭제/변경 행 제거 후 새 파일만 읽어 추가"""
+        manifest = manifest or CorpusManifest()
+        current = {}
+        for source_dir in source_dirs:
+            if os.path.exists(source_dir):
+                manifest.sync_directory(source_dir)
+                current.update((page['path'], page) for page in manifest.pages(source_dir))
+
+        # 사라졌거나 수정된 파일의 행 제거
+        mask = np.array([path in current and current[path]['mtime'] == mtime
+                         for path, mtime in zip(self.paths, self.columns['mtime'])], dtype=bool)
+        removed = int((~mask).sum())
+        self._keep(mask)
+
+        known = set(self.paths)
+        new_pages = [page for path, page in sorted(current.items()) if path not in known]
+        if new_pages:
+            self._append(new_pages)
+
+        if new_pages or removed:
+            self.save()
+            logger.info(f"📊 메타데이터 갱신: 추가 {len(new_pages):,}개, 제거 {removed:,}개 (전체 {len(self):,}개)")
+        return len(new_pages)
+
+    def _append(self, pages):
+        """새 페이지 행 추가 (품질 점수/SimHash 계산을 위해 본문 읽기)"""
+        contents = []
+        for page in pages:
+            with open(page['path'], 'r', encoding='utf-8') as f:
+                contents.append(f.read())
+        bodies = [parse_page(content)[1] for content in contents]
+        simhashes = Fingerprinter().simhash_batch(bodies)
+
+        new_columns = {
+            'depth': [page['depth'] if page['depth'] is not None else -1 for page in pages],
+            'length': [page['length'] for page in pages],
+            'timestamp': [parse_timestamp(page['timestamp']) for page in pages],
+            'mtime': [page['mtime'] for page in pages],
+            'quality': [calculate_quality_score(content, page['url'] or '')
+                        for content, page in zip(contents, pages)],
+            'simhash': simhashes,
+        }
+        for name, dtype in NUMERIC_COLUMNS.items():
+            self.columns[name] = np.concatenate([self.columns[name], np.asarray(new_columns[name], dtype=dtype)])
+
+        self.paths.extend(page['path'] for page in pages)
+        self.urls.extend(page['url'] or '' for page in pages)
+        self.domain_codes = np.concatenate([self.domain_codes, np.array(
+            [self._code(self.domains, page['domain'] or '') for page in pages], dtype=np.int32)])
+        self.source_codes = np.concatenate([self.source_codes, np.array(
+            [self._code(self.sources, page['source']) for page in pages], dtype=np.int32)])
+        self.content_hash = np.concatenate([self.content_hash, np.array(
+            [bytes.fromhex(page['content_hash']) for page in pages], dtype='S16')])
+
+    def source_mask(self, source_dir=None):
+        """디렉토리 필터 (None이면 전체)"""
+        if source_dir is None:
+            return np.ones(len(self), dtype=bool)
+        source = os.path.normpath(source_dir)
+        if source not in self.sources:
+            return np.zeros(len(self), dtype=bool)
+        return self.source_codes == self.sources.index(source)
+
+    def domain_histogram(self, source_dir=None):
+        """도메인별 페이지 수 (많은 순)"""
+        codes = self.domain_codes[self.source_mask(source_dir)]
+        counts = np.bincount(codes, minlength=len(self.domains))
+        order = np.argsort(-counts, kind='stable')
+        return [(self.domains[code], int(counts[code])) for code in order if counts[code]]
+
+    def depth_distribution(self, source_dir=None):
+        """깊이별 페이지 수 (깊이 알 수 없음은 제외)"""
+        depths = self.columns['depth'][self.source_mask(source_dir)]
+        counts = np.bincount(depths[depths >= 0])
+        return {depth: int(count) for depth, count in enumerate(counts) if count}
+
+    def quality_mask(self, min_quality=5, min_length=0, domains=None, source_dir=None):
+        """품질/길이/도메인 조건을 만족하는 행 mask"""
+        mask = self.source_mask(source_dir)
+        mask &= self.columns['quality'] >= min_quality
+        mask &= self.columns['length'] >= min_length
+        if domains:
+            codes = [self.domains.index(domain) for domain in domains if domain in self.domains]
+            mask &= np.isin(self.domain_codes, codes)
+        return mask
+
+    def select_paths(self, mask):
+        """mask 행의 파일 경로"""
+        return [self.paths[i] for i in np.flatnonzero(mask)]
+
+    def duplicate_hash_count(self):
+        """본문 해시가 중복된 행 수"""
+        return len(self) - len(np.unique(self.content_hash))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    directories = sys.argv[1:] or ["enhanced_output", "strategic_output", "enhanced_strategic_output",
+                                   "unlimited_crawling_output"]
+
+    table = PageMetadataTable()
+    table.update_from_manifest(directories)
+
+    started = time.time()
+    histogram = table.domain_histogram()
+    depths = table.depth_distribution()
+    selected = int(table.quality_mask(min_quality=5).sum())
+    elapsed = (time.time() - started) * 1000
+
+    print(f"📊 페이지 {len(table):,}개 (조회 {elapsed:.1f}ms)")
+    print(f"🌐 도메인 상위 10개: {histogram[:10]}")
+    print(f"📏 깊이 분포: {depths}")
+    print(f"✅ 품질 5점 이상: {selected:,}개, 본문 해시 중복: {table.duplicate_hash_count():,}개")
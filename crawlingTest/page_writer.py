@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+비동기 버퍼 페이지 기록기
+- 크롤링 루프는 큐에 넣기만 하고 파일 기록은 전용 스레드가 배치로 처리 (저장소 지연에 막히지 않음)
+- 제한 크기 큐 + 배치 크기/플러시 간격 설정
+- 스테이징 디렉토리 지정 시 로컬에 먼저 기록 후 느린 대상 경로(예: 마운트된 Google Drive)로 일괄 이동
+- 배치는 대상 디렉토리의 .incoming 에 모두 기록/fsync 한 뒤 같은 파일시스템 안에서 rename
+  (파일 단위로 원자적, 배치 전체가 한 번에 보이지는 않음 → 충돌 후 .incoming 잔여 파일은 다음 시작 시 이동)
+- 최종 경로에 기록이 끝난 페이지만 on_written 콜백으로 전달 (매니페스트 기록 등)
+- 로그는 페이지마다가 아니라 배치마다 한 줄
+"""
+
+import os
+import queue
+import shutil
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 느린 출력 경로를 쓸 때 로컬 스테이징 디렉토리 (예: Colab에서 /content/staging)
+STAGING_DIR = os.environ.get("CRAWLER_STAGING_DIR")
+INCOMING_DIR = ".incoming"      # 대상 디렉토리 안의 배치 임시 디렉토리 (같은 파일시스템 → rename 가능)
+
+_FLUSH = object()
+_STOP = object()
+
+
+class PageWriter:
+    def __init__(self, output_dir, staging_dir=STAGING_DIR, queue_size=1000, batch_size=50,
+                 flush_interval=2.0, on_written=None):
+        self.output_dir = output_dir
+        self.staging_dir = os.path.join(staging_dir, os.path.basename(os.path.normpath(output_dir))) \
+            if staging_dir else None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_written = on_written
+
+        os.makedirs(output_dir, exist_ok=True)
+        if self.staging_dir:
+            os.makedirs(self.staging_dir, exist_ok=True)
+        self._sync_leftovers()
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.written = 0
+        self.failed = 0
+        self.thread = threading.Thread(target=self._run, name="page-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, path, content):
+        """페이지 기록 요청 (큐가 가득 찼을 때만 대기)"""
+        self.queue.put((path, content))
+
+    def flush(self):
+        """지금까지 요청한 페이지가 최종 경로에 기록될 때까지 대기"""
+        done = threading.Event()
+        self.queue.put((_FLUSH, done))
+        done.wait()
+
+    def close(self):
+        """남은 페이지 기록 후 스레드 종료"""
+        if self.thread.is_alive():
+            self.queue.put((_STOP, None))
+            self.thread.join()
+        logger.info(f"💾 페이지 기록 완료: {self.written:,}개 (실패 {self.failed:,}개)")
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if item is not None and item[0] not in (_FLUSH, _STOP):
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+
+            # 배치가 찼거나, 플러시 간격이 지났거나, 플러시/종료 요청
+            if batch:
+                self._write_batch(batch)
+                batch = []
+            deadline = time.monotonic() + self.flush_interval
+
+            if item is not None and item[0] is _FLUSH:
+                item[1].set()
+            elif item is not None and item[0] is _STOP:
+                return
+
+    def _write_batch(self, batch):
+        """배치 기록: 전체를 .incoming 에 기록/fsync → 디렉토리 fsync → 최종 경로로 rename (스테이징 사용 시 로컬 기록 후 복사)"""
+        started = time.monotonic()
+        incoming = []
+        for path, content in batch:
+            pending = os.path.join(os.path.dirname(path), INCOMING_DIR, os.path.basename(path))
+            try:
+                os.makedirs(os.path.dirname(pending), exist_ok=True)
+                if self.staging_dir:
+                    staged = os.path.join(self.staging_dir, os.path.basename(path))
+                    _write_synced(f"{staged}.tmp", content)
+                    os.replace(f"{staged}.tmp", staged)
+                    shutil.copyfile(staged, pending)
+                    _fsync_file(pending)
+                else:
+                    _write_synced(pending, content)
+                incoming.append((pending, path, content))
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"파일 저장 오류 {path}: {e}")
+
+        # 배치 전체가 디스크에 기록된 뒤에만 최종 경로에 노출
+        for directory in {os.path.dirname(pending) for pending, _, _ in incoming}:
+            _fsync_dir(directory)
+
+        for pending, path, content in incoming:
+            try:
+                os.replace(pending, path)
+                if self.staging_dir:
+                    os.remove(os.path.join(self.staging_dir, os.path.basename(path)))
+                if self.on_written:
+                    self.on_written(path, content)
+                self.written += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"파일 이동 오류 {path}: {e}")
+
+        for directory in {os.path.dirname(path) for _, path, _ in incoming}:
+            _fsync_dir(directory)
+
+        elapsed = (time.monotonic() - started) * 1000
+        logger.info(f"💾 {len(incoming)}개 페이지 기록 ({elapsed:.0f}ms, 대기 {self.queue.qsize()}개)")
+
+    def _sync_leftovers(self):
+        """이전 실행이 남긴 .incoming / 스테이징 파일을 대상 경로로 이동 (콜백 없이, 매니페스트는 동기화로 보충)"""
+        moved = 0
+        # .incoming 파일은 fsync 후에만 rename 대기 상태가 되므로 완전한 파일
+        incoming = os.path.join(self.output_dir, INCOMING_DIR)
+        if os.path.isdir(incoming):
+            for filename in os.listdir(incoming):
+                os.replace(os.path.join(incoming, filename), os.path.join(self.output_dir, filename))
+                moved += 1
+
+        # 스테이징 .txt 는 fsync 후 rename 된 완전한 파일 (.tmp 는 기록 중 충돌 → 버림)
+        if self.staging_dir:
+            for filename in os.listdir(self.staging_dir):
+                source = os.path.join(self.staging_dir, filename)
+                if filename.endswith('.txt'):
+                    shutil.move(source, os.path.join(self.output_dir, filename))
+                    moved += 1
+                elif filename.endswith('.tmp'):
+                    os.remove(source)
+
+        if moved:
+            _fsync_dir(self.output_dir)
+            logger.info(f"💾 잔여 파일 이동: {moved}개 → {self.output_dir}")
+
+
+def _write_synced(path, content):
+    """파일 기록 후 fsync"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _fsync_file(path):
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(directory):
+    """디렉토리 항목(rename) 영속화 (지원하지 않는 파일시스템은 무시)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
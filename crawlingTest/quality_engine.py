@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+특징 기반 품질 점수 엔진 (NumPy 일괄 처리)
+- 코퍼스 전체의 특징 행렬 계산: 길이, 텍스트/마크업 비율, 상용구(boilerplate) 비율, 한글 비율,
+  중복 클러스터 크기, URL 템플릿 분류, 메뉴 줄(링크) 밀도
+- 문자 단위 특징은 전체 본문을 UTF-32 배열 하나로 이어 붙여 문서별 구간 합으로 계산
+- 페이지별 압축 특징(문자/한글 수, 마크업/메뉴 줄 비율, 줄 해시 + 줄 문자 수)은 페이지마다 따로 계산
+  → 통합 단계 워커가 계산해 상태에 저장, 코퍼스 전체 특징(상용구 줄 페이지 수, 클러스터 크기)만 본문 없이 일괄 계산
+- 스트리밍 단계 그래프용 StreamingCorpus: 페이지 수를 누적해 나중에 도착한 페이지를 한 건씩 근사 점수 계산
+- 가중치(설정/JSON) 선형 점수 또는 수동 라벨 파일({URL: 점수})로 학습한 릿지 회귀 가중치 사용
+- 임계값 선택 / 도메인별 상위 k개 선택 (merge_crawling_data.py 통과 후보 선정에 사용)
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+from collections import Counter
+import numpy as np
+import logging
+from corpus_manifest import parse_page
+from page_metadata import PageMetadataTable
+
+logger = logging.getLogger(__name__)
+
+WEIGHTS_PATH = "quality_weights.json"
+
+# URL 템플릿 분류 (앞 패턴부터 검사)
+URL_TEMPLATES = [
+    ('article', re.compile(r'/bbs/.*artclView\.do')),
+    ('board', re.compile(r'/bbs/')),
+    ('subpage', re.compile(r'subview\.do')),
+    ('main', re.compile(r'/index\.do|^https?://[^/]+/?$')),
+    ('ebook_list', re.compile(r'ebook\.daejin\.ac\.kr.*(search|keyword|category)')),
+    ('ebook', re.compile(r'ebook\.daejin\.ac\.kr')),
+]
+TEMPLATE_NAMES = [name for name, _ in URL_TEMPLATES] + ['other']
+
+# 정제 후에도 남는 템플릿/마크업 흔적 줄
+MARKUP_LINE = re.compile(r'\.jsp|_JW_MS_|/WEB-INF/|[<>{}]|^\W+$')
+
+FEATURE_NAMES = [
+    'log_length', 'text_ratio', 'boilerplate_ratio', 'hangul_ratio',
+    'log_cluster_size', 'menu_line_ratio',
+] + [f"template_{name}" for name in TEMPLATE_NAMES]
+
+# 기본 가중치 (특징 행렬 열 순서와 동일, 마지막은 절편)
+DEFAULT_WEIGHTS = {
+    'log_length': 2.0,
+    'text_ratio': 6.0,
+    'boilerplate_ratio': -8.0,
+    'hangul_ratio': 6.0,
+    'log_cluster_size': -3.0,
+    'menu_line_ratio': -6.0,
+    'template_article': 6.0,
+    'template_board': 3.0,
+    'template_subpage': 3.0,
+    'template_main': 1.0,
+    'template_ebook_list': -10.0,
+    'template_ebook': -5.0,
+    'template_other': 0.0,
+    'bias': -10.0,
+}
+
+
+def url_template(url):
+    """URL 템플릿 분류 코드"""
+    for code, (_, pattern) in enumerate(URL_TEMPLATES):
+        if pattern.search(url):
+            return code
+    return len(URL_TEMPLATES)
+
+
+def char_features(bodies):
+    """문자 단위 특징 (전체 본문을 UTF-32 배열 하나로 처리) → (문자 수, 한글 수, 공백 제외 문자 수)"""
+    lengths = np.array([len(body) for body in bodies], dtype=np.int64)
+    # 끝에 보초 문자(0) 하나 추가 → 뒤쪽 빈 문서의 구간 시작도 배열 안에 있음 (마지막 문자 유지)
+    codes = np.frombuffer((''.join(bodies) + '\0').encode('utf-32-le'), dtype=np.uint32)
+    offsets = np.cumsum(lengths) - lengths
+
+    def per_doc(mask):
+        # reduceat은 빈 구간에 시작 위치 원소를 돌려주므로 길이 0 문서는 0으로 보정
+        sums = np.add.reduceat(mask.astype(np.int64), offsets) if len(bodies) else np.zeros(0, dtype=np.int64)
+        return np.where(lengths > 0, sums, 0)
+
+    hangul = per_doc((codes >= 0xAC00) & (codes <= 0xD7A3))
+    visible = per_doc(codes > 0x20)
+    return lengths, hangul, visible
+
+
+def line_hash(line):
+    """프로세스와 무관한 64비트 줄 해시"""
+    return int.from_bytes(hashlib.blake2b(line.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def page_features(body):
+    """페이지 하나의 압축 특징 (본문 없이 코퍼스 특징 행렬을 만들 수 있는 값만, msgpack 저장 가능)"""
+    lengths, hangul, visible = char_features([body])
+    line_chars = {}  # 줄 → 문서 안 문자 수 합 (문서 내 반복 포함)
+    line_count = markup_chars = menu_lines = 0
+    for line in body.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        line_count += 1
+        line_chars[line] = line_chars.get(line, 0) + len(line)
+        if MARKUP_LINE.search(line):
+            markup_chars += len(line)
+        if len(line) <= 10:
+            menu_lines += 1
+
+    total_chars = sum(line_chars.values())
+    return {
+        'length': int(lengths[0]),
+        'hangul': int(hangul[0]),
+        'visible': int(visible[0]),
+        'line_chars': total_chars,
+        'markup_ratio': markup_chars / max(total_chars, 1),
+        'menu_line_ratio': menu_lines / max(line_count, 1),
+        'line_hashes': np.array([line_hash(line) for line in line_chars], dtype=np.uint64).tobytes(),
+        'line_weights': np.array(list(line_chars.values()), dtype=np.uint32).tobytes(),
+    }
+
+
+def boilerplate_ratios(pages, boilerplate_pages=20):
+    """줄 해시의 코퍼스 전체 페이지 수로 상용구 문자 비율 계산 (같은 줄이 boilerplate_pages개 이상 페이지에 나오면 상용구)"""
+    hashes = [np.frombuffer(page['line_hashes'], dtype=np.uint64) for page in pages]
+    if not any(len(page_hashes) for page_hashes in hashes):
+        return np.zeros(len(pages))
+    weights = np.concatenate([np.frombuffer(page['line_weights'], dtype=np.uint32) for page in pages])
+    docs = np.repeat(np.arange(len(pages)), [len(page_hashes) for page_hashes in hashes])
+
+    # 페이지 안에서 줄 해시는 한 번씩만 있으므로 등장 횟수 = 페이지 수
+    _, inverse, counts = np.unique(np.concatenate(hashes), return_inverse=True, return_counts=True)
+    boilerplate = np.bincount(docs, weights=weights * (counts[inverse] >= boilerplate_pages), minlength=len(pages))
+    return boilerplate / np.maximum(np.array([page['line_chars'] for page in pages], dtype=np.float64), 1)
+
+
+class QualityEngine:
+    def __init__(self, weights=None, boilerplate_pages=20):
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.boilerplate_pages = boilerplate_pages
+
+    @classmethod
+    def from_file(cls, path=WEIGHTS_PATH):
+        """저장된 가중치 로드 (없으면 기본 가중치)"""
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls(json.load(f))
+        return cls()
+
+    def save_weights(self, path=WEIGHTS_PATH):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.weights, f, ensure_ascii=False, indent=2)
+
+    def feature_matrix(self, bodies, urls, cluster_keys=None):
+        """본문 목록 → (문서 수, 특징 수) float32 특징 행렬"""
+        return self.page_matrix([page_features(body) for body in bodies], urls, cluster_keys)
+
+    def page_matrix(self, pages, urls, cluster_keys=None, boilerplate=None, cluster_sizes=None):
+        """페이지별 압축 특징(page_features) → 특징 행렬 (cluster_keys: 중복 클러스터 키 배열, 예: 본문 해시)
+        boilerplate/cluster_sizes 를 넘기면 코퍼스 특징을 다시 계산하지 않고 그대로 사용 (StreamingCorpus)"""
+        lengths = np.array([page['length'] for page in pages], dtype=np.int64)
+        hangul = np.array([page['hangul'] for page in pages], dtype=np.int64)
+        visible = np.array([page['visible'] for page in pages], dtype=np.int64)
+        markup_ratio = np.array([page['markup_ratio'] for page in pages], dtype=np.float64)
+        menu_lines = np.array([page['menu_line_ratio'] for page in pages], dtype=np.float64)
+        if boilerplate is None:
+            boilerplate = boilerplate_ratios(pages, self.boilerplate_pages)
+
+        if cluster_sizes is not None:
+            cluster_sizes = np.asarray(cluster_sizes, dtype=np.float64)
+        elif cluster_keys is None:
+            cluster_sizes = np.ones(len(pages))
+        else:
+            _, inverse, counts = np.unique(cluster_keys, return_inverse=True, return_counts=True)
+            cluster_sizes = counts[inverse]
+
+        templates = np.array([url_template(url) for url in urls], dtype=np.int64)
+        one_hot = np.eye(len(TEMPLATE_NAMES), dtype=np.float32)[templates]
+
+        columns = [
+            np.log1p(lengths),
+            1.0 - markup_ratio,
+            boilerplate,
+            hangul / np.maximum(visible, 1),
+            np.log(cluster_sizes),
+            menu_lines,
+        ]
+        return np.column_stack([np.column_stack(columns).astype(np.float32), one_hot])
+
+    def weight_vector(self):
+        return np.array([self.weights[name] for name in FEATURE_NAMES], dtype=np.float32), self.weights['bias']
+
+    def score(self, matrix):
+        """선형 점수 (특징 행렬 · 가중치 + 절편)"""
+        weights, bias = self.weight_vector()
+        return matrix @ weights + bias
+
+    def fit(self, matrix, labels, l2=1.0):
+        """수동 라벨(예: 판정 0/1)로 릿지 회귀 가중치 학습 (라벨은 특징 행렬 행 순서)"""
+        labels = np.asarray(labels, dtype=np.float64)
+        if labels.ndim != 1 or len(labels) == 0 or len(labels) != len(matrix):
+            raise ValueError(f"라벨 수({labels.size})가 특징 행 수({len(matrix)})와 다름")
+        design = np.column_stack([matrix, np.ones(len(matrix), dtype=np.float32)]).astype(np.float64)
+        penalty = l2 * np.eye(design.shape[1])
+        penalty[-1, -1] = 0.0  # 절편은 규제하지 않음
+        solution = np.linalg.solve(design.T @ design + penalty, design.T @ labels)
+        self.weights = dict(zip(FEATURE_NAMES, solution[:-1].tolist()), bias=float(solution[-1]))
+        return self.weights
+
+
+class StreamingCorpus:
+    """줄 해시/클러스터 키별 페이지 수를 누적하며 새로 도착한 페이지를 지금까지의 코퍼스 기준으로 점수 계산
+    (일괄 계산의 근사, 최종 선정은 page_matrix 일괄 계산으로 다시 확인)"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.line_pages = Counter()
+        self.clusters = Counter()
+
+    def add(self, page, cluster_key):
+        self.line_pages.update(np.frombuffer(page['line_hashes'], dtype=np.uint64).tolist())
+        self.clusters[cluster_key] += 1
+
+    def score(self, page, url, cluster_key):
+        """페이지를 코퍼스에 추가한 뒤 선형 점수"""
+        self.add(page, cluster_key)
+        hashes = np.frombuffer(page['line_hashes'], dtype=np.uint64).tolist()
+        counts = np.array([self.line_pages[line] for line in hashes], dtype=np.int64)
+        weights = np.frombuffer(page['line_weights'], dtype=np.uint32)
+        boilerplate = (weights * (counts >= self.engine.boilerplate_pages)).sum() / max(page['line_chars'], 1)
+        matrix = self.engine.page_matrix([page], [url], boilerplate=np.array([boilerplate]),
+                                         cluster_sizes=[self.clusters[cluster_key]])
+        return float(self.engine.score(matrix)[0])
+
+
+def threshold_mask(scores, min_score):
+    """임계값 이상 선택"""
+    return scores >= min_score
+
+
+def top_k_per_domain(scores, domain_codes, k):
+    """도메인별 점수 상위 k개 선택 mask"""
+    order = np.lexsort((-scores, domain_codes))
+    sorted_domains = domain_codes[order]
+    group_start = np.concatenate([[True], sorted_domains[1:] != sorted_domains[:-1]])
+    start_positions = np.maximum.accumulate(np.where(group_start, np.arange(len(order)), 0))
+    rank = np.arange(len(order)) - start_positions
+
+    mask = np.zeros(len(scores), dtype=bool)
+    mask[order[rank < k]] = True
+    return mask
+
+
+def load_labels(path):
+    """수동 라벨 파일 로드 ({URL: 점수} JSON)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        labels = json.load(f)
+    if not isinstance(labels, dict) or not labels:
+        raise ValueError(f"라벨 파일 형식 오류 (URL → 점수 객체 필요): {path}")
+    return {url: float(label) for url, label in labels.items()}
+
+
+def load_bodies(paths):
+    """저장 파일 본문 목록"""
+    bodies = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            bodies.append(parse_page(f.read())[1].replace('\\n', '\n'))
+    return bodies
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args = sys.argv[1:]
+    labels_path = None
+    if '--fit' in args:
+        index = args.index('--fit')
+        if index + 1 >= len(args):
+            print("사용법: python3 quality_engine.py --fit <라벨 JSON ({URL: 점수})> [디렉토리...]")
+            sys.exit(1)
+        labels_path = args[index + 1]
+        del args[index:index + 2]
+    directories = args or ["enhanced_output", "strategic_output", "enhanced_strategic_output",
+                           "unlimited_crawling_output"]
+
+    table = PageMetadataTable()
+    table.update_from_manifest(directories)
+
+    started = time.time()
+    bodies = load_bodies(table.paths)
+    loaded = time.time()
+
+    engine = QualityEngine.from_file()
+    matrix = engine.feature_matrix(bodies, table.urls, cluster_keys=table.content_hash)
+    if labels_path:
+        # 라벨이 있는 페이지만 학습에 사용
+        labels = load_labels(labels_path)
+        rows = [row for row, url in enumerate(table.urls) if url in labels]
+        if not rows:
+            print(f"❌ 라벨과 일치하는 페이지 없음: {labels_path}")
+            sys.exit(1)
+        engine.fit(matrix[rows], [labels[table.urls[row]] for row in rows])
+        engine.save_weights()
+        print(f"🎯 라벨 {len(rows):,}개로 가중치 학습 → {WEIGHTS_PATH}")
+    scores = engine.score(matrix)
+    scored = time.time()
+
+    selected = threshold_mask(scores, 0.0)
+    top = top_k_per_domain(scores, table.domain_codes, k=200)
+    print(f"🧮 페이지 {len(table):,}개: 본문 읽기 {loaded - started:.1f}초, 특징/점수 {scored - loaded:.2f}초")
+    print(f"📐 특징 평균: {dict(zip(FEATURE_NAMES[:6], np.round(matrix[:, :6].mean(axis=0).astype(float), 3).tolist()))}")
+    print(f"✅ 점수 0 이상: {int(selected.sum()):,}개, 도메인별 상위 200개: {int(top.sum()):,}개")
+    print(f"🔗 기존 점수와 상관계수: {np.corrcoef(scores, table.columns['quality'])[0, 1]:.2f}")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+페이지 품질 점수
+- 길이, URL 패턴(게시판/서브페이지), 도메인, 전자책 감점, 핵심 키워드 기반 점수
+- 통합(merge) 단계와 메타데이터 테이블에서 공용 사용
+"""
+
+
+def calculate_quality_score(content, url):
+    """컨텐츠 품질 점수 계산"""
+    score = 0
+    
+    # 길이 점수 (100-2000자: 최고점)
+    content_length = len(content)
+    if 100 <= content_length <= 2000:
+        score += 10
+    elif 50 <= content_length < 100:
+        score += 5
+    elif content_length > 2000:
+        score += 7
+    
+    # URL 패턴 점수
+    if '/bbs/' in url and 'artclView.do' in url:
+        score += 15  # 게시판 게시글
+    elif '/bbs/' in url:
+        score += 10  # 게시판 목록
+    elif 'subview.do' in url:
+        score += 8   # 서브페이지
+    elif '/index.do' in url:
+        score += 5   # 메인페이지
+    
+    # 도메인 점수
+    if 'ce.daejin.ac.kr' in url:
+        score += 5   # 컴공과 우대
+    elif 'www.daejin.ac.kr' in url:
+        score += 3   # 메인 사이트
+    elif any(dept in url for dept in ['law', 'eng', 'food', 'nurse']):
+        score += 4   # 주요 학과
+    
+    # 전자책 페이지 감점
+    if 'ebook.daejin.ac.kr' in url:
+        if any(pattern in url for pattern in ['search', 'keyword', 'category']):
+            score -= 10  # 검색/목록 페이지
+        else:
+            score -= 5   # 일반 전자책 페이지
+    
+    # 컨텐츠 품질 확인
+    if '공지사항' in content or '안내' in content:
+        score += 3
+    if '교육과정' in content or '교수' in content:
+        score += 3
+    if '입학' in content or '모집' in content:
+        score += 2
+    
+    return max(0, score)  # 음수 방지
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+원본 응답 보관소 (WARC 유사)
+- 선택적 수집 모드: 응답 헤더 + 원본 본문을 URL/수집 시각 키로 세그먼트에 zstd 압축 저장
+- 정제 로직이 바뀌면 재크롤링 없이 보관소에서 병렬 재추출 (네트워크 불필요)
+- 재추출 결과는 세그먼트 코퍼스 저장소로 기록 (같은 URL은 최신 수집본 기준)
+"""
+
+import re
+import sys
+import hashlib
+import importlib
+from urllib.parse import urlparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from bs4 import BeautifulSoup
+import logging
+from segment_store import SegmentStore
+from url_alias import canonicalize_url, document_id
+
+logger = logging.getLogger(__name__)
+
+CHARSET_PATTERN = re.compile(r'charset=([\w-]+)', re.IGNORECASE)
+
+# 재추출용 정제기: 이름 → (모듈, 클래스, 메서드, 입력 형태)
+CLEANERS = {
+    'enhanced': ('enhanced_crawler', 'EnhancedCrawler', 'clean_text_advanced', 'html'),
+    'strategic': ('strategic_crawler', 'StrategicCrawler', 'extract_clean_text', 'soup'),
+    'enhanced_strategic': ('enhanced_strategic_crawler', 'EnhancedStrategicCrawler', 'extract_clean_text', 'soup'),
+    'unlimited': ('unlimited_crawler', 'UnlimitedCrawler', 'extract_clean_text', 'soup'),
+}
+
+
+def capture_key(url, fetched_at):
+    """URL + 수집 시각 기반 수집본 키"""
+    return hashlib.blake2b(f"{url} {fetched_at}".encode('utf-8'), digest_size=12).hexdigest()
+
+
+def decode_body(capture):
+    """원본 본문 바이트 → 문자열 (기록된 인코딩 또는 Content-Type charset)"""
+    encoding = capture.get('encoding')
+    if not encoding:
+        match = CHARSET_PATTERN.search(capture.get('headers', {}).get('Content-Type', ''))
+        encoding = match.group(1) if match else 'utf-8'
+    try:
+        return capture['body'].decode(encoding, errors='replace')
+    except LookupError:
+        return capture['body'].decode('utf-8', errors='replace')
+
+
+class RawArchive:
+    def __init__(self, archive_dir="raw_archive"):
+        self.archive_dir = archive_dir
+        self.store = SegmentStore(archive_dir)
+
+    def __len__(self):
+        return len(self.store)
+
+    def capture(self, url, body, final_url=None, status=200, headers=None,
+                encoding=None, fetch_mode='http'):
+        """응답 하나 보관 (body는 bytes 또는 str)"""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+            encoding = 'utf-8'
+        fetched_at = datetime.now().isoformat()
+        self.store.put(
+            capture_key(url, fetched_at), body,
+            url=url, final_url=final_url or url, status=status,
+            headers=dict(headers or {}), encoding=encoding,
+            fetch_mode=fetch_mode, fetched_at=fetched_at,
+        )
+
+    def iter_captures(self):
+        """보관된 응답 순차 스트리밍 (수집 순서)"""
+        for record in self.store.iter_records():
+            record['body'] = record.pop('text')
+            yield record
+
+    def flush(self):
+        self.store.flush()
+
+    def close(self):
+        self.store.close()
+
+
+_cleaner = None
+
+
+def _init_cleaner(name):
+    """워커 프로세스별 정제기 준비 (크롤러 초기화 없이 정제 메서드만 사용)"""
+    global _cleaner
+    module_name, class_name, method_name, input_kind = CLEANERS[name]
+    cls = getattr(importlib.import_module(module_name), class_name)
+    method = getattr(cls.__new__(cls), method_name)
+    if input_kind == 'soup':
+        _cleaner = lambda html, url: method(BeautifulSoup(html, 'html.parser'))
+    else:
+        _cleaner = method
+
+
+def _extract(task):
+    """워커: (URL, HTML) → 정제 텍스트"""
+    url, html = task
+    try:
+        return _cleaner(html, url)
+    except Exception as e:
+        logger.warning(f"재추출 실패 {url}: {e}")
+        return ""
+
+
+def reextract(archive_dir, output_dir, cleaner='enhanced', workers=None, batch_size=256, min_length=50):
+    """보관소 전체를 병렬 재추출하여 세그먼트 코퍼스로 기록"""
+    archive = RawArchive(archive_dir)
+    output = SegmentStore(output_dir)
+    started = datetime.now()
+    extracted = 0
+
+    def write_batch(executor, batch):
+        nonlocal extracted
+        tasks = [(capture['url'], decode_body(capture)) for capture in batch]
+        for capture, text in zip(batch, executor.map(_extract, tasks, chunksize=8)):
+            if len(text) < min_length:
+                continue
+            url = capture['final_url'] or capture['url']
+            output.put(document_id(canonicalize_url(url)), text, url=capture['url'],
+                       domain=urlparse(url).netloc, timestamp=capture['fetched_at'])
+            extracted += 1
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_cleaner, initargs=(cleaner,)) as executor:
+        batch = []
+        for capture in archive.iter_captures():
+            if capture['status'] != 200:
+                continue
+            batch.append(capture)
+            if len(batch) >= batch_size:
+                write_batch(executor, batch)
+                batch = []
+        if batch:
+            write_batch(executor, batch)
+
+    output.close()
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"♻️ 재추출 완료 ({cleaner}): {extracted:,}개 문서 → {output_dir} ({elapsed:.1f}초, 네트워크 사용 없음)")
+    return extracted
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("사용법: python3 raw_archive.py <보관소 디렉토리> <출력 저장소 디렉토리> [정제기] [워커 수]")
+        print(f"  정제기: {', '.join(CLEANERS)} (기본 enhanced)")
+        sys.exit(1)
+
+    logging.basicConfig(level=logging.INFO)
+    reextract(sys.argv[1], sys.argv[2],
+              cleaner=sys.argv[3] if len(sys.argv) > 3 else 'enhanced',
+              workers=int(sys.argv[4]) if len(sys.argv) > 4 else None)
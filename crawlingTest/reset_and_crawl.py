@@ -8,6 +8,7 @@ import shutil
 import asyncio
 import sys
 from datetime import datetime
+from corpus_manifest import CorpusManifest
 
 def reset_crawling_state():
     """크롤링 상태 완전 리셋"""
@@ -17,11 +18,13 @@ def reset_crawling_state():
     if os.path.exists('strategic_output'):
         backup_name = f"strategic_output_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         shutil.move('strategic_output', backup_name)
+        CorpusManifest().remove_source('strategic_output')
         print(f"📁 기존 결과 백업: {backup_name}")
     
     # 상태 파일 백업 및 삭제
     state_files = [
         'strategic_crawler_state.json',
+        'strategic_crawler_state.msgpack',
         'strategic_crawler.log',
         'strategic_execution.log'
     ]
@@ -9,6 +9,10 @@ if [ -f "enhanced_crawler_state.json" ]; then
     echo "📦 기존 상태 파일 백업..."
     cp enhanced_crawler_state.json "backup_state_$(date +%Y%m%d_%H%M%S).json"
 fi
+if [ -f "enhanced_crawler_state.msgpack" ]; then
+    echo "📦 기존 상태 파일 백업..."
+    cp enhanced_crawler_state.msgpack "backup_state_$(date +%Y%m%d_%H%M%S).msgpack"
+fi
 
 # 기존 출력 디렉토리 백업
 if [ -d "enhanced_output" ]; then
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+세그먼트 기반 코퍼스 저장소
+- 페이지마다 .txt 파일을 만드는 대신 추가 전용 세그먼트 파일에 길이 접두 레코드로 기록
+- 레코드는 블록 단위로 묶어 zstd 압축, 문서 ID → (세그먼트, 블록 오프셋, 블록 내 위치) 사이드카 인덱스
+- 기본은 256KB 블록 zstd 압축, use_dictionaries=True 일 때만 <저장소>/dictionaries 의 도메인 사전으로 레코드별 압축 (사전 블록)
+  (보류 표본 벤치마크에서 블록 압축이 압축률/속도 모두 우세 → 사전은 짧은 레코드 임의 접근용 선택 기능)
+- 순차 스트리밍 / 문서 ID 임의 접근 리더
+- 기존 Node 스크립트용 .txt 레이아웃 내보내기, 기존 디렉토리 적재
+"""
+
+import os
+import sys
+import struct
+import threading
+from collections import OrderedDict
+import msgpack
+import zstandard
+import logging
+from corpus_manifest import parse_page
+from url_alias import canonicalize_url, document_id
+from domain_dictionary import DomainDictionaries
+
+logger = logging.getLogger(__name__)
+
+BLOCK_MAGIC = b'SGB1'
+DICT_BLOCK_MAGIC = b'SGD1'             # 레코드별 사전 압축 블록 (블록 자체는 무압축)
+BLOCK_HEADER = struct.Struct('<4sII')   # 매직, 압축 길이, 레코드 수
+RECORD_LENGTH = struct.Struct('<I')
+DELETED_SEGMENT = '-1'                 # 인덱스 삭제 표시 (세그먼트 번호 자리)
+
+# 내보내기 헤더 순서 (기존 .txt 레이아웃)
+EXPORT_HEADER_FIELDS = (('url', 'URL'), ('doc_id', 'DOC_ID'), ('depth', 'DEPTH'),
+                        ('domain', 'DOMAIN'), ('timestamp', 'TIMESTAMP'))
+
+
+class SegmentStore:
+    def __init__(self, store_dir, block_size=256 * 1024, segment_size=64 * 1024 * 1024,
+                 level=3, cache_blocks=8, use_dictionaries=False):
+        self.store_dir = store_dir
+        self.index_file = os.path.join(store_dir, "index.tsv")
+        # 사전은 기존 사전 블록 해제용으로 항상 로드, 새 기록에는 use_dictionaries일 때만 사용
+        self.dictionaries = DomainDictionaries(os.path.join(store_dir, "dictionaries"), level=level)
+        self.use_dictionaries = use_dictionaries and bool(self.dictionaries)
+        if use_dictionaries and not self.dictionaries:
+            logger.warning(f"zstd 사전 없음 → 블록 압축 사용: {os.path.join(store_dir, 'dictionaries')}")
+        self.block_size = block_size
+        self.segment_size = segment_size
+        self.cache_blocks = cache_blocks
+
+        os.makedirs(store_dir, exist_ok=True)
+
+        self.compressor = zstandard.ZstdCompressor(level=level)
+        self.decompressor = zstandard.ZstdDecompressor()
+        self.lock = threading.Lock()
+        self.index = {}                # 문서 ID → (세그먼트 번호, 블록 오프셋, 블록 내 위치)
+        self.block_cache = OrderedDict()
+
+        self.pending = []              # (문서 ID, 직렬화된 레코드)
+        self.pending_bytes = 0
+        self.segment_no = 0
+
+        self.load_index()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.index
+
+    def segment_path(self, segment_no):
+        return os.path.join(self.store_dir, f"segment_{segment_no:05d}.seg")
+
+    def load_index(self):
+        """사이드카 인덱스 복원 (같은 문서는 마지막 기록 우선)"""
+        if os.path.exists(self.index_file):
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    parts = line.rstrip('\n').split('\t')
+                    if len(parts) != 4:
+                        continue  # 충돌로 잘린 마지막 줄
+                    doc_id, segment_no, offset, position = parts
+                    if segment_no == DELETED_SEGMENT:
+                        self.index.pop(doc_id, None)
+                    else:
+                        self.index[doc_id] = (int(segment_no), int(offset), int(position))
+
+        while os.path.exists(self.segment_path(self.segment_no + 1)):
+            self.segment_no += 1
+        self._truncate_torn_tail()
+
+        if self.index:
+            logger.info(f"📦 세그먼트 저장소 로드: {len(self.index):,}개 문서, 세그먼트 {self.segment_no + 1}개")
+
+    def _truncate_torn_tail(self):
+        """마지막 세그먼트 끝의 잘린 블록 제거 (마지막 인덱스 블록부터 검사)"""
+        path = self.segment_path(self.segment_no)
+        if not os.path.exists(path):
+            return
+        offsets = [offset for segment_no, offset, _ in self.index.values() if segment_no == self.segment_no]
+
+        with open(path, 'rb') as f:
+            f.seek(max(offsets, default=0))
+            valid_end = f.tell()
+            try:
+                while self._read_block(f) is not None:
+                    valid_end = f.tell()
+            except Exception:
+                pass
+
+        if valid_end < os.path.getsize(path):
+            logger.warning(f"세그먼트 끝의 잘린 블록 제거: {path}")
+            with open(path, 'r+b') as f:
+                f.truncate(valid_end)
+
+    def put(self, doc_id, text, **meta):
+        """문서 추가 (블록이 차면 압축하여 세그먼트에 기록)"""
+        record = dict(meta, doc_id=doc_id, text=text)
+        payload = msgpack.packb(record, use_bin_type=True)
+        raw_length = len(payload)
+        if self.use_dictionaries:
+            payload = self.dictionaries.compress(meta.get('domain'), payload)
+
+        with self.lock:
+            self.pending.append((doc_id, payload))
+            self.pending_bytes += raw_length
+            if self.pending_bytes >= self.block_size:
+                self._flush_block()
+
+    def _flush_block(self):
+        """대기 레코드를 블록 하나로 압축 기록 후 인덱스 추가 (lock 보유 상태)"""
+        if not self.pending:
+            return
+
+        raw = b''.join(RECORD_LENGTH.pack(len(payload)) + payload for _, payload in self.pending)
+        if self.use_dictionaries:
+            magic, compressed = DICT_BLOCK_MAGIC, raw
+        else:
+            magic, compressed = BLOCK_MAGIC, self.compressor.compress(raw)
+
+        path = self.segment_path(self.segment_no)
+        if os.path.exists(path) and os.path.getsize(path) >= self.segment_size:
+            self.segment_no += 1
+            path = self.segment_path(self.segment_no)
+
+        with open(path, 'ab') as f:
+            offset = f.tell()
+            f.write(BLOCK_HEADER.pack(magic, len(compressed), len(self.pending)))
+            f.write(compressed)
+
+        # 블록이 기록된 뒤에만 인덱스에 추가 (충돌 시 인덱스가 없는 블록만 남음)
+        with open(self.index_file, 'a', encoding='utf-8') as f:
+            for position, (doc_id, _) in enumerate(self.pending):
+                f.write(f"{doc_id}\t{self.segment_no}\t{offset}\t{position}\n")
+                self.index[doc_id] = (self.segment_no, offset, position)
+
+        self.pending = []
+        self.pending_bytes = 0
+
+    def delete(self, doc_id):
+        """문서 삭제 (인덱스에 삭제 표시만 추가, 세그먼트 공간은 유지)"""
+        with self.lock:
+            self._flush_block()
+            if self.index.pop(doc_id, None) is not None:
+                with open(self.index_file, 'a', encoding='utf-8') as f:
+                    f.write(f"{doc_id}\t{DELETED_SEGMENT}\t0\t0\n")
+
+    def flush(self):
+        """대기 중인 레코드 기록"""
+        with self.lock:
+            self._flush_block()
+
+    def close(self):
+        self.flush()
+
+    @staticmethod
+    def _split_records(raw):
+        """압축 해제된 블록 → 레코드 바이트 목록"""
+        records = []
+        position = 0
+        while position < len(raw):
+            (length,) = RECORD_LENGTH.unpack_from(raw, position)
+            position += RECORD_LENGTH.size
+            records.append(raw[position:position + length])
+            position += length
+        return records
+
+    def _read_block(self, f, decode=True):
+        """현재 위치의 블록 읽기 → 레코드 바이트 목록 (끝이면 None, decode=False면 사전 레코드는 압축 상태 유지)"""
+        header = f.read(BLOCK_HEADER.size)
+        if len(header) < BLOCK_HEADER.size:
+            return None
+        magic, compressed_length, _ = BLOCK_HEADER.unpack(header)
+        if magic not in (BLOCK_MAGIC, DICT_BLOCK_MAGIC):
+            raise ValueError(f"세그먼트 블록 손상: {f.name}")
+        compressed = f.read(compressed_length)
+        if len(compressed) < compressed_length:
+            return None  # 충돌로 잘린 마지막 블록
+        if magic == DICT_BLOCK_MAGIC:
+            records = self._split_records(compressed)
+            return [self.dictionaries.decompress(record) for record in records] if decode else records
+        return self._split_records(self.decompressor.decompress(compressed))
+
+    def _cached_block(self, segment_no, offset):
+        """임의 접근용 블록 캐시 (최근 블록 재사용, 사전 블록은 레코드별 압축 상태로 보관)"""
+        key = (segment_no, offset)
+        records = self.block_cache.get(key)
+        if records is not None:
+            self.block_cache.move_to_end(key)
+            return records
+
+        with open(self.segment_path(segment_no), 'rb') as f:
+            f.seek(offset)
+            records = self._read_block(f, decode=False)
+
+        self.block_cache[key] = records
+        if len(self.block_cache) > self.cache_blocks:
+            self.block_cache.popitem(last=False)
+        return records
+
+    def get(self, doc_id):
+        """문서 ID로 레코드 조회 (없으면 None)"""
+        location = self.index.get(doc_id)
+        if location is None:
+            return None
+        segment_no, offset, position = location
+        with self.lock:
+            payload = self._cached_block(segment_no, offset)[position]
+            # msgpack 레코드는 맵 마커로 시작하므로 zstd 프레임 헤더와 겹치지 않음
+            if payload[:4] == zstandard.FRAME_HEADER:
+                payload = self.dictionaries.decompress(payload)
+        return msgpack.unpackb(payload, raw=False)
+
+    def iter_records(self):
+        """전체 레코드 순차 스트리밍 (기록 순서, 최신 기록만)"""
+        for segment_no in range(self.segment_no + 1):
+            path = self.segment_path(segment_no)
+            if not os.path.exists(path):
+                continue
+            with open(path, 'rb') as f:
+                while True:
+                    offset = f.tell()
+                    records = self._read_block(f)
+                    if records is None:
+                        break
+                    for position, payload in enumerate(records):
+                        record = msgpack.unpackb(payload, raw=False)
+                        if self.index.get(record['doc_id']) == (segment_no, offset, position):
+                            yield record
+
+
+def pack_directory(source_dir, store_dir, use_dictionaries=False):
+    """기존 .txt 출력 디렉토리를 세그먼트 저장소로 적재 (use_dictionaries: 도메인 사전 압축 사용)"""
+    store = SegmentStore(store_dir, use_dictionaries=use_dictionaries)
+    files = sorted(f for f in os.listdir(source_dir) if f.endswith('.txt'))
+
+    for filename in files:
+        with open(os.path.join(source_dir, filename), 'r', encoding='utf-8') as f:
+            header, body, _ = parse_page(f.read())
+        url = header.get('URL', '')
+        doc_id = header.get('DOC_ID') or document_id(canonicalize_url(url) if url else filename)
+        depth = header.get('DEPTH')
+        store.put(doc_id, body, url=url, domain=header.get('DOMAIN'),
+                  depth=int(depth) if depth and depth.isdigit() else 0,
+                  timestamp=header.get('TIMESTAMP'), source_file=filename)
+    store.close()
+
+    total_bytes = sum(os.path.getsize(os.path.join(source_dir, f)) for f in files)
+    packed_bytes = sum(os.path.getsize(os.path.join(store_dir, f)) for f in os.listdir(store_dir))
+    print(f"📦 {source_dir}: {len(files):,}개 파일 ({total_bytes:,} bytes) → {store_dir} ({packed_bytes:,} bytes)")
+    return store
+
+
+def export_legacy(store_dir, output_dir, prefix="page"):
+    """세그먼트 저장소를 기존 .txt 레이아웃으로 내보내기 (Node 스크립트 호환)"""
+    store = SegmentStore(store_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    count = 0
+    for record in store.iter_records():
+        lines = [f"[{label}] {record[key]}" for key, label in EXPORT_HEADER_FIELDS
+                 if record.get(key) is not None]
+        lines.append(f"[LENGTH] {len(record['text'])}")
+
+        path = os.path.join(output_dir, f"{prefix}_{count:05d}.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n\n' + record['text'])
+        count += 1
+
+    print(f"📤 {store_dir} → {output_dir}: {count:,}개 파일")
+    return count
+
+
+if __name__ == "__main__":
+    use_dictionaries = '--dict' in sys.argv
+    sys.argv = [arg for arg in sys.argv if arg != '--dict']
+    if len(sys.argv) < 4 or sys.argv[1] not in ('pack', 'export'):
+        print("사용법:")
+        print("  python3 segment_store.py pack <txt 디렉토리> <저장소 디렉토리> [--dict]")
+        print("  python3 segment_store.py export <저장소 디렉토리> <txt 디렉토리> [접두어]")
+        sys.exit(1)
+
+    if sys.argv[1] == 'pack':
+        pack_directory(sys.argv[2], sys.argv[3], use_dictionaries)
+    else:
+        export_legacy(sys.argv[2], sys.argv[3], *sys.argv[4:5])
@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+스트리밍 단계 그래프 실행기 (crawl → clean → dedup → merge → chunk)
+- 단계마다 전용 스레드, 단계 사이는 제한 크기 큐로 연결 (하위 단계가 밀리면 상위 단계가 대기)
+- 크롤링이 진행되는 동안 이미 저장된/새로 기록된 페이지부터 정제(파일 읽기, 포맷 복구, MinHash 서명) 시작
+- 중복 제거: 실행 시작 시 알려진 기존 디렉토리 페이지는 목록이 끝나는 즉시(제어 항목) merge_crawling_data 와 같은 순서
+  (디렉토리 우선 → 품질 → 경로)로 선정해 바로 통합·청킹 단계로 전달, 그 뒤 크롤링된 페이지는 도착할 때마다
+  지금까지의 코퍼스 기준 품질 + 통과 페이지/LSH 색인과의 중복을 확인해 바로 전달
+  → 입력이 끝나면 전체를 다시 선정해 도착 순서 때문에 달라진 페이지만 정정(제외/교체), 최종 결과는 일괄 통합과 동일
+- 청킹 결과(chunk_output/<이름>.jsonl)는 embed-website-data.js --chunks 가 그대로 임베딩
+- 크롤러 스레드 오류는 기존 페이지 공급이 끝난 뒤 크롤링 단계 오류로 다시 발생
+- 단계별 캐시: 입력 키(경로 + mtime/크기/본문 해시 등)가 같으면 이전 결과 재사용 → 재실행 시 바뀐 페이지만 처리
+- 통합 단계는 merge_crawling_data.py 와 같은 상태/델타/뷰 파일을 기록하므로 두 방식을 섞어 실행 가능
+- 단계별 보고: 입력/출력/캐시/제외/실패 수, 처리 시간, 첫 출력 시각
+"""
+
+import os
+import re
+import sys
+import json
+import queue
+import asyncio
+import hashlib
+import threading
+import time
+from datetime import datetime
+from collections import Counter, defaultdict
+import numpy as np
+import logging
+import merge_crawling_data
+from merge_crawling_data import CrawlingDataMerger, MERGE_SOURCES, MIN_QUALITY_SCORE, MAX_PAGES_PER_DOMAIN, scan_page
+from quality_engine import StreamingCorpus
+from corpus_manifest import CorpusManifest, file_fingerprint, parse_page
+from legacy_ingest import repair_content
+from url_alias import AliasMap
+from near_duplicate_index import NearDuplicateIndex
+from state_codec import write_state_file, load_state_file
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = "pipeline_cache"
+CHUNK_DIR = "chunk_output"
+CHUNK_SIZE = 1000  # embed-website-data.js CONFIG.chunkSize 와 동일
+MIN_CHUNK_BODY = 50  # embed-website-data.js 와 같은 최소 본문 길이
+CHUNK_FORMAT = 2  # 청크 레코드 형식 (바뀌면 캐시 무효화)
+_SENTENCE_BOUNDARY = re.compile(r'[.!?]\s+')
+
+_END = object()
+_MISS = object()
+EXISTING_LISTED = "existing_listed"  # 기존 디렉토리 페이지 공급 완료 제어 항목
+
+
+class Marker:
+    """단계 사이로 그대로 전달되는 제어 항목 (처리/통계 대상 아님, 단계의 on_marker 가 받아 항목을 내보낼 수 있음)"""
+
+    def __init__(self, name):
+        self.name = name
+
+
+class StageCache:
+    """단계 결과 캐시 (입력 키 → 출력), 이번 실행에서 사용한 키만 다음 실행용으로 저장"""
+
+    def __init__(self, path):
+        self.path = path
+        state = load_state_file(path)
+        self.previous = state['entries'] if state else {}
+        self.current = {}
+
+    def get(self, key):
+        value = self.previous.get(key, _MISS)
+        if value is not _MISS:
+            self.current[key] = value
+        return value
+
+    def put(self, key, value):
+        self.current[key] = value
+
+    def save(self):
+        write_state_file(self.path, {'entries': self.current, 'saved_at': datetime.now().isoformat()})
+
+
+class Stage:
+    def __init__(self, name, process, cache_key=None, on_close=None, on_marker=None):
+        self.name = name
+        self.process = process        # 입력 → 출력 (None이면 하위 단계로 넘기지 않음)
+        self.cache_key = cache_key    # 입력 → 캐시 키 (None이면 캐시 없음)
+        self.on_close = on_close      # 입력이 끝난 뒤 정리 작업 (반환한 항목은 하위 단계로 전달)
+        self.on_marker = on_marker    # 제어 항목 도착 시 작업 (반환한 항목은 하위 단계로 전달, 보류했던 입력 등)
+        self.cache = None
+        self.stats = {'in': 0, 'out': 0, 'cached': 0, 'dropped': 0, 'failed': 0, 'busy': 0.0, 'first_out': None}
+
+
+class StagePipeline:
+    def __init__(self, stages, queue_size=256, cache_dir=CACHE_DIR):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.cache_dir = cache_dir
+        self.errors = []
+
+    def run(self, source_name, source):
+        """source(emit)가 넣는 항목을 단계 순서대로 흘려보내고 모든 단계가 끝날 때까지 대기"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for stage in self.stages:
+            if stage.cache_key:
+                stage.cache = StageCache(os.path.join(self.cache_dir, f"{stage.name}.msgpack"))
+
+        self.started = time.time()
+        self.source_stats = {'name': source_name, 'out': 0, 'busy': 0.0, 'first_out': None}
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = [threading.Thread(target=self._run_source, args=(source, queues[0]), name=source_name)]
+        for index, stage in enumerate(self.stages):
+            output = queues[index + 1] if index + 1 < len(queues) else None
+            threads.append(threading.Thread(target=self._run_stage, args=(stage, queues[index], output),
+                                            name=stage.name))
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for stage in self.stages:
+            if stage.cache:
+                stage.cache.save()
+        self.report()
+        if self.errors:
+            raise self.errors[0]
+
+    def _run_source(self, source, output):
+        def emit(item):
+            if isinstance(item, Marker):
+                output.put(item)
+                return
+            if self.source_stats['first_out'] is None:
+                self.source_stats['first_out'] = time.time() - self.started
+            self.source_stats['out'] += 1
+            output.put(item)
+
+        started = time.time()
+        try:
+            source(emit)
+        except Exception as e:
+            logger.error(f"❌ {self.source_stats['name']} 단계 오류: {e}")
+            self.errors.append(e)
+        finally:
+            self.source_stats['busy'] = time.time() - started
+            output.put(_END)
+
+    def _run_stage(self, stage, input_queue, output):
+        stats = stage.stats
+        while True:
+            item = input_queue.get()
+            if item is _END:
+                break
+            if isinstance(item, Marker):
+                self._forward_marker(stage, item, output)
+                continue
+            stats['in'] += 1
+            started = time.time()
+            try:
+                result = self._process(stage, item)
+            except Exception as e:
+                stats['failed'] += 1
+                logger.error(f"❌ {stage.name} 단계 처리 오류: {e}")
+                result = None
+            stats['busy'] += time.time() - started
+
+            if result is None:
+                stats['dropped'] += 1
+                continue
+            self._emit(stats, output, result)
+
+        try:
+            if stage.on_close:
+                for result in stage.on_close() or ():
+                    self._emit(stats, output, result)
+            if stage.on_marker:
+                # 보류했다가 제어 항목/정리 작업에서 내보낸 입력은 제외로 세지 않음
+                stats['dropped'] = max(stats['in'] - stats['failed'] - stats['out'], 0)
+        except Exception as e:
+            logger.error(f"❌ {stage.name} 단계 정리 오류: {e}")
+            self.errors.append(e)
+        finally:
+            if output is not None:
+                output.put(_END)
+
+    def _forward_marker(self, stage, marker, output):
+        """제어 항목 처리 후 하위 단계로 그대로 전달"""
+        started = time.time()
+        try:
+            if stage.on_marker:
+                for result in stage.on_marker(marker) or ():
+                    self._emit(stage.stats, output, result)
+        except Exception as e:
+            logger.error(f"❌ {stage.name} 단계 제어 항목 오류: {e}")
+            self.errors.append(e)
+        stage.stats['busy'] += time.time() - started
+        if output is not None:
+            output.put(marker)
+
+    def _emit(self, stats, output, result):
+        if stats['first_out'] is None:
+            stats['first_out'] = time.time() - self.started
+        stats['out'] += 1
+        if output is not None:
+            output.put(result)
+
+    @staticmethod
+    def _process(stage, item):
+        """캐시 키가 같으면 이전 결과 재사용, 아니면 처리 후 기록"""
+        if not stage.cache:
+            return stage.process(item)
+        key = stage.cache_key(item)
+        result = stage.cache.get(key)
+        if result is not _MISS:
+            stage.stats['cached'] += 1
+            return result
+        result = stage.process(item)
+        stage.cache.put(key, result)
+        return result
+
+    def report(self):
+        elapsed = time.time() - self.started
+        print(f"🧵 단계 그래프 완료 ({elapsed:.1f}초)")
+        print(f"   {'단계':<8}{'입력':>8}{'출력':>8}{'캐시':>8}{'제외':>8}{'실패':>6}{'처리(초)':>10}{'첫 출력(초)':>12}")
+
+        def first(value):
+            return f"{value:.1f}" if value is not None else "-"
+
+        source = self.source_stats
+        print(f"   {source['name']:<8}{'-':>8}{source['out']:>8,}{'-':>8}{'-':>8}{'-':>6}"
+              f"{source['busy']:>10.1f}{first(source['first_out']):>12}")
+        for stage in self.stages:
+            stats = stage.stats
+            print(f"   {stage.name:<8}{stats['in']:>8,}{stats['out']:>8,}{stats['cached']:>8,}{stats['dropped']:>8,}"
+                  f"{stats['failed']:>6,}{stats['busy']:>10.1f}{first(stats['first_out']):>12}")
+
+
+def split_chunks(text, chunk_size=CHUNK_SIZE):
+    """문장 단위 청킹 (embed-website-data.js createChunks 와 같은 규칙)"""
+    chunks, current = [], ''
+    for sentence in _SENTENCE_BOUNDARY.split(text):
+        candidate = current + sentence + '. '
+        if len(candidate) > chunk_size and current:
+            chunks.append(current.strip())
+            current = sentence + '. '
+        else:
+            current = candidate
+    if current.strip():
+        chunks.append(current.strip())
+    return [chunk for chunk in chunks if len(chunk) > 20]
+
+
+class IntegrationStages:
+    """크롤링 → 정제 → 중복 제거 → 통합 → 청킹 단계 구현"""
+
+    def __init__(self, crawl=True, max_pages=3000, chunk_dir=CHUNK_DIR, crawler_factory=None):
+        self.crawl_pages = crawl
+        self.max_pages = max_pages
+        self.chunk_dir = chunk_dir
+        self.crawler_factory = crawler_factory  # 크롤러 생성 함수 (None이면 StrategicCrawler)
+        self.crawler_error = None
+        self.merger = CrawlingDataMerger(view_mode="link")
+
+    def prepare(self):
+        """통합 상태 로드 (뷰 방식이 다르거나 상태가 없으면 통합 디렉토리 새로 구성)"""
+        merger = self.merger
+        merger.processed_docs = set()
+        merger.seen_blobs = set()
+        merger.alias_map = AliasMap(merger.alias_file)
+        merger.duplicate_index = NearDuplicateIndex(threshold=merge_crawling_data.NEAR_DUPLICATE_THRESHOLD)
+        merger.manifest = CorpusManifest()
+        merger.store = None
+        merge_crawling_data._init_worker()
+
+        loaded = merger.load_previous_state()
+        if loaded is None:
+            merger.create_merged_directory()
+            self.previous_accepted = {}
+        else:
+            self.previous_accepted = loaded[1]
+        self.entries, self.accepted = {}, {}  # 경로 → 요약 메타데이터, 이름 → 통과 페이지
+        self.selected = {}  # 이름 → 중복 제거 단계에서 하위 단계로 보낸 페이지
+        self.corpus = None  # 기존 페이지 선정 뒤 생성 (이후 도착 페이지 점수 계산)
+        self.domain_counts = Counter()
+        self.streamed = 0
+        self.delta = {'add': [], 'update': [], 'delete': []}
+        os.makedirs(self.chunk_dir, exist_ok=True)
+
+    def stages(self):
+        return [
+            Stage('clean', self.clean, cache_key=self.clean_key),
+            Stage('dedup', self.dedup, on_close=self.finish_dedup, on_marker=self.select_existing),
+            Stage('merge', self.merge, on_close=self.finish_merge),
+            Stage('chunk', self.chunk, cache_key=self.chunk_key, on_close=self.finish_chunks),
+        ]
+
+    def page_task(self, page, prefix):
+        """매니페스트 레코드 → 정제 단계 입력"""
+        return {
+            'path': page['path'],
+            'url': page['url'] or "",
+            'domain': page['domain'] or "",
+            'length': page['length'],
+            'doc_id': self.merger.stable_doc_id(page),
+            'prefix': prefix,
+            'fingerprint': file_fingerprint(page['path'], page['content_hash']),
+        }
+
+    def crawl(self, emit):
+        """크롤링 단계: 새로 기록되는 페이지를 바로 흘려보내면서 기존 출력 디렉토리 페이지도 순서대로 공급 (끝나면 제어 항목)"""
+        crawler_thread = None
+        if self.crawl_pages:
+            crawler_thread = threading.Thread(target=self._run_crawler, args=(emit,), name="crawler")
+            crawler_thread.start()
+
+        for source_dir, prefix in MERGE_SOURCES:
+            if not os.path.exists(source_dir):
+                continue
+            self.merger.manifest.sync_directory(source_dir)
+            for page in self.merger.manifest.pages(source_dir):
+                emit(self.page_task(page, prefix))
+        emit(Marker(EXISTING_LISTED))
+
+        if crawler_thread:
+            crawler_thread.join()
+            if self.crawler_error is not None:
+                raise self.crawler_error
+
+    def _run_crawler(self, emit):
+        """전략적 크롤러 실행 (페이지 기록 콜백에서 하위 단계로 전달, 오류는 crawl()에서 다시 발생)"""
+        try:
+            self._crawl_pages(emit)
+        except Exception as e:
+            logger.error(f"❌ 크롤러 스레드 오류: {e}")
+            self.crawler_error = e
+
+    def _crawl_pages(self, emit):
+        if self.crawler_factory:
+            crawler = self.crawler_factory()
+        else:
+            from strategic_crawler import StrategicCrawler
+            crawler = StrategicCrawler()
+        record = crawler.page_writer.on_written
+
+        def on_written(path, content):
+            record(path, content)
+            header, body, _ = parse_page(content)
+            page = {'path': os.path.normpath(path), 'url': header.get('URL', ''), 'domain': header.get('DOMAIN'),
+                    'length': len(body), 'doc_id': header.get('DOC_ID'),
+                    'content_hash': hashlib.md5(body.encode()).hexdigest()}
+            emit(self.page_task(page, "strategic"))
+
+        crawler.page_writer.on_written = on_written
+        asyncio.run(crawler.run_strategic_crawling(max_pages=self.max_pages))
+
+    @staticmethod
+    def clean_key(task):
+        return json.dumps([task['path'], task['fingerprint'], task['doc_id'], task['prefix'],
+                           merge_crawling_data.SCAN_FORMAT])
+
+    @staticmethod
+    def clean(task):
+        """정제 단계: 파일 읽기/포맷 복구 → 본문 키, MinHash 서명 (본문은 넘기지 않음)"""
+        entry = scan_page((task['path'], task['url'], task['domain'], task['length'], task['fingerprint']))
+        if entry is None:
+            return None
+        entry.update(doc_id=task['doc_id'], prefix=task['prefix'], signature=entry['signature'].tobytes())
+        return entry
+
+    def dedup(self, entry):
+        """중복 제거 단계: 기존 페이지 목록이 끝나기 전에는 모아 두고, 그 뒤 도착한 페이지는 바로 확인해 전달
+        (같은 경로가 다시 오면 mtime이 최신인 기록 사용)"""
+        entry = dict(entry, signature=np.frombuffer(entry['signature'], dtype=np.uint32))
+        known = self.entries.get(entry['path'])
+        if known is not None and entry['fingerprint'][0] < known['fingerprint'][0]:
+            return None
+        self.entries[entry['path']] = entry
+        if self.corpus is None:
+            return None
+        return self.stream_entry(entry, known)
+
+    def select_all(self):
+        """모은 입력의 품질 점수 일괄 계산 후 디렉토리 우선 → 품질 → 경로 순으로 선정 (merge_crawling_data 와 같은 결과)"""
+        merger = self.merger
+        merger.processed_docs, merger.seen_blobs = set(), set()
+        merger.duplicate_index = NearDuplicateIndex(threshold=merge_crawling_data.NEAR_DUPLICATE_THRESHOLD)
+        for key in ('total_files', 'duplicates', 'identical_content', 'near_duplicates'):
+            merger.stats.pop(key, None)
+        for _, prefix in MERGE_SOURCES:
+            merger.stats.pop(f'{prefix}_files', None)
+        merger.domain_stats = defaultdict(int)
+
+        entries = list(self.entries.values())
+        merger.score_entries(entries)
+        by_prefix = {}
+        for entry in entries:
+            by_prefix.setdefault(entry['prefix'], []).append(entry)
+        selected = {}
+        for source_dir, prefix in MERGE_SOURCES:
+            selected.update(merger.select_pages(by_prefix.pop(prefix, []), source_dir, prefix))
+        return selected
+
+    def select_existing(self, marker):
+        """기존 디렉토리 페이지 공급이 끝나면 모은 페이지를 선정해 바로 전달 (이후 도착 페이지용 코퍼스 누적 시작)"""
+        if marker.name != EXISTING_LISTED:
+            return []
+        self.selected = self.select_all()
+        self.corpus = StreamingCorpus(self.merger.quality_engine)
+        for entry in self.entries.values():
+            self.corpus.add(entry['quality_features'], entry['exact_hash'])
+        self.domain_counts = Counter(entry['domain'] for entry in self.entries.values() if entry['quality_pass'])
+        logger.info(f"📥 기존 페이지 선정: {len(self.entries):,}개 중 {len(self.selected):,}개 통과 → 통합 단계로 전달")
+        return list(self.selected.values())
+
+    def stream_entry(self, entry, known):
+        """기존 페이지 선정 뒤 도착한 페이지: 지금까지의 코퍼스 기준 품질 + 통과 페이지/LSH 색인과의 중복 확인"""
+        self.streamed += 1
+        score = self.corpus.score(entry['quality_features'], entry['url'], entry['exact_hash'])
+        entry['quality_score'] = round(score, 4)
+        entry['quality_pass'] = score >= MIN_QUALITY_SCORE and \
+            self.domain_counts[entry['domain']] < MAX_PAGES_PER_DOMAIN
+        if not entry['quality_pass']:
+            return None
+        self.domain_counts[entry['domain']] += 1
+
+        # 이미 통과한 파일이 다시 기록되면 그대로 교체 (같은 문서 ID라 중복으로 보지 않음)
+        name = self.merger.output_name(entry)
+        replaced = known is not None and self.selected.get(name) is known
+        if not replaced and self.merger.is_duplicate(entry):
+            return None
+        self.selected[name] = entry
+        return entry
+
+    def finish_dedup(self):
+        """모든 입력 기준으로 다시 선정해 도착 순서 때문에 달라진 페이지만 정정 (최종 통과 집합은 일괄 통합과 동일)"""
+        if self.corpus is None:  # 기존 페이지 목록을 끝까지 받지 못함 (크롤링 단계 오류)
+            return list(self.select_all().values())
+        if not self.streamed:
+            return []
+
+        final = self.select_all()
+        retracted = [{'retract': name} for name in self.selected if name not in final]
+        changed = [entry for name, entry in final.items() if self.selected.get(name) is not entry]
+        self.selected = final
+        logger.info(f"🔁 중복 제거 정정: 선정 뒤 도착 {self.streamed:,}개, 제외 {len(retracted):,}개, "
+                    f"추가/교체 {len(changed):,}개")
+        return retracted + changed
+
+    def merge(self, entry):
+        """통합 단계: 이전 실행과 같은 페이지는 그대로 두고 추가/변경분만 통합 뷰에 반영 (정정 항목은 교체/제외)"""
+        if 'retract' in entry:
+            name = entry['retract']
+            removed = self.accepted.pop(name, None)
+            # 이전 실행에 있던 페이지는 finish_merge 에서 삭제
+            if removed is not None and name not in self.previous_accepted:
+                self.merger.remove_page(name, removed)
+            return None
+
+        name = self.merger.output_name(entry)
+        replaced = name in self.accepted
+        self.accepted[name] = entry
+        known = self.previous_accepted.get(name)
+        if replaced or known is None or known['fingerprint'] != entry['fingerprint'] or known['path'] != entry['path']:
+            self.merger.write_page(entry, name)
+        return dict(entry, name=name)
+
+    def finish_merge(self):
+        """통과하지 않은 이전 페이지 삭제 후 뷰/델타/상태/메타데이터 기록"""
+        merger = self.merger
+        self.delta = merger.diff_accepted(self.previous_accepted, self.accepted)
+        for name in self.delta['delete']:
+            merger.remove_page(name, self.previous_accepted[name])
+
+        merger.delta = self.delta
+        merger.write_view(self.accepted)
+        merger.write_delta(self.delta, self.accepted, self.previous_accepted)
+        merger.save_state(list(self.entries.values()), self.accepted)
+        merger.create_metadata()
+        merger.manifest.close()
+
+    @staticmethod
+    def chunk_key(entry):
+        return f"{entry['doc_id']}|{entry['blob']}|{entry['url']}|{CHUNK_SIZE}|{CHUNK_FORMAT}"
+
+    def chunk(self, entry):
+        """청킹 단계: 본문을 청크로 나눠 문서별 JSONL 기록 (embed-website-data.js 가 그대로 임베딩) → 청크 수"""
+        with open(entry['path'], 'r', encoding='utf-8') as f:
+            content, _ = repair_content(f.read())
+        header, body, _ = parse_page(content)
+        body = body.strip()
+        chunks = split_chunks(body) if len(body) >= MIN_CHUNK_BODY else []
+        depth, length = header.get('DEPTH', ''), header.get('LENGTH', '')
+        meta = {'doc_id': entry['doc_id'], 'url': entry['url'], 'domain': entry['domain'],
+                'depth': int(depth) if depth.isdigit() else 0, 'length': int(length) if length.isdigit() else 0,
+                'timestamp': header.get('TIMESTAMP')}
+
+        tmp_path = os.path.join(self.chunk_dir, f"{entry['name']}.jsonl.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for index, chunk in enumerate(chunks):
+                f.write(json.dumps(dict(meta, id=f"{entry['name']}.txt_chunk_{index}", chunk_index=index,
+                                        total_chunks=len(chunks), content=chunk), ensure_ascii=False) + '\n')
+        os.replace(tmp_path, os.path.join(self.chunk_dir, f"{entry['name']}.jsonl"))
+        return len(chunks)
+
+    def finish_chunks(self):
+        """이번 실행에서 통과하지 않은 문서의 청크 파일 삭제"""
+        removed = 0
+        for filename in os.listdir(self.chunk_dir):
+            if filename.endswith('.jsonl') and filename[:-len('.jsonl')] not in self.accepted:
+                os.remove(os.path.join(self.chunk_dir, filename))
+                removed += 1
+        logger.info(f"🧩 청크 파일: 문서 {len(self.accepted):,}개 (삭제 {removed:,}개) → {self.chunk_dir}/")
+
+
+def run_integration(crawl=True, max_pages=3000, queue_size=256):
+    """크롤링~청킹 단계 그래프 실행 → 통합 델타"""
+    integration = IntegrationStages(crawl=crawl, max_pages=max_pages)
+    integration.prepare()
+    pipeline = StagePipeline(integration.stages(), queue_size=queue_size)
+    pipeline.run('crawl', integration.crawl)
+    return integration.delta
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    delta = run_integration(crawl='--crawl' in sys.argv)
+    print(f"🔀 통합 델타: 추가 {len(delta['add']):,}개, 갱신 {len(delta['update']):,}개, 삭제 {len(delta['delete']):,}개")
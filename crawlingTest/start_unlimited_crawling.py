@@ -12,6 +12,7 @@ import asyncio
 import time
 from datetime import datetime
 import logging
+from corpus_manifest import CorpusManifest
 
 # 로깅 설정
 logging.basicConfig(
@@ -24,6 +25,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def manifest_count(dir_name):
+    """매니페스트 기준 디렉토리 페이지 수 (비어 있으면 한 번 보충)"""
+    manifest = CorpusManifest()
+    if manifest.count(dir_name) == 0:
+        manifest.sync_directory(dir_name)
+    count = manifest.count(dir_name)
+    manifest.close()
+    return count
+
 def show_current_status():
     """현재 크롤링 상태 표시"""
     logger.info("🔍 현재 크롤링 상태 확인")
@@ -38,16 +48,17 @@ def show_current_status():
     total_files = 0
     for dir_name, description in directories:
         if os.path.exists(dir_name):
-            files = [f for f in os.listdir(dir_name) if f.endswith('.txt')]
-            count = len(files)
+            count = manifest_count(dir_name)
             total_files += count
             logger.info(f"📁 {description}: {count:,}개 파일")
     
     logger.info(f"📊 전체 합계: {total_files:,}개")
     
     # 체크포인트 파일 확인
-    if os.path.exists('unlimited_crawler_checkpoint.json'):
-        checkpoint_time = os.path.getmtime('unlimited_crawler_checkpoint.json')
+    checkpoint_files = [f for f in ('unlimited_crawler_checkpoint.msgpack', 'unlimited_crawler_checkpoint.json')
+                        if os.path.exists(f)]
+    if checkpoint_files:
+        checkpoint_time = os.path.getmtime(checkpoint_files[0])
         checkpoint_str = datetime.fromtimestamp(checkpoint_time).strftime('%Y-%m-%d %H:%M:%S')
         logger.info(f"🔄 체크포인트 발견: {checkpoint_str}")
         logger.info("📝 이전 크롤링 세션에서 이어서 진행 가능")
@@ -105,8 +116,7 @@ def post_crawling_analysis(collected_pages):
         
         for dir_name, description in directories:
             if os.path.exists(dir_name):
-                files = [f for f in os.listdir(dir_name) if f.endswith('.txt')]
-                count = len(files)
+                count = manifest_count(dir_name)
                 total_files += count
                 logger.info(f"📁 {description}: {count:,}개")
         
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+크롤러 상태 파일 바이너리 포맷 (msgpack)
+- 매직 바이트 + 스키마 버전 + msgpack 본문 (JSON 대비 로드/저장 수 배 빠름)
+- 확장자로 포맷 결정 (.msgpack = 바이너리, 그 외 = JSON)
+- 임시 파일 + fsync + rename 원자적 교체, 직전 파일은 .bak 보존
+- 기존 JSON 상태/체크포인트 파일 변환기
+"""
+
+import os
+import sys
+import json
+import time
+import msgpack
+import logging
+
+logger = logging.getLogger(__name__)
+
+STATE_MAGIC = b'DJST'
+STATE_VERSION = 1
+BINARY_EXTENSION = '.msgpack'
+
+# 변환 대상 기존 JSON 상태 파일 → 바이너리 상태 파일
+LEGACY_STATE_FILES = {
+    'enhanced_crawler_state.json': 'enhanced_crawler_state.msgpack',
+    'strategic_crawler_state.json': 'strategic_crawler_state.msgpack',
+    'unlimited_crawler_checkpoint.json': 'unlimited_crawler_checkpoint.msgpack',
+}
+
+
+def is_binary_path(path):
+    """바이너리 상태 파일 여부 (확장자 기준)"""
+    return path.endswith(BINARY_EXTENSION)
+
+
+def pack_state(state):
+    """상태 dict → 바이너리 (매직 + 버전 + msgpack)"""
+    header = STATE_MAGIC + bytes([STATE_VERSION])
+    return header + msgpack.packb(state, use_bin_type=True)
+
+
+def unpack_state(payload):
+    """바이너리 → 상태 dict (매직/버전 검증)"""
+    if payload[:4] != STATE_MAGIC:
+        raise ValueError("상태 파일 매직 바이트 불일치")
+    version = payload[4]
+    if version > STATE_VERSION:
+        raise ValueError(f"지원하지 않는 상태 파일 버전: {version}")
+    return msgpack.unpackb(payload[5:], raw=False, strict_map_key=False)
+
+
+def encode_state(path, state, indent=None):
+    """경로 확장자에 맞게 상태 직렬화"""
+    if is_binary_path(path):
+        return pack_state(state)
+    return json.dumps(state, ensure_ascii=False, indent=indent).encode('utf-8')
+
+
+def decode_state(path, payload):
+    """경로 확장자에 맞게 상태 역직렬화"""
+    if is_binary_path(path):
+        return unpack_state(payload)
+    return json.loads(payload.decode('utf-8'))
+
+
+def write_state_file(path, state, indent=None):
+    """임시 파일 기록 + fsync 후 교체 (직전 파일은 .bak으로 보존)"""
+    payload = encode_state(path, state, indent)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    if os.path.exists(path):
+        os.replace(path, f"{path}.bak")
+    os.replace(tmp_path, path)
+
+
+def load_state_file(path):
+    """상태 로드 (본 파일이 없거나 손상되면 .bak 사용, 둘 다 실패 시 None)"""
+    for candidate in (path, f"{path}.bak"):
+        if not os.path.exists(candidate):
+            continue
+        try:
+            with open(candidate, 'rb') as f:
+                state = decode_state(path, f.read())
+            if candidate != path:
+                logger.warning(f"⚠️ {path} 사용 불가, 백업에서 복원: {candidate}")
+            return state
+        except Exception as e:
+            logger.error(f"상태 파일 로드 실패 {candidate}: {e}")
+    return None
+
+
+def migrate_legacy_state(legacy_path, binary_path):
+    """바이너리 상태가 없고 기존 JSON만 있으면 변환 (변환 여부 반환)"""
+    if os.path.exists(binary_path) or not os.path.exists(legacy_path):
+        return False
+
+    state = load_state_file(legacy_path)
+    if state is None:
+        logger.error(f"기존 상태 변환 불가 (손상): {legacy_path}")
+        return False
+
+    write_state_file(binary_path, state)
+    logger.info(f"🔄 상태 파일 변환: {legacy_path} → {binary_path}")
+    return True
+
+
+def convert_all(directory="."):
+    """디렉토리의 기존 JSON 상태 파일을 모두 바이너리로 변환"""
+    for legacy_name, binary_name in LEGACY_STATE_FILES.items():
+        legacy_path = os.path.join(directory, legacy_name)
+        binary_path = os.path.join(directory, binary_name)
+        if not os.path.exists(legacy_path):
+            continue
+
+        if not migrate_legacy_state(legacy_path, binary_path):
+            print(f"⏭️ {legacy_name}: 건너뜀 (이미 변환됨 또는 손상)")
+            continue
+
+        started = time.time()
+        load_state_file(binary_path)
+        elapsed = time.time() - started
+        print(f"✅ {legacy_name} ({os.path.getsize(legacy_path):,} bytes) → "
+              f"{binary_name} ({os.path.getsize(binary_path):,} bytes, 로드 {elapsed * 1000:.0f}ms)")
+
+
+if __name__ == "__main__":
+    convert_all(sys.argv[1] if len(sys.argv) > 1 else ".")
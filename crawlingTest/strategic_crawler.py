@@ -7,7 +7,6 @@
 
 import os
 import time
-import json
 import asyncio
 import aiohttp
 import requests
@@ -24,6 +23,11 @@ from collections import defaultdict
 import hashlib
 from datetime import datetime
 import logging
+from table_extractor import inline_table_blocks
+from checkpoint_log import BackgroundWriter
+from corpus_manifest import CorpusManifest
+from blob_store import BlobStore
+from page_writer import PageWriter
 
 # 로깅 설정
 logging.basicConfig(
@@ -45,9 +49,16 @@ class StrategicCrawler:
         
         # 디렉토리 설정
         self.output_dir = "strategic_output"
-        self.state_file = "strategic_crawler_state.json"
+        self.state_file = "strategic_crawler_state.msgpack"
+        self.state_writer = BackgroundWriter(self.state_file)
         self.existing_data_dir = "enhanced_output"
         
+        # 코퍼스 매니페스트 (기존 데이터 조회 + 저장 시점 기록)
+        self.manifest = CorpusManifest()
+        self.blob_store = BlobStore(manifest=self.manifest)  # 크롤러 간 공유 본문 색인 (본문은 페이지 파일에만 저장)
+        # 페이지 파일은 전용 스레드가 배치 기록 (크롤링 루프는 저장소 지연에 막히지 않음)
+        self.page_writer = PageWriter(self.output_dir, on_written=self.manifest.record)
+        
         os.makedirs(self.output_dir, exist_ok=True)
         
         # 크롤링 상태
@@ -266,22 +277,11 @@ class StrategicCrawler:
             logger.warning(f"기존 데이터 디렉토리 없음: {self.existing_data_dir}")
             return
         
-        count = 0
-        for filename in os.listdir(self.existing_data_dir):
-            if filename.endswith('.txt'):
-                filepath = os.path.join(self.existing_data_dir, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        url_match = re.search(r'\[URL\] (https?://[^\n]+)', content)
-                        if url_match:
-                            url = url_match.group(1).strip()
-                            self.existing_urls.add(url)
-                            count += 1
-                except Exception as e:
-                    logger.warning(f"기존 데이터 로드 오류: {filename} - {e}")
-        
-        logger.info(f"✅ 기존 URL {count:,}개 로드 완료")
+        # 매니페스트에 없는 새 파일만 읽어 보충 후 인덱스 조회
+        self.manifest.sync_directory(self.existing_data_dir)
+        self.existing_urls.update(self.manifest.urls(self.existing_data_dir))
+        
+        logger.info(f"✅ 기존 URL {len(self.existing_urls):,}개 로드 완료")
 
     def is_excluded_url(self, url):
         """URL 제외 여부 검사"""
@@ -408,6 +408,9 @@ class StrategicCrawler:
         for tag in soup(['script', 'style', 'nav', 'header', 'footer', 'aside']):
             tag.decompose()
         
+        # 표는 행 단위로 직렬화하여 구조 유지
+        inline_table_blocks(soup)
+        
         # 텍스트 추출 및 정제
         text = soup.get_text()
         lines = [line.strip() for line in text.splitlines()]
@@ -431,14 +434,19 @@ class StrategicCrawler:
         content += page_data['content']
         
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
+            # 다른 URL/크롤러가 이미 저장한 본문이면 URL 참조만 기록하고 파일은 만들지 않음
+            blob_key, is_new = self.blob_store.put(page_data['url'], page_data['content'], filepath,
+                                                   source=self.output_dir)
+            if not is_new:
+                logger.info(f"🧬 동일 본문 이미 저장됨: {page_data['url']} → {self.blob_store.holder(blob_key)}")
+                return False
+            
+            self.page_writer.submit(filepath, content)
             self.saved_texts.append(filepath)
             self.saved_urls.append(page_data['url'])
             self.domain_stats[page_data['domain']] += 1
             
-            logger.info(f"💾 저장: {filename} ({page_data['domain']}) - {page_data['length']}자")
+            logger.debug(f"💾 저장: {filename} ({page_data['domain']}) - {page_data['length']}자")
             return True
             
         except Exception as e:
@@ -446,21 +454,16 @@ class StrategicCrawler:
             return False
 
     def save_state(self):
-        """상태 저장"""
+        """상태 저장 (얕은 복사만 하고 기록은 백그라운드 스레드에서)"""
         state = {
             'visited': list(self.visited),
             'to_visit': list(self.to_visit),
-            'saved_urls': self.saved_urls,
-            'url_depths': self.url_depths,
+            'saved_urls': list(self.saved_urls),
+            'url_depths': dict(self.url_depths),
             'domain_stats': dict(self.domain_stats),
             'timestamp': datetime.now().isoformat()
         }
-        
-        try:
-            with open(self.state_file, 'w', encoding='utf-8') as f:
-                json.dump(state, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"상태 저장 오류: {e}")
+        self.state_writer.submit(state)
 
     async def run_strategic_crawling(self, max_pages=3000):
         """전략적 보완 크롤링 실행"""
@@ -516,8 +519,13 @@ class StrategicCrawler:
                 # 속도 조절
                 await asyncio.sleep(1)
         
-        # 최종 상태 저장
+        # 최종 상태 저장 (기록 완료까지 대기)
         self.save_state()
+        self.state_writer.close()
+        self.page_writer.close()
+        self.manifest.commit()
+        blob_stats = self.blob_store.get_stats()
+        logger.info(f"🧬 내용 주소 저장소: URL {blob_stats['urls']:,}개 → 고유 본문 {blob_stats['unique_blobs']:,}개 (절감 {blob_stats['dedup_ratio']:.1%})")
         
         logger.info("✅ 전략적 크롤링 완료")
         logger.info(f"📊 총 수집: {processed}개 페이지")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+표(<table>) 보존 추출 모듈
+- 교육과정표, 교수진 연락처, 시간표 등의 행 구조 유지
+- 헤더 행 자동 감지
+- 마크다운/TSV 형식의 압축 직렬화
+- 본문과 분리된 'table' 타입 블록으로 반환
+"""
+
+import re
+
+TABLE_BLOCK_PREFIX = "[TABLE]"
+TABLE_PLACEHOLDER = "__TABLE_BLOCK_{}__"
+TABLE_PLACEHOLDER_PATTERN = re.compile(r'^__TABLE_BLOCK_(\d+)__$')
+
+# 표 셀 내부 공백 정리용
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def _cell_text(cell):
+    """셀 텍스트 추출 (줄바꿈/구분자 정리)"""
+    text = cell.get_text(" ", strip=True)
+    text = WHITESPACE_PATTERN.sub(" ", text)
+    return text.replace("|", "/").replace("\t", " ")
+
+
+def _own_rows(table):
+    """중첩 표를 제외한 현재 표의 행 목록"""
+    return [tr for tr in table.find_all("tr") if tr.find_parent("table") is table]
+
+
+def _row_cells(tr):
+    """행의 셀 목록 (colspan은 빈 칸으로 채워 열 정렬 유지)"""
+    cells = []
+    for cell in tr.find_all(["th", "td"], recursive=False):
+        cells.append(_cell_text(cell))
+        try:
+            span = int(cell.get("colspan", 1))
+        except (TypeError, ValueError):
+            span = 1
+        cells.extend([""] * (min(span, 20) - 1))
+    return cells
+
+
+def _is_header_row(tr):
+    """헤더 행 여부 판단 (<thead> 소속 또는 전체가 <th>)"""
+    if tr.find_parent("thead") is not None:
+        return True
+    cells = tr.find_all(["th", "td"], recursive=False)
+    return bool(cells) and all(cell.name == "th" for cell in cells)
+
+
+def parse_table(table):
+    """<table> 요소를 헤더/행 구조로 파싱 (데이터 표가 아니면 None)"""
+    header = None
+    rows = []
+
+    for tr in _own_rows(table):
+        cells = _row_cells(tr)
+        if not any(cells):
+            continue
+        if header is None and not rows and _is_header_row(tr):
+            header = cells
+        else:
+            rows.append(cells)
+
+    # 레이아웃용 표 제외 (1행 또는 1열짜리)
+    width = max([len(r) for r in rows] + [len(header or [])] + [0])
+    if width < 2 or len(rows) + (1 if header else 0) < 2:
+        return None
+
+    caption_tag = table.find("caption")
+    caption = _cell_text(caption_tag) if caption_tag else ""
+
+    return {
+        'type': 'table',
+        'caption': caption,
+        'header': header,
+        'rows': rows,
+    }
+
+
+def serialize_table(block, fmt="markdown"):
+    """표 블록을 행 단위 텍스트로 직렬화"""
+    header = block['header']
+    rows = block['rows']
+    width = max([len(r) for r in rows] + [len(header or [])])
+
+    def pad(cells):
+        return cells + [""] * (width - len(cells))
+
+    lines = [f"{TABLE_BLOCK_PREFIX} {block['caption']}".rstrip()]
+
+    if fmt == "tsv":
+        if header:
+            lines.append("\t".join(pad(header)))
+        lines.extend("\t".join(pad(row)) for row in rows)
+    else:
+        if header:
+            lines.append("| " + " | ".join(pad(header)) + " |")
+            lines.append("|" + " --- |" * width)
+        lines.extend("| " + " | ".join(pad(row)) + " |" for row in rows)
+
+    return "\n".join(lines)
+
+
+def _iter_data_tables(soup, fmt):
+    """최상위 데이터 표와 직렬화된 블록을 순서대로 반환"""
+    for table in soup.find_all("table"):
+        # 중첩 표는 바깥 표의 셀 텍스트로 처리
+        if table.find_parent("table") is not None:
+            continue
+
+        block = parse_table(table)
+        if block is None:
+            continue
+
+        block['text'] = serialize_table(block, fmt)
+        yield table, block
+
+
+def extract_table_blocks(soup, fmt="markdown"):
+    """soup의 데이터 표를 자리표시자로 치환하고 표 블록 목록 반환
+
+    반환된 블록의 순서는 자리표시자 번호와 일치한다.
+    """
+    blocks = []
+    for table, block in list(_iter_data_tables(soup, fmt)):
+        table.replace_with(TABLE_PLACEHOLDER.format(len(blocks)))
+        blocks.append(block)
+    return blocks
+
+
+def inline_table_blocks(soup, fmt="markdown"):
+    """데이터 표를 직렬화된 텍스트로 치환 (줄 단위 추출기용)"""
+    blocks = []
+    for table, block in list(_iter_data_tables(soup, fmt)):
+        table.replace_with("\n" + block['text'] + "\n")
+        blocks.append(block)
+    return blocks
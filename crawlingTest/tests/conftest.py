@@ -0,0 +1,5 @@
+import os
+import sys
+
+# crawlingTest 모듈은 스크립트 디렉토리 기준으로 import 하므로 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
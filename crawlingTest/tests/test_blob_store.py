@@ -0,0 +1,51 @@
+import os
+
+from blob_store import BlobStore
+from corpus_manifest import CorpusManifest
+
+
+def write_page(manifest, path, url, body):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    content = f"[URL] {url}\n\n{body}"
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    manifest.record(path, content)
+
+
+def test_duplicate_body_references_existing_page(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = BlobStore("content_store", manifest=CorpusManifest("manifest.sqlite"))
+
+    key, is_new = store.put("https://a/1", "같은 본문", "out/p1.txt")
+    assert is_new
+    # 아직 기록 전(비동기 기록 대기)이어도 같은 실행에서는 중복으로 판단
+    assert store.put("https://a/2", "같은 본문", "out/p2.txt") == (key, False)
+    assert store.holder(key) == "out/p1.txt"
+    assert not os.path.exists("content_store/blobs")
+
+
+def test_missing_page_is_stored_again(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manifest = CorpusManifest("manifest.sqlite")
+    BlobStore("content_store", manifest=manifest).put("https://a/1", "본문", "out/p1.txt")
+
+    # 기록 전에 중단된 경우: 참조 기록은 있지만 파일이 없음
+    assert BlobStore("content_store", manifest=manifest).put("https://a/1", "본문", "out/p2.txt")[1]
+
+    write_page(manifest, "out/p2.txt", "https://a/1", "본문")
+    assert not BlobStore("content_store", manifest=manifest).put("https://a/3", "본문", "out/p3.txt")[1]
+
+    # 출력 디렉토리를 옮긴 뒤 다시 크롤링하면 새로 저장
+    os.rename("out", "out_backup")
+    assert BlobStore("content_store", manifest=manifest).put("https://a/1", "본문", "out/p4.txt")[1]
+
+
+def test_page_saved_by_other_process_found_through_manifest(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manifest = CorpusManifest("manifest.sqlite")
+    write_page(manifest, "other_output/x.txt", "https://b/1", "다른 크롤러 본문")
+
+    store = BlobStore("content_store", manifest=manifest)
+    key, is_new = store.put("https://a/9", "다른 크롤러 본문", "out/p9.txt")
+    assert not is_new
+    assert store.get(key) == "다른 크롤러 본문"
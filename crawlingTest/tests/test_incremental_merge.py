@@ -0,0 +1,111 @@
+import os
+
+from corpus_manifest import CorpusManifest
+from merge_crawling_data import CrawlingDataMerger, fold_delta, load_pending_delta
+
+URL = "https://www.daejin.ac.kr/bbs/daejin/1/100/artclView.do"
+
+
+def page_content(word):
+    body = "\n".join(f"대진대학교 {word} 안내 {i}번째 문단입니다. 신청 기간과 제출 서류를 확인하세요." for i in range(12))
+    return f"[URL] {URL}\n[DOMAIN] www.daejin.ac.kr\n[DEPTH] 1\n\n{body}"
+
+
+def write(path, content, mtime):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.utime(path, (mtime, mtime))
+
+
+def test_manifest_sync_rerecords_in_place_edit(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("enhanced_output")
+    path = os.path.join("enhanced_output", "page_0.txt")
+    write(path, page_content("장학"), 1_700_000_000)
+
+    manifest = CorpusManifest()
+    manifest.sync_directory("enhanced_output")
+    before = manifest.pages("enhanced_output")[0]['content_hash']
+
+    # 같은 크기, 다른 본문, 새 mtime
+    write(path, page_content("등록"), 1_700_000_100)
+    manifest.sync_directory("enhanced_output")
+    after = manifest.pages("enhanced_output")[0]
+    manifest.close()
+
+    assert after['content_hash'] != before
+    assert after['mtime'] == 1_700_000_100
+    assert after['size'] == os.path.getsize(path)
+
+
+def test_in_place_edit_is_merged_as_update(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("enhanced_output")
+    path = os.path.join("enhanced_output", "page_0.txt")
+    write(path, page_content("장학"), 1_700_000_000)
+
+    assert CrawlingDataMerger(workers=1, view_mode="virtual").merge_crawling_data() == 1
+
+    write(path, page_content("등록"), 1_700_000_100)
+    merger = CrawlingDataMerger(workers=1, view_mode="virtual")
+    merger.merge_crawling_data()
+
+    assert merger.stats['scanned'] == 1
+    assert len(merger.delta['update']) == 1
+    assert merger.delta['add'] == [] and merger.delta['delete'] == []
+
+
+def test_unacknowledged_delta_is_kept_across_merges(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("enhanced_output")
+    path = os.path.join("enhanced_output", "page_0.txt")
+    write(path, page_content("장학"), 1_700_000_000)
+    delta_file = os.path.join("merged_output", "merge_delta.json")
+
+    CrawlingDataMerger(workers=1, view_mode="virtual").merge_crawling_data()
+    # 임베딩 실패/생략 → 확인 없이 다음 통합 (변경 없음)
+    CrawlingDataMerger(workers=1, view_mode="virtual").merge_crawling_data()
+    pending = load_pending_delta(delta_file)
+    assert len(pending['add']) == 1 and pending['update'] == []
+
+    # 확인 후에는 새 변경만 남음
+    os.rename(delta_file, os.path.join("merged_output", "merge_delta.acked.json"))
+    write(path, page_content("등록"), 1_700_000_100)
+    CrawlingDataMerger(workers=1, view_mode="virtual").merge_crawling_data()
+    pending = load_pending_delta(delta_file)
+    assert pending['add'] == [] and len(pending['update']) == 1
+
+
+def test_fold_delta_keeps_latest_change_per_document():
+    def item(name):
+        return {'name': name, 'file': f"{name}.txt"}
+
+    pending = {'add': [item('a')], 'update': [item('b')], 'delete': [item('c')]}
+    changes = {'add': [item('c')], 'update': [item('a')], 'delete': [item('b')]}
+    folded = fold_delta(pending, changes)
+    assert [entry['name'] for entry in folded['add']] == ['a']
+    assert [entry['name'] for entry in folded['update']] == ['c']
+    assert [entry['name'] for entry in folded['delete']] == ['b']
+
+
+def test_noop_incremental_merge_reads_no_page_bodies(tmp_path, monkeypatch):
+    import builtins
+
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("enhanced_output")
+    write(os.path.join("enhanced_output", "page_0.txt"), page_content("장학"), 1_700_000_000)
+    CrawlingDataMerger(workers=1, view_mode="virtual").merge_crawling_data()
+
+    opened = []
+    real_open = builtins.open
+
+    def tracking_open(file, *args, **kwargs):
+        if str(file).endswith('.txt'):
+            opened.append(file)
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, 'open', tracking_open)
+    merger = CrawlingDataMerger(workers=1, view_mode="virtual")
+    assert merger.merge_crawling_data() == 1
+    assert merger.stats['scanned'] == 0
+    assert opened == []
@@ -0,0 +1,21 @@
+import pytest
+
+from link_harvester import LinkHarvester
+
+
+@pytest.mark.parametrize("url", [
+    "https://ebook.daejin.ac.kr/FxLibrary/bbs/view/?board_name=qna&num=113&page=1&itemCount=10",
+    "https://www.daejin.ac.kr/bbs/daejin/1/100/artclView.do?page=2",
+    "https://dept.daejin.ac.kr/board.php?bo_table=notice&wr_id=15&page=3",
+])
+def test_article_views_with_page_parameter_keep_their_text(url):
+    assert not LinkHarvester().is_links_only(url)
+
+
+@pytest.mark.parametrize("url", [
+    "https://ebook.daejin.ac.kr/FxLibrary/bbs/list/?board_name=qna&page=2&itemCount=10",
+    "https://www.daejin.ac.kr/bbs/daejin/181/artclList.do?page=3",
+    "https://dept.daejin.ac.kr/board.php?bo_table=notice&page=2",
+])
+def test_list_pages_are_links_only(url):
+    assert LinkHarvester().is_links_only(url)
@@ -0,0 +1,36 @@
+import os
+
+from page_writer import PageWriter, INCOMING_DIR
+
+
+def test_batch_is_renamed_into_output_and_staging_cleared(tmp_path):
+    output_dir = tmp_path / "out"
+    staging_dir = tmp_path / "staging"
+    written = []
+    writer = PageWriter(str(output_dir), staging_dir=str(staging_dir), batch_size=2,
+                        on_written=lambda path, content: written.append(path))
+    for i in range(3):
+        writer.submit(str(output_dir / f"page_{i}.txt"), f"본문 {i}")
+    writer.flush()
+    writer.close()
+
+    assert sorted(os.listdir(output_dir / INCOMING_DIR)) == []
+    assert sorted(f for f in os.listdir(output_dir) if f.endswith('.txt')) == ["page_0.txt", "page_1.txt", "page_2.txt"]
+    assert (output_dir / "page_2.txt").read_text(encoding='utf-8') == "본문 2"
+    assert os.listdir(staging_dir / "out") == []
+    assert len(written) == 3
+
+
+def test_leftovers_from_crashed_batch_are_recovered(tmp_path):
+    output_dir = tmp_path / "out"
+    staging = tmp_path / "staging" / "out"
+    (output_dir / INCOMING_DIR).mkdir(parents=True)
+    staging.mkdir(parents=True)
+    (output_dir / INCOMING_DIR / "page_a.txt").write_text("a", encoding='utf-8')
+    (staging / "page_b.txt").write_text("b", encoding='utf-8')
+    (staging / "page_c.txt.tmp").write_text("잘린", encoding='utf-8')
+
+    PageWriter(str(output_dir), staging_dir=str(tmp_path / "staging")).close()
+
+    assert sorted(f for f in os.listdir(output_dir) if f.endswith('.txt')) == ["page_a.txt", "page_b.txt"]
+    assert os.listdir(staging) == []
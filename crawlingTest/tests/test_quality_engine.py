@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from quality_engine import QualityEngine, FEATURE_NAMES, char_features, top_k_per_domain
+
+
+def test_char_features_keeps_last_char_before_trailing_empty_docs():
+    lengths, hangul, visible = char_features(['가나다', ''])
+    assert lengths.tolist() == [3, 0]
+    assert hangul.tolist() == [3, 0]
+    assert visible.tolist() == [3, 0]
+
+
+def test_char_features_with_empty_docs_everywhere():
+    lengths, hangul, visible = char_features(['', 'a b', '', '한', ''])
+    assert hangul.tolist() == [0, 0, 0, 1, 0]
+    assert visible.tolist() == [0, 2, 0, 1, 0]
+    assert [len(column) for column in char_features([])] == [0, 0, 0]
+
+
+def test_fit_requires_one_label_per_row():
+    engine = QualityEngine()
+    matrix = np.zeros((3, len(FEATURE_NAMES)), dtype=np.float32)
+    with pytest.raises(ValueError):
+        engine.fit(matrix, [])
+    with pytest.raises(ValueError):
+        engine.fit(matrix, [1.0, 0.0])
+
+
+def test_top_k_per_domain():
+    scores = np.array([5.0, 1.0, 3.0, 4.0, 2.0])
+    domains = np.array([0, 0, 0, 1, 1])
+    assert top_k_per_domain(scores, domains, 2).tolist() == [True, False, True, True, True]
+
+
+def test_page_matrix_matches_feature_matrix_and_counts_boilerplate():
+    from quality_engine import boilerplate_ratios, page_features
+
+    footer = "대진대학교 경기도 포천시 호국로 1007"
+    bodies = [f"본문 {i}번 공지입니다\n{footer}" for i in range(25)] + ["혼자만 있는 줄"]
+    urls = ["https://www.daejin.ac.kr/bbs/daejin/1/100/artclView.do"] * len(bodies)
+    pages = [page_features(body) for body in bodies]
+    engine = QualityEngine()
+
+    assert np.array_equal(engine.feature_matrix(bodies, urls), engine.page_matrix(pages, urls))
+    ratios = boilerplate_ratios(pages, boilerplate_pages=20)
+    assert ratios[0] == pytest.approx(len(footer) / (len("본문 0번 공지입니다") + len(footer)))
+    assert ratios[-1] == 0.0
@@ -0,0 +1,103 @@
+import os
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from merge_crawling_data import CrawlingDataMerger
+from stage_pipeline import IntegrationStages, StagePipeline
+
+BODY = "\n".join(f"대진대학교 장학 안내 {i}번째 문단입니다. 신청 기간과 제출 서류를 확인하세요." for i in range(12))
+
+
+def write_page(directory, filename, url, body=BODY):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, filename)
+    content = f"[URL] {url}\n[DOMAIN] www.daejin.ac.kr\n[DEPTH] 1\n\n{body}"
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return path, content
+
+
+class StubCrawler:
+    """기다릴 이벤트가 설정된 뒤 페이지 하나를 기록하고, 확인 이벤트를 기다렸다가 끝나는 크롤러"""
+
+    def __init__(self, filename, url, body, ready=None, reached=None, error=None):
+        self.page = (filename, url, body)
+        self.ready, self.reached, self.error = ready, reached, error
+        self.streamed = False
+        self.page_writer = SimpleNamespace(on_written=lambda path, content: None)
+
+    async def run_strategic_crawling(self, max_pages):
+        if self.ready is not None:
+            self.ready.wait(timeout=10)
+        filename, url, body = self.page
+        path, content = write_page("strategic_output", filename, url, body)
+        self.page_writer.on_written(path, content)
+        if self.reached is not None:
+            self.streamed = self.reached.wait(timeout=10)
+        if self.error:
+            raise self.error
+
+
+def test_crawled_pages_reach_chunks_before_crawler_returns(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_page("enhanced_output", "page_0.txt", "https://www.daejin.ac.kr/bbs/daejin/1/100/artclView.do")
+
+    chunked = threading.Event()
+    crawler = StubCrawler("page_new.txt", "https://www.daejin.ac.kr/bbs/daejin/1/200/artclView.do",
+                          BODY.replace("장학", "등록"), reached=chunked, error=RuntimeError("크롤러 실패"))
+    integration = IntegrationStages(crawl=True, crawler_factory=lambda: crawler)
+    chunk = integration.chunk
+
+    def chunk_and_signal(entry):
+        count = chunk(entry)
+        if entry['path'].endswith("page_new.txt"):
+            crawler.chunk_files = sorted(os.listdir(integration.chunk_dir))
+            chunked.set()
+        return count
+
+    integration.chunk = chunk_and_signal
+    integration.prepare()
+    pipeline = StagePipeline(integration.stages())
+
+    with pytest.raises(RuntimeError, match="크롤러 실패"):
+        pipeline.run('crawl', integration.crawl)
+
+    # 크롤러가 끝나기 전에 기존 페이지와 새 페이지가 청킹까지 끝났고, 오류 후에도 이미 받은 페이지는 통합됨
+    assert crawler.streamed
+    assert len(crawler.chunk_files) == 2
+    assert sorted(os.path.basename(entry['path']) for entry in integration.accepted.values()) == \
+        ["page_0.txt", "page_new.txt"]
+
+
+def test_late_duplicate_is_fixed_up_to_batch_result(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_page("enhanced_strategic_output", "page_0.txt", "https://www.daejin.ac.kr/bbs/daejin/1/100/artclView.do")
+
+    # 기존 페이지가 선정된 뒤 같은 본문의 우선순위가 더 높은 디렉토리 페이지가 도착 → 종료 시 교체
+    listed = threading.Event()
+    crawler = StubCrawler("page_new.txt", "https://www.daejin.ac.kr/bbs/daejin/1/200/artclView.do", BODY,
+                          ready=listed)
+    integration = IntegrationStages(crawl=True, crawler_factory=lambda: crawler)
+    select_existing = integration.select_existing
+
+    def select_and_signal(marker):
+        selected = select_existing(marker)
+        listed.set()
+        return selected
+
+    integration.select_existing = select_and_signal
+    integration.prepare()
+    StagePipeline(integration.stages()).run('crawl', integration.crawl)
+
+    expected = CrawlingDataMerger(view_mode="virtual")
+    expected.merge_crawling_data(full=True)
+    with open(expected.view_file, 'r', encoding='utf-8') as f:
+        batch = [json.loads(line)['source'] for line in f]
+
+    assert integration.streamed == 1
+    assert [os.path.abspath(entry['path']) for entry in integration.accepted.values()] == batch == \
+        [os.path.abspath(os.path.join("strategic_output", "page_new.txt"))]
+    assert sorted(os.listdir(integration.chunk_dir)) == [f"{name}.jsonl" for name in integration.accepted]
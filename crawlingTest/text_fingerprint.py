@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+한국어 친화 텍스트 지문 모듈
+- NFC 정규화 + 공백 정리 + 한글/영문/숫자 외 기호 제거
+- 음절 단위 문자 n-gram (조사가 붙은 어절도 안정적으로 매칭)
+- NumPy 벡터화 MinHash / SimHash 일괄 계산
+"""
+
+import os
+import re
+import sys
+import time
+import unicodedata
+import numpy as np
+
+FINGERPRINT_VERSION = 2
+
+MASK32 = np.uint64(0xFFFFFFFF)
+ROLLING_BASE = np.uint64(1000003)
+
+# 구버전 파일의 이스케이프 줄바꿈, 기호, 연속 공백
+ESCAPED_NEWLINE_PATTERN = re.compile(r'\\[nrt]')
+NON_WORD_PATTERN = re.compile(r'[^0-9A-Za-zㄱ-ㆎ가-힣]+')
+BODY_SEPARATOR = re.compile(r'(?:\n|\\n){2}')
+
+
+def normalize_text(text):
+    """NFC 정규화 후 한글/영문/숫자만 남기고 공백 하나로 정리"""
+    text = unicodedata.normalize('NFC', text)
+    text = ESCAPED_NEWLINE_PATTERN.sub(' ', text)
+    text = NON_WORD_PATTERN.sub(' ', text)
+    return text.strip().lower()
+
+
+def shingle_hashes(text, size=3, normalized=False):
+    """문자 n-gram의 32비트 롤링 해시 (중복 제거, uint64 배열)"""
+    if not normalized:
+        text = normalize_text(text)
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    if len(codes) == 0:
+        return np.empty(0, dtype=np.uint64)
+    if len(codes) < size:
+        size = len(codes)
+
+    count = len(codes) - size + 1
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset in range(size):
+        hashes = (hashes * ROLLING_BASE + codes[offset:offset + count]) & MASK32
+    return np.unique(hashes)
+
+
+def _splitmix64(values):
+    """32비트 해시를 64비트로 확산 (SimHash 비트용)"""
+    with np.errstate(over='ignore'):
+        z = values + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+class Fingerprinter:
+    def __init__(self, num_perm=128, shingle_size=3, seed=1, chunk_shingles=50000):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.chunk_shingles = chunk_shingles
+
+        # multiply-shift 해시 계수 (a는 홀수)
+        rng = np.random.RandomState(seed)
+        self.perm_a = rng.randint(0, 1 << 62, size=num_perm, dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+        self.perm_b = rng.randint(0, 1 << 62, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def shingles(self, text):
+        """문서의 shingle 해시"""
+        return shingle_hashes(text, self.shingle_size)
+
+    def _chunks(self, shingle_sets):
+        """shingle 총량 기준으로 문서 묶음 생성 (메모리 상한 유지)"""
+        start, total = 0, 0
+        for i, hashes in enumerate(shingle_sets):
+            total += max(len(hashes), 1)
+            if total >= self.chunk_shingles:
+                yield start, i + 1
+                start, total = i + 1, 0
+        if start < len(shingle_sets):
+            yield start, len(shingle_sets)
+
+    @staticmethod
+    def _concat(shingle_sets):
+        """빈 문서는 더미 값 하나로 채워 오프셋 계산"""
+        filled = [h if len(h) else np.zeros(1, dtype=np.uint64) for h in shingle_sets]
+        lengths = np.array([len(h) for h in filled])
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        return np.concatenate(filled), offsets
+
+    def minhash_batch(self, texts=None, shingle_sets=None):
+        """MinHash 서명 일괄 계산 → (문서 수, num_perm) uint32"""
+        if shingle_sets is None:
+            shingle_sets = [self.shingles(text) for text in texts]
+        signatures = np.empty((len(shingle_sets), self.num_perm), dtype=np.uint32)
+
+        for start, end in self._chunks(shingle_sets):
+            hashes, offsets = self._concat(shingle_sets[start:end])
+            # (a*x + b) mod 2^64 의 상위 32비트 (오버플로는 의도된 동작)
+            with np.errstate(over='ignore'):
+                permuted = np.multiply.outer(self.perm_a, hashes)
+                permuted += self.perm_b[:, None]
+            permuted >>= np.uint64(32)
+            signatures[start:end] = np.minimum.reduceat(permuted, offsets, axis=1).T
+
+        return signatures
+
+    def minhash(self, text):
+        """단일 문서 MinHash 서명"""
+        return self.minhash_batch([text])[0]
+
+    def simhash_batch(self, texts=None, shingle_sets=None):
+        """64비트 SimHash 일괄 계산 → (문서 수,) uint64"""
+        if shingle_sets is None:
+            shingle_sets = [self.shingles(text) for text in texts]
+        result = np.zeros(len(shingle_sets), dtype=np.uint64)
+
+        for start, end in self._chunks(shingle_sets):
+            hashes, offsets = self._concat(shingle_sets[start:end])
+            lengths = np.diff(np.append(offsets, len(hashes)))
+
+            # 비트별 1의 개수가 과반이면 해당 비트를 1로 설정
+            bits = np.unpackbits(_splitmix64(hashes).view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+            ones = np.add.reduceat(bits, offsets, axis=0, dtype=np.int32)
+            majority = np.packbits(ones * 2 > lengths[:, None], axis=1, bitorder='little')
+            result[start:end] = majority.view(np.uint64).ravel()
+
+        return result
+
+    def simhash(self, text):
+        """단일 문서 SimHash"""
+        return int(self.simhash_batch([text])[0])
+
+
+def hamming_distance(a, b):
+    """SimHash 간 해밍 거리"""
+    return bin(int(a) ^ int(b)).count('1')
+
+
+def estimate_jaccard(sig_a, sig_b):
+    """MinHash 서명 간 Jaccard 추정치"""
+    return float(np.mean(np.asarray(sig_a) == np.asarray(sig_b)))
+
+
+def fingerprint_directory(directory, output_path=None):
+    """디렉토리의 모든 페이지 지문 계산 (MinHash + SimHash)"""
+    fingerprinter = Fingerprinter()
+    files = sorted(f for f in os.listdir(directory) if f.endswith('.txt'))
+
+    started = time.time()
+    texts = []
+    for filename in files:
+        with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+            texts.append(BODY_SEPARATOR.split(f.read(), 1)[-1])
+    shingle_sets = [fingerprinter.shingles(text) for text in texts]
+    minhashes = fingerprinter.minhash_batch(shingle_sets=shingle_sets)
+    simhashes = fingerprinter.simhash_batch(shingle_sets=shingle_sets)
+    elapsed = time.time() - started
+
+    print(f"🔏 {directory}: {len(files):,}개 문서 지문 계산 ({elapsed:.1f}초)")
+
+    if output_path:
+        np.savez(output_path, files=np.array(files), minhash=minhashes, simhash=simhashes)
+        print(f"💾 저장: {output_path}")
+
+    return files, minhashes, simhashes
+
+
+if __name__ == "__main__":
+    target_dir = sys.argv[1] if len(sys.argv) > 1 else "enhanced_output"
+    output = sys.argv[2] if len(sys.argv) > 2 else None
+    fingerprint_directory(target_dir, output)
@@ -27,6 +27,12 @@ from datetime import datetime
 import logging
 import signal
 import sys
+from table_extractor import inline_table_blocks
+from checkpoint_log import CheckpointLog
+from state_codec import migrate_legacy_state
+from corpus_manifest import CorpusManifest
+from blob_store import BlobStore
+from page_writer import PageWriter
 
 # 로깅 설정
 logging.basicConfig(
@@ -48,11 +54,22 @@ class UnlimitedCrawler:
         
         # 디렉토리 설정
         self.output_dir = "unlimited_crawling_output"
-        self.checkpoint_file = "unlimited_crawler_checkpoint.json"
+        self.checkpoint_file = "unlimited_crawler_checkpoint.msgpack"
+        self.legacy_checkpoint_file = "unlimited_crawler_checkpoint.json"
         self.state_file = "unlimited_crawler_state.json"
+        self.checkpoint_log_file = "unlimited_crawler_checkpoint.log"
         
         os.makedirs(self.output_dir, exist_ok=True)
         
+        # 추가 전용 체크포인트 로그 (스냅샷 = 체크포인트 파일)
+        self.checkpoint_log = CheckpointLog(self.checkpoint_log_file, self.checkpoint_file)
+        
+        # 코퍼스 매니페스트 (저장 시점에 페이지 메타데이터 기록)
+        self.manifest = CorpusManifest()
+        self.blob_store = BlobStore(manifest=self.manifest)  # 크롤러 간 공유 본문 색인 (본문은 페이지 파일에만 저장)
+        # 페이지 파일은 전용 스레드가 배치 기록 (크롤링 루프는 저장소 지연에 막히지 않음)
+        self.page_writer = PageWriter(self.output_dir, on_written=self.manifest.record)
+        
         # 크롤링 상태
         self.visited = set()
         self.to_visit = deque()
@@ -247,17 +264,17 @@ class UnlimitedCrawler:
     def signal_handler(self, signum, frame):
         """신호 처리 (Ctrl+C 등)"""
         logger.info(f"\\n⚠️ 신호 {signum} 수신. 안전하게 종료 중...")
+        # 종료 플래그만 설정 (시그널 처리 중 잠금/파일 기록 금지, 저장은 루프 종료 후 수행)
         self.should_stop = True
-        self.save_checkpoint()
 
-    def save_checkpoint(self):
-        """체크포인트 저장"""
-        checkpoint_data = {
+    def build_checkpoint(self):
+        """체크포인트 스냅샷 데이터 생성 (압축 스레드가 직렬화하는 동안 변경되지 않도록 크롤링 스레드에서 복사)"""
+        return {
             'visited': list(self.visited),
             'to_visit': list(self.to_visit),
             'priority_queue': list(self.priority_queue),
-            'saved_urls': self.saved_urls,
-            'url_depths': self.url_depths,
+            'saved_urls': list(self.saved_urls),
+            'url_depths': dict(self.url_depths),
             'domain_stats': dict(self.domain_stats),
             'failed_urls': list(self.failed_urls),
             'retry_count': dict(self.retry_count),
@@ -266,23 +283,52 @@ class UnlimitedCrawler:
             'session_start': self.session_start.isoformat(),
             'checkpoint_time': datetime.now().isoformat()
         }
-        
+
+    def save_checkpoint(self, final=False):
+        """체크포인트 저장 (로그 flush, 필요 시 스냅샷 압축)"""
         try:
-            with open(self.checkpoint_file, 'w', encoding='utf-8') as f:
-                json.dump(checkpoint_data, f, ensure_ascii=False, indent=2)
-            logger.info(f"💾 체크포인트 저장: {self.total_saved}개 파일")
+            # 로그에 'saved'로 남는 페이지가 먼저 디스크에 기록되도록
+            self.page_writer.flush()
+            self.checkpoint_log.flush()
+            if final:
+                self.checkpoint_log.compact(self.build_checkpoint, background=False)
+                logger.info(f"💾 체크포인트 저장: {self.total_saved}개 파일")
+            elif self.checkpoint_log.should_compact():
+                self.checkpoint_log.compact(self.build_checkpoint)
         except Exception as e:
             logger.error(f"❌ 체크포인트 저장 오류: {e}")
 
+    def apply_log_event(self, event):
+        """체크포인트 로그 이벤트를 상태에 반영"""
+        event_type = event['t']
+        url = event.get('url')
+        if event_type == 'enqueued':
+            item = [url, event['depth'], event['priority']]
+            if event.get('queue') == 'priority':
+                self.priority_queue.append(item)
+            else:
+                self.to_visit.append(item)
+        elif event_type == 'visited':
+            self.visited.add(url)
+            self.total_processed += 1
+        elif event_type == 'saved':
+            self.saved_urls.append(url)
+            self.domain_stats[event['domain']] += 1
+            self.total_saved += 1
+        elif event_type == 'retry':
+            self.retry_count[url] += 1
+        elif event_type == 'failed':
+            self.failed_urls.add(url)
+
     def load_checkpoint(self):
-        """체크포인트 로드"""
-        if not os.path.exists(self.checkpoint_file):
+        """체크포인트 로드 (스냅샷 + 이후 로그 재생)"""
+        migrate_legacy_state(self.legacy_checkpoint_file, self.checkpoint_file)
+        if not os.path.exists(self.checkpoint_file) and not os.path.exists(self.checkpoint_log_file):
             logger.info("🆕 새로운 크롤링 세션 시작")
             return
         
         try:
-            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
-                checkpoint_data = json.load(f)
+            checkpoint_data = self.checkpoint_log.load_snapshot()
             
             self.visited = set(checkpoint_data.get('visited', []))
             self.to_visit = deque(checkpoint_data.get('to_visit', []))
@@ -298,6 +344,8 @@ class UnlimitedCrawler:
             if 'session_start' in checkpoint_data:
                 self.session_start = datetime.fromisoformat(checkpoint_data['session_start'])
             
+            self.checkpoint_log.replay(self.apply_log_event, checkpoint_data.get('log_seq', 0))
+            
             logger.info(f"🔄 체크포인트 로드: {self.total_saved}개 파일, {len(self.visited)}개 방문")
             
         except Exception as e:
@@ -403,8 +451,10 @@ class UnlimitedCrawler:
         except Exception as e:
             logger.error(f"Selenium 크롤링 오류 {url}: {e}")
             self.retry_count[url] += 1
+            self.checkpoint_log.append('retry', url=url)
             if self.retry_count[url] >= 3:
                 self.failed_urls.add(url)
+                self.checkpoint_log.append('failed', url=url)
             
             if driver:
                 try:
@@ -419,10 +469,13 @@ class UnlimitedCrawler:
         for tag in soup(['script', 'style', 'nav', 'header', 'footer', 'aside', 'iframe']):
             tag.decompose()
         
+        # 표는 행 단위로 직렬화하여 구조 유지
+        inline_table_blocks(soup)
+        
         # 텍스트 추출 및 정제
         text = soup.get_text()
         lines = [line.strip() for line in text.splitlines()]
-        text = '\\n'.join(line for line in lines if line and len(line) > 2)
+        text = '\n'.join(line for line in lines if line and len(line) > 2)
         
         return text
 
@@ -434,22 +487,28 @@ class UnlimitedCrawler:
         filename = f"unlimited_page_{self.total_saved:06d}.txt"
         filepath = os.path.join(self.output_dir, filename)
         
-        content = f"[URL] {page_data['url']}\\n"
-        content += f"[DEPTH] {page_data['depth']}\\n"
-        content += f"[DOMAIN] {page_data['domain']}\\n"
-        content += f"[TIMESTAMP] {page_data['timestamp']}\\n"
-        content += f"[LENGTH] {page_data['length']}\\n\\n"
+        content = f"[URL] {page_data['url']}\n"
+        content += f"[DEPTH] {page_data['depth']}\n"
+        content += f"[DOMAIN] {page_data['domain']}\n"
+        content += f"[TIMESTAMP] {page_data['timestamp']}\n"
+        content += f"[LENGTH] {page_data['length']}\n\n"
         content += page_data['content']
         
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # 다른 URL/크롤러가 이미 저장한 본문이면 URL 참조만 기록하고 파일은 만들지 않음
+            blob_key, is_new = self.blob_store.put(page_data['url'], page_data['content'], filepath,
+                                                   source=self.output_dir)
+            if not is_new:
+                logger.info(f"🧬 동일 본문 이미 저장됨: {page_data['url']} → {self.blob_store.holder(blob_key)}")
+                return False
             
+            self.page_writer.submit(filepath, content)
             self.saved_urls.append(page_data['url'])
             self.domain_stats[page_data['domain']] += 1
             self.total_saved += 1
+            self.checkpoint_log.append('saved', url=page_data['url'], domain=page_data['domain'])
             
-            logger.info(f"💾 저장: {filename} ({page_data['domain']}) - {page_data['length']}자")
+            logger.debug(f"💾 저장: {filename} ({page_data['domain']}) - {page_data['length']}자")
             return True
             
         except Exception as e:
@@ -467,6 +526,7 @@ class UnlimitedCrawler:
             if url not in self.visited:
                 priority = self.get_url_priority(url)
                 self.priority_queue.append((url, 0, priority))
+                self.checkpoint_log.append('enqueued', url=url, depth=0, priority=priority, queue='priority')
         
         with ThreadPoolExecutor(max_workers=self.max_selenium_instances) as executor:
             while not self.should_stop and (self.priority_queue or self.to_visit):
@@ -497,6 +557,7 @@ class UnlimitedCrawler:
                         futures.append(future)
                         self.visited.add(url)
                         self.total_processed += 1
+                        self.checkpoint_log.append('visited', url=url)
                 
                 # 결과 처리
                 for future in as_completed(futures):
@@ -511,15 +572,18 @@ class UnlimitedCrawler:
                                 if link_url not in self.visited and link_url not in self.failed_urls:
                                     if link_priority >= 1000:  # 높은 우선순위
                                         self.priority_queue.append((link_url, link_depth, link_priority))
+                                        queue_name = 'priority'
                                     else:  # 일반 우선순위
                                         self.to_visit.append((link_url, link_depth, link_priority))
+                                        queue_name = 'normal'
+                                    self.checkpoint_log.append('enqueued', url=link_url, depth=link_depth,
+                                                               priority=link_priority, queue=queue_name)
                     
                     except Exception as e:
                         logger.error(f"페이지 처리 오류: {e}")
                 
-                # 주기적 체크포인트 저장
-                if self.total_saved % self.checkpoint_interval == 0 and self.total_saved > 0:
-                    self.save_checkpoint()
+                # 배치마다 로그 flush (변경분만 기록, 주기적으로 압축)
+                self.save_checkpoint()
                     
                 # 주기적 상태 보고
                 if self.total_processed % 50 == 0:
@@ -533,7 +597,12 @@ class UnlimitedCrawler:
                 await asyncio.sleep(0.3)
         
         # 최종 체크포인트 저장
-        self.save_checkpoint()
+        self.save_checkpoint(final=True)
+        self.checkpoint_log.close()
+        self.page_writer.close()
+        self.manifest.commit()
+        blob_stats = self.blob_store.get_stats()
+        logger.info(f"🧬 내용 주소 저장소: URL {blob_stats['urls']:,}개 → 고유 본문 {blob_stats['unique_blobs']:,}개 (절감 {blob_stats['dedup_ratio']:.1%})")
         
         # 최종 통계
         total_elapsed = datetime.now() - self.session_start
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+URL 별칭 해석 (콘텐츠 동일성 기반)
+- enc= 래퍼, '/', '/index.do', '/sites/<x>/index.do' 변형을 정규 URL로 통일
+- 최종(리다이렉트 후) URL 또는 본문 해시가 같은 URL을 하나의 문서 ID로 연결
+- 별칭 테이블을 저장하여 통합(merge) 및 임베딩 단계에서도 문서 하나로 취급
+"""
+
+import os
+import re
+import json
+import base64
+import hashlib
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, unquote
+import logging
+
+logger = logging.getLogger(__name__)
+
+ENC_SEPARATOR = '|@@|'
+INDEX_PATH_PATTERN = re.compile(r'^/(?:sites/)?([^/]+)/index\.do$')
+TRACKING_PARAMS = {'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content'}
+
+
+def unwrap_enc(url):
+    """K2Web subview.do?enc=... 래퍼를 내부 게시물 URL로 변환"""
+    parts = urlsplit(url)
+    params = dict(parse_qsl(parts.query))
+    enc = params.get('enc')
+    if not enc:
+        return url
+
+    try:
+        padded = enc + '=' * (-len(enc) % 4)
+        decoded = base64.b64decode(padded.encode('ascii'), altchars=b'-_').decode('utf-8', 'ignore')
+    except Exception:
+        return url
+    if ENC_SEPARATOR not in decoded:
+        return url
+
+    inner = unquote(decoded.split(ENC_SEPARATOR, 1)[1])
+    if not inner.startswith('/'):
+        return url
+    return f"{parts.scheme}://{parts.netloc}{inner}"
+
+
+def site_name(host):
+    """호스트의 K2Web 사이트명 (www는 'daejin')"""
+    label = host.split('.')[0]
+    return 'daejin' if label == 'www' else label
+
+
+def canonicalize_url(url):
+    """정규 URL 생성 (같은 페이지를 가리키는 문법적 변형 통일)"""
+    url = unwrap_enc(url.strip())
+    parts = urlsplit(url)
+
+    scheme = parts.scheme.lower() or 'https'
+    host = parts.netloc.lower()
+    if host.endswith(':80') or host.endswith(':443'):
+        host = host.rsplit(':', 1)[0]
+
+    path = parts.path or '/'
+    index_match = INDEX_PATH_PATTERN.match(path)
+    if path in ('/index.do', '/main.php', '/index.php') or (
+            index_match and index_match.group(1) == site_name(host)):
+        path = '/'
+
+    # 빈 값/추적용 파라미터 제거 후 정렬
+    query_items = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if value and key not in TRACKING_PARAMS
+    )
+
+    return urlunsplit((scheme, host, path, urlencode(query_items), ''))
+
+
+def document_id(canonical_url):
+    """정규 URL로부터 문서 ID 생성"""
+    return hashlib.blake2b(canonical_url.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class AliasMap:
+    def __init__(self, path="url_aliases.json"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.url_to_doc = {}       # 정규 URL → 문서 ID
+        self.content_to_doc = {}   # 본문 해시 → 문서 ID
+        self.doc_canonical = {}    # 문서 ID → 대표 정규 URL
+        self.alias_hits = 0
+
+        if path and os.path.exists(path):
+            self.load()
+
+    def resolve(self, url):
+        """알려진 URL이면 문서 ID 반환"""
+        return self.url_to_doc.get(canonicalize_url(url))
+
+    def is_known(self, url):
+        """이미 문서가 있는 URL(별칭 포함) 여부"""
+        return self.resolve(url) is not None
+
+    def lookup(self, url, final_url=None, content_hash=None):
+        """URL/최종 URL/본문 해시 중 하나라도 알려져 있으면 문서 ID 반환"""
+        for candidate in (url, final_url):
+            if candidate:
+                doc_id = self.resolve(candidate)
+                if doc_id:
+                    return doc_id
+        if content_hash:
+            return self.content_to_doc.get(content_hash)
+        return None
+
+    def register(self, url, final_url=None, content_hash=None):
+        """URL/최종 URL/본문 해시를 문서에 연결 → (문서 ID, 신규 문서 여부)"""
+        keys = [canonicalize_url(url)]
+        if final_url:
+            keys.append(canonicalize_url(final_url))
+
+        with self.lock:
+            doc_id = None
+            for key in keys:
+                doc_id = doc_id or self.url_to_doc.get(key)
+            if doc_id is None and content_hash:
+                doc_id = self.content_to_doc.get(content_hash)
+
+            is_new = doc_id is None
+            if is_new:
+                canonical = keys[-1]
+                doc_id = document_id(canonical)
+                self.doc_canonical[doc_id] = canonical
+            else:
+                self.alias_hits += 1
+
+            for key in keys:
+                self.url_to_doc.setdefault(key, doc_id)
+            if content_hash:
+                self.content_to_doc.setdefault(content_hash, doc_id)
+
+        return doc_id, is_new
+
+    def canonical_url(self, doc_id):
+        """문서의 대표 URL"""
+        return self.doc_canonical.get(doc_id)
+
+    def aliases(self, doc_id):
+        """문서에 연결된 모든 정규 URL"""
+        return sorted(url for url, doc in self.url_to_doc.items() if doc == doc_id)
+
+    def save(self):
+        """별칭 테이블 저장 (임시 파일 → 교체)"""
+        with self.lock:
+            data = {
+                'urls': dict(self.url_to_doc),
+                'content': dict(self.content_to_doc),
+                'docs': dict(self.doc_canonical),
+            }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        """별칭 테이블 로드"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.url_to_doc = data.get('urls', {})
+            self.content_to_doc = data.get('content', {})
+            self.doc_canonical = data.get('docs', {})
+            logger.info(f"🔗 별칭 테이블 로드: 문서 {len(self.doc_canonical):,}개, URL {len(self.url_to_doc):,}개")
+        except Exception as e:
+            logger.error(f"별칭 테이블 로드 실패 {self.path}: {e}")
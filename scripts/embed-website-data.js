@@ -33,10 +33,12 @@ class WebsiteDataEmbedder {
     this.processedCount = 0;
     this.totalFiles = 0;
     this.errors = [];
+    this.view = null;
+    this.chunkDir = null;
   }
 
-  async processWebsiteData(dataDir = '../crawlingTest/merged_output') {
-    console.log('🌐 웹사이트 데이터 임베딩 시작');
+  async processWebsiteData(dataDir = '../crawlingTest/merged_output', { delta = false, chunkDir = null } = {}) {
+    console.log(`🌐 웹사이트 데이터 임베딩 시작${delta ? ' (델타 모드)' : ''}`);
     console.log(`📁 데이터 디렉토리: ${dataDir}`);
     
     try {
@@ -45,16 +47,38 @@ class WebsiteDataEmbedder {
         throw new Error(`데이터 디렉토리가 존재하지 않습니다: ${dataDir}`);
       }
 
-      // 파일 목록 로드
-      const files = fs.readdirSync(dataDir)
-        .filter(file => file.endsWith('.txt'))
-        .sort();
+      // 통합 뷰 목록 (virtual 모드는 .txt 없이 원본 경로만 기록)
+      this.view = this.loadView(dataDir);
 
-      this.totalFiles = files.length;
-      console.log(`📊 총 파일 수: ${this.totalFiles:,}개`);
+      // 통합 단계가 미리 나눈 청크 (chunk_output/<이름>.jsonl, 없으면 파일을 직접 청킹)
+      if (chunkDir && fs.existsSync(chunkDir)) {
+        this.chunkDir = chunkDir;
+        console.log(`🧩 청크 디렉토리: ${chunkDir}`);
+      }
+
+      // 시작 시점의 미반영 델타 (모든 변경이 성공하면 확인 처리)
+      const pendingDelta = this.readPendingDelta(dataDir);
+
+      let files;
+      if (delta) {
+        // 통합 단계의 델타(추가/갱신/삭제)만 반영
+        const changes = pendingDelta || this.loadDelta(dataDir);
+        files = [...changes.add, ...changes.update].map(entry => entry.file);
+        await this.removeStaleFiles([...changes.update, ...changes.delete].map(entry => entry.file));
+      } else {
+        // 파일 목록 로드
+        files = this.view
+          ? [...this.view.keys()].sort()
+          : fs.readdirSync(dataDir)
+            .filter(file => file.endsWith('.txt'))
+            .sort();
+
+        // 기존 웹사이트 데이터 삭제
+        await this.cleanExistingWebsiteData();
+      }
 
-      // 기존 웹사이트 데이터 삭제
-      await this.cleanExistingWebsiteData();
+      this.totalFiles = files.length;
+      console.log(`📊 총 파일 수: ${this.totalFiles.toLocaleString()}개`);
 
       // 배치 처리
       const batches = this.createBatches(files, CONFIG.batchSize);
@@ -77,6 +101,7 @@ class WebsiteDataEmbedder {
 
       // 결과 요약
       await this.printSummary();
+      this.acknowledgeDelta(dataDir, pendingDelta);
 
     } catch (error) {
       console.error('❌ 웹사이트 데이터 처리 오류:', error.message);
@@ -98,6 +123,82 @@ class WebsiteDataEmbedder {
       console.log('✅ 기존 웹사이트 데이터 삭제 완료');
     } catch (error) {
       console.warn('⚠️ 기존 데이터 삭제 중 오류:', error.message);
+      this.errors.push({ filename: '(기존 데이터 삭제)', error: error.message });
+    }
+  }
+
+  readPendingDelta(dataDir) {
+    // 통합 단계가 남긴 미반영 델타 (확인 전까지 다음 통합의 델타가 계속 합쳐짐)
+    const deltaPath = path.join(dataDir, 'merge_delta.json');
+    if (!fs.existsSync(deltaPath)) {
+      return null;
+    }
+    const changes = JSON.parse(fs.readFileSync(deltaPath, 'utf-8'));
+    console.log(`🔀 미반영 델타 (${changes.pending_since || changes.generated_at}부터): 추가 ${changes.add.length}개, ` +
+      `갱신 ${changes.update.length}개, 삭제 ${changes.delete.length}개`);
+    return changes;
+  }
+
+  loadDelta(dataDir) {
+    // 미반영 델타가 없으면 이전 실행에서 이미 확인된 상태 (통합을 한 번도 안 했으면 오류)
+    if (fs.existsSync(path.join(dataDir, 'merge_delta.acked.json'))) {
+      console.log('♻️ 반영할 델타 없음 (이전 델타 확인 완료)');
+      return { add: [], update: [], delete: [] };
+    }
+    throw new Error(`델타 파일이 없습니다: ${path.join(dataDir, 'merge_delta.json')} (merge_crawling_data.py 먼저 실행)`);
+  }
+
+  acknowledgeDelta(dataDir, pendingDelta) {
+    // 모든 삭제/임베딩이 성공했을 때만 확인 처리 (실패하면 다음 실행에서 같은 델타를 다시 반영)
+    const deltaPath = path.join(dataDir, 'merge_delta.json');
+    if (!pendingDelta || !fs.existsSync(deltaPath)) {
+      return;
+    }
+    if (this.errors.length > 0) {
+      console.warn(`⚠️ 오류 ${this.errors.length}개 → 델타 확인 보류 (다음 실행에서 다시 반영)`);
+      return;
+    }
+    const current = JSON.parse(fs.readFileSync(deltaPath, 'utf-8'));
+    if (current.generated_at !== pendingDelta.generated_at) {
+      console.warn('⚠️ 임베딩 중 새 통합 델타가 기록됨 → 델타 확인 보류');
+      return;
+    }
+    fs.renameSync(deltaPath, path.join(dataDir, 'merge_delta.acked.json'));
+    console.log('✅ 델타 반영 확인 → merge_delta.acked.json');
+  }
+
+  loadView(dataDir) {
+    const viewPath = path.join(dataDir, 'merged_view.jsonl');
+    if (!fs.existsSync(viewPath)) {
+      return null;
+    }
+    const view = new Map();
+    for (const line of fs.readFileSync(viewPath, 'utf-8').split('\n')) {
+      if (line.trim()) {
+        const entry = JSON.parse(line);
+        view.set(entry.file, entry.source);
+      }
+    }
+    console.log(`🗂️ 통합 뷰 목록: ${view.size.toLocaleString()}개`);
+    return view;
+  }
+
+  async removeStaleFiles(files) {
+    // 갱신/삭제된 파일의 기존 청크 제거
+    for (const batch of this.createBatches(files, 100)) {
+      const { error } = await supabase
+        .from('documents')
+        .delete()
+        .eq('source_type', 'website')
+        .in('source_file', batch);
+
+      if (error) {
+        console.warn('⚠️ 기존 청크 삭제 중 오류:', error.message);
+        this.errors.push({ filename: batch[0], error: error.message });
+      }
+    }
+    if (files.length > 0) {
+      console.log(`🧹 기존 청크 정리: ${files.length}개 파일`);
     }
   }
 
@@ -119,41 +220,17 @@ class WebsiteDataEmbedder {
 
   async processFile(filename, dataDir) {
     try {
-      const filepath = path.join(dataDir, filename);
-      const content = fs.readFileSync(filepath, 'utf-8');
-      
-      // 메타데이터 추출
-      const metadata = this.extractMetadata(content);
-      if (!metadata) {
-        console.warn(`⚠️ 메타데이터 추출 실패: ${filename}`);
-        return;
-      }
-
-      // 본문 텍스트 추출
-      const mainContent = this.extractMainContent(content);
-      if (mainContent.length < 50) {
-        console.warn(`⚠️ 내용이 너무 짧음: ${filename}`);
+      const records = this.loadChunks(filename);
+      const documents = records
+        ? records.map(record => this.chunkDocument(record, filename))
+        : this.chunkFile(filename, dataDir);
+      if (!documents) {
         return;
       }
 
-      // 청킹
-      const chunks = this.createChunks(mainContent);
-      
       // 각 청크 임베딩
-      for (let i = 0; i < chunks.length; i++) {
-        const chunk = chunks[i];
-        const chunkId = `${filename}_chunk_${i}`;
-        
-        await this.embedAndStore({
-          id: chunkId,
-          content: chunk,
-          metadata: {
-            ...metadata,
-            chunk_index: i,
-            total_chunks: chunks.length,
-            source_file: filename
-          }
-        });
+      for (const document of documents) {
+        await this.embedAndStore(document);
       }
 
       this.processedCount++;
@@ -168,6 +245,74 @@ class WebsiteDataEmbedder {
     }
   }
 
+  loadChunks(filename) {
+    // 통합 단계 청크 파일 (문서마다 JSONL 한 줄에 청크 하나, ID 포함)
+    if (!this.chunkDir) {
+      return null;
+    }
+    const chunkPath = path.join(this.chunkDir, `${path.basename(filename, '.txt')}.jsonl`);
+    if (!fs.existsSync(chunkPath)) {
+      return null;
+    }
+    return fs.readFileSync(chunkPath, 'utf-8')
+      .split('\n')
+      .filter(line => line.trim())
+      .map(line => JSON.parse(line));
+  }
+
+  chunkDocument(record, filename) {
+    return {
+      id: record.id,
+      content: record.content,
+      metadata: {
+        url: record.url,
+        domain: record.domain,
+        depth: record.depth || 0,
+        length: record.length || 0,
+        timestamp: record.timestamp || null,
+        page_type: this.classifyPageType(record.url),
+        department: this.extractDepartment(record.url, record.domain),
+        doc_id: record.doc_id,
+        chunk_index: record.chunk_index,
+        total_chunks: record.total_chunks,
+        source_file: filename
+      }
+    };
+  }
+
+  chunkFile(filename, dataDir) {
+    const filepath = (this.view && this.view.get(filename)) || path.join(dataDir, filename);
+    const content = fs.readFileSync(filepath, 'utf-8');
+    
+    // 메타데이터 추출
+    const metadata = this.extractMetadata(content);
+    if (!metadata) {
+      console.warn(`⚠️ 메타데이터 추출 실패: ${filename}`);
+      return null;
+    }
+
+    // 본문 텍스트 추출
+    const mainContent = this.extractMainContent(content);
+    if (mainContent.length < 50) {
+      console.warn(`⚠️ 내용이 너무 짧음: ${filename}`);
+      return null;
+    }
+
+    // 청킹
+    const chunks = this.createChunks(mainContent);
+    return chunks.map((chunk, i) => ({
+      id: `${filename}_chunk_${i}`,
+      content: chunk,
+      metadata: {
+        ...metadata,
+        doc_id: path.basename(filename, '.txt').replace(/^doc_/, ''),
+        chunk_index: i,
+        total_chunks: chunks.length,
+        source_file: filename
+      }
+    }));
+  }
+
   extractMetadata(content) {
     try {
       const urlMatch = content.match(/\[URL\] (https?:\/\/[^\n]+)/);
@@ -277,10 +422,10 @@ class WebsiteDataEmbedder {
       // 임베딩 생성
       const embedding = await this.createEmbedding(document.content);
       
-      // Supabase에 저장
+      // Supabase에 저장 (청크 ID가 문서 ID 기반이라 재통합 후에도 같은 행을 갱신)
       const { error } = await supabase
         .from('documents')
-        .insert({
+        .upsert({
           id: document.id,
           content: document.content,
           embedding,
@@ -288,7 +433,7 @@ class WebsiteDataEmbedder {
           source_type: 'website',
           source_file: document.metadata.source_file,
           created_at: new Date().toISOString()
-        });
+        }, { onConflict: 'id' });
 
       if (error) throw error;
 
@@ -316,8 +461,8 @@ class WebsiteDataEmbedder {
     console.log('\n' + '='.repeat(60));
     console.log('✅ 웹사이트 데이터 임베딩 완료!');
     console.log(`📊 처리 결과:`);
-    console.log(`   총 파일: ${this.totalFiles:,}개`);
-    console.log(`   처리 완료: ${this.processedCount:,}개`);
+    console.log(`   총 파일: ${this.totalFiles.toLocaleString()}개`);
+    console.log(`   처리 완료: ${this.processedCount.toLocaleString()}개`);
     console.log(`   오류: ${this.errors.length}개`);
 
     if (this.errors.length > 0) {
@@ -338,7 +483,7 @@ class WebsiteDataEmbedder {
         .eq('source_type', 'website');
 
       if (!error) {
-        console.log(`📚 데이터베이스 내 웹사이트 문서: ${count:,}개`);
+        console.log(`📚 데이터베이스 내 웹사이트 문서: ${count.toLocaleString()}개`);
       }
     } catch (error) {
       console.warn('데이터베이스 통계 조회 오류:', error.message);
@@ -358,8 +503,14 @@ async function main() {
   
   try {
     // 명령행 인자로 데이터 디렉토리 지정 가능
-    const dataDir = process.argv[2] || '../crawlingTest/merged_output';
-    await embedder.processWebsiteData(dataDir);
+    // (--delta: merge_delta.json 의 변경분만 반영, --chunks=<디렉토리>: 통합 단계 청크 파일 사용)
+    const args = process.argv.slice(2);
+    const dataDir = args.find(arg => !arg.startsWith('--')) || '../crawlingTest/merged_output';
+    const chunkArg = args.find(arg => arg.startsWith('--chunks='));
+    await embedder.processWebsiteData(dataDir, {
+      delta: args.includes('--delta'),
+      chunkDir: chunkArg ? chunkArg.slice('--chunks='.length) : null
+    });
     
     console.log('\n🎉 웹사이트 데이터 임베딩 완료!');
     console.log('🤖 이제 챗봇에서 새로운 웹사이트 정보를 사용할 수 있습니다.');
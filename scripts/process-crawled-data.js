@@ -150,7 +150,8 @@ class CrawledDataProcessor {
             return null;
         }
         
-        const lines = content.split('\\n');
+        // 실제 줄바꿈과 구버전 이스케이프 줄바꿈('\\n') 모두 허용
+        const lines = content.split(/\n|\\n/);
         let url = '', depth = 0, domain = '', timestamp = '', length = 0;
         let textStartIndex = -1;
         
@@ -176,7 +177,7 @@ class CrawledDataProcessor {
             return null;
         }
         
-        const rawText = lines.slice(textStartIndex).join('\\n').trim();
+        const rawText = lines.slice(textStartIndex).join('\n').trim();
         
         // 텍스트 정제 (Unicode 오류 방지)
         const text = this.sanitizeText(rawText);